@@ -10,8 +10,10 @@ from allauth.account.views import LoginView as AllAuthLoginView
 from allauth.account.views import SignupView as AllAuthSignupView
 from meta.views import MetadataMixin
 
+from coderdojochi.enrollment import enrollment_states
 from coderdojochi.forms import CDCModelForm, GuardianForm, MentorForm
 from coderdojochi.models import Guardian, MeetingOrder, Mentor, MentorOrder, Order, Student
+from coderdojochi.views.feeds import calendar_feed_url
 
 
 class SignupView(MetadataMixin, AllAuthSignupView):
@@ -65,6 +67,7 @@ class AccountHomeView(TemplateView):
         )
 
         context['user'] = self.request.user
+        context['calendar_feed_url'] = self.request.build_absolute_uri(calendar_feed_url(self.request.user))
 
         if self.request.user.role == 'mentor':
             return {**context, **self.get_context_data_for_mentor()}
@@ -141,11 +144,17 @@ class AccountHomeView(TemplateView):
         upcoming_orders = student_orders.filter(
             is_active=True,
             session__start_date__gte=timezone.now(),
+        ).select_related(
+            'student',
+            'session__course',
         ).order_by('session__start_date')
 
         past_orders = student_orders.filter(
             is_active=True,
             session__start_date__lte=timezone.now(),
+        ).select_related(
+            'student',
+            'session__course',
         ).order_by('session__start_date')
 
         return {
@@ -153,6 +162,12 @@ class AccountHomeView(TemplateView):
             'students': students,
             'student_orders': student_orders,
             'upcoming_orders': upcoming_orders,
+            # The page renders both querysets anyway; plain ids keep the lookup
+            # from becoming nested subqueries.
+            'enrollment_states': enrollment_states(
+                [student.id for student in students],
+                {order.session_id for order in upcoming_orders},
+            ),
             'past_orders': past_orders,
         }
 
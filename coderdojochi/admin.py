@@ -12,9 +12,12 @@ from import_export import resources
 from import_export.admin import ImportExportActionModelAdmin, ImportExportMixin
 from import_export.fields import Field
 
+from coderdojochi.check_in import set_check_in
 from coderdojochi.models import (
+    Announcement,
     Course,
     Donation,
+    EmailJob,
     Equipment,
     EquipmentType,
     Guardian,
@@ -26,8 +29,10 @@ from coderdojochi.models import (
     MentorOrder,
     Order,
     RaceEthnicity,
+    ReminderOutbox,
     Session,
     Student,
+    WaitlistEntry,
 )
 
 User = get_user_model()
@@ -627,31 +632,31 @@ class SessionAdmin(ImportExportMixin, ImportExportActionModelAdmin):
             '<a href="{url}?session__id__exact={query}">{count}</a>',
             url=reverse("admin:coderdojochi_mentororder_changelist"),
             query=obj.id,
-            count=MentorOrder.objects.filter(session__id=obj.id, is_active=True).count(),
+            count=obj.active_mentor_count,
         )
     mentor_count_link.short_description = "Mentors"
-    mentor_count_link.admin_order_field = "mentor__count"
+    mentor_count_link.admin_order_field = "active_mentor_count"
 
     def student_count_link(self, obj):
         return format_html(
             '<a href="{url}?session__id__exact={query}">{count}</a>',
             url=reverse("admin:coderdojochi_order_changelist"),
             query=obj.id,
-            count=obj.get_current_orders().count(),
+            count=obj.active_student_count,
         )
     student_count_link.short_description = "Students"
-    student_count_link.admin_order_field = "student__count"
+    student_count_link.admin_order_field = "active_student_count"
 
 
 def student_check_in(modeladmin, request, queryset):
-    queryset.update(check_in=timezone.now())
+    set_check_in(queryset, timezone.now())
 
 
 student_check_in.short_description = "Check in"
 
 
 def student_check_out(modeladmin, request, queryset):
-    queryset.update(check_in=None)
+    set_check_in(queryset, None)
 
 
 student_check_out.short_description = "Check out"
@@ -739,14 +744,14 @@ class OrderAdmin(ImportExportMixin, ImportExportActionModelAdmin):
 
 
 def mentor_check_in(modeladmin, request, queryset):
-    queryset.update(check_in=timezone.now())
+    set_check_in(queryset, timezone.now())
 
 
 mentor_check_in.short_description = "Check in"
 
 
 def mentor_check_out(modeladmin, request, queryset):
-    queryset.update(check_in=None)
+    set_check_in(queryset, None)
 
 
 mentor_check_out.short_description = "Check out"
@@ -811,14 +816,14 @@ class MentorOrderAdmin(ImportExportMixin, ImportExportActionModelAdmin):
 
 
 def meeting_order_check_in(modeladmin, request, queryset):
-    queryset.update(check_in=timezone.now())
+    set_check_in(queryset, timezone.now())
 
 
 meeting_order_check_in.short_description = "Check in"
 
 
 def meeting_order_check_out(modeladmin, request, queryset):
-    queryset.update(check_in=None)
+    set_check_in(queryset, None)
 
 
 meeting_order_check_out.short_description = "Check out"
@@ -1055,3 +1060,148 @@ class LocationAdmin(ImportExportMixin, ImportExportActionModelAdmin):
 @admin.register(RaceEthnicity)
 class RaceEthnicityAdmin(ImportExportMixin, ImportExportActionModelAdmin):
     pass
+
+
+@admin.register(ReminderOutbox)
+class ReminderOutboxAdmin(admin.ModelAdmin):
+    list_per_page = 50
+
+    list_display = [
+        'recipient',
+        'kind',
+        'status',
+        'attempts',
+        'sent_at',
+        'created_at',
+    ]
+
+    list_filter = [
+        'kind',
+        'status',
+    ]
+
+    search_fields = [
+        'recipient',
+    ]
+
+    ordering = [
+        '-created_at',
+    ]
+
+    readonly_fields = [
+        'order',
+        'mentor_order',
+        'merge_data',
+        'claimed_at',
+        'sent_at',
+        'last_error',
+    ]
+
+    date_hierarchy = 'created_at'
+
+    view_on_site = False
+
+
+@admin.register(EmailJob)
+class EmailJobAdmin(admin.ModelAdmin):
+    list_per_page = 50
+
+    list_display = [
+        'template_name',
+        'status',
+        'attempts',
+        'sent_at',
+        'created_at',
+    ]
+
+    list_filter = [
+        'template_name',
+        'status',
+    ]
+
+    ordering = [
+        '-created_at',
+    ]
+
+    readonly_fields = [
+        'payload',
+        'claimed_at',
+        'sent_at',
+        'last_error',
+    ]
+
+    date_hierarchy = 'created_at'
+
+    view_on_site = False
+
+
+@admin.register(Announcement)
+class AnnouncementAdmin(admin.ModelAdmin):
+    list_display = [
+        'session',
+        'audience',
+        'status',
+        'queued',
+        'sent',
+        'failed',
+        'sent_at',
+        'created_at',
+    ]
+
+    list_filter = [
+        'audience',
+        'status',
+    ]
+
+    list_select_related = [
+        'session__course',
+    ]
+
+    ordering = [
+        '-created_at',
+    ]
+
+    autocomplete_fields = [
+        'session',
+    ]
+
+    readonly_fields = [
+        'queued',
+        'sent',
+        'failed',
+        'last_recipient_id',
+        'claimed_at',
+        'sent_at',
+        'last_error',
+    ]
+
+    date_hierarchy = 'created_at'
+
+    view_on_site = False
+
+
+@admin.register(WaitlistEntry)
+class WaitlistEntryAdmin(admin.ModelAdmin):
+    list_per_page = 50
+
+    list_display = [
+        'student',
+        'session',
+        'status',
+        'held_until',
+        'created_at',
+    ]
+
+    list_filter = [
+        'status',
+    ]
+
+    raw_id_fields = [
+        'session',
+        'student',
+        'guardian',
+    ]
+
+    date_hierarchy = 'created_at'
+
+    view_on_site = False
@@ -0,0 +1,169 @@
+import logging
+
+from django.conf import settings
+from django.db.models import F
+from django.utils import timezone
+
+import arrow
+
+from coderdojochi.models import Announcement, Guardian, Mentor, Session
+from coderdojochi.outbox import claim_rows, mark_failed, mark_sent
+from coderdojochi.util import email, query_stats
+
+logger = logging.getLogger(__name__)
+
+ANNOUNCEMENT_EMAILS = {
+    Announcement.MENTORS: {
+        'subject': 'New We All Code class date announced! Come mentor!',
+        'template_name': 'class-announcement-mentor',
+        'preheader': 'Help us make a huge difference! A brand new class was just announced.',
+    },
+    Announcement.GUARDIANS: {
+        'subject': 'New We All Code class date announced!',
+        'template_name': 'class-announcement-guardian',
+        'preheader': "We're super excited to bring you another class date. Sign up to reserve your spot",
+    },
+}
+
+
+def announcement_recipients(audience):
+    model = Mentor if audience == Announcement.MENTORS else Guardian
+
+    return model.objects.filter(
+        is_active=True,
+        user__is_active=True,
+    )
+
+
+def announcement_merge_data(session, audience):
+    if audience == Announcement.MENTORS:
+        start_date = session.mentor_start_date
+    else:
+        start_date = session.start_date
+
+    return {
+        'class_code': session.course.code,
+        'class_title': session.course.title,
+        'class_description': session.course.description,
+        'class_start_date': arrow.get(start_date).to('local').format('dddd, MMMM D, YYYY'),
+        'class_start_time': arrow.get(start_date).to('local').format('h:mma'),
+        'class_end_date': arrow.get(session.end_date).to('local').format('dddd, MMMM D, YYYY'),
+        'class_end_time': arrow.get(session.end_date).to('local').format('h:mma'),
+        'minimum_age': session.minimum_age,
+        'maximum_age': session.maximum_age,
+        'class_location_name': session.location.name,
+        'class_location_address': session.location.address,
+        'class_location_city': session.location.city,
+        'class_location_state': session.location.state,
+        'class_location_zip': session.location.zip,
+        'class_additional_info': session.additional_info,
+        'class_url': f"{settings.SITE_URL}{session.get_absolute_url()}",
+        'class_calendar_url': f"{settings.SITE_URL}{session.get_calendar_url()}",
+    }
+
+
+def queue_announcement(session, audience):
+    """
+    Queue the announcement of `session` to every active mentor or guardian.
+    Returns the announcement and whether it was newly queued.
+    """
+    return Announcement.objects.get_or_create(
+        session=session,
+        audience=audience,
+        defaults={
+            'queued': announcement_recipients(audience).count(),
+        },
+    )
+
+
+def send_announcement(announcement, chunk_size=500):
+    """
+    Email the announcement's audience, `chunk_size` recipients at a time,
+    reading just the address and name of each from the database. Progress is
+    saved after every chunk.
+
+    Each chunk is a single batch to the ESP, sent one after the other: with
+    several batches in flight, one failing after others went out would have
+    the retry email those again.
+    """
+    session = Session.objects.select_related(
+        'course',
+        'location',
+    ).get(id=announcement.session_id)
+    merge_global_data = announcement_merge_data(session, announcement.audience)
+
+    recipients = announcement_recipients(announcement.audience).order_by(
+        'user_id',
+    ).values_list(
+        'user_id',
+        'user__email',
+        'user__first_name',
+        'user__last_name',
+    )
+
+    last_recipient_id = announcement.last_recipient_id
+
+    while True:
+        chunk = list(recipients.filter(user_id__gt=last_recipient_id)[:chunk_size])
+        if not chunk:
+            break
+
+        summary = email(
+            merge_data={
+                user_email: {
+                    'first_name': first_name,
+                    'last_name': last_name,
+                }
+                for user_id, user_email, first_name, last_name in chunk
+            },
+            merge_global_data=merge_global_data,
+            recipients=[user_email for user_id, user_email, first_name, last_name in chunk],
+            unsub_group_id=settings.SENDGRID_UNSUB_CLASSANNOUNCE,
+            batch_size=chunk_size,
+            retries=settings.EMAIL_SEND_RETRIES,
+            **ANNOUNCEMENT_EMAILS[announcement.audience],
+        )
+
+        last_recipient_id = chunk[-1][0]
+
+        Announcement.objects.filter(id=announcement.id).update(
+            sent=F('sent') + summary['accepted'],
+            failed=F('failed') + len(summary['rejected']),
+            last_recipient_id=last_recipient_id,
+            # Renew the claim so a long announcement isn't taken for dead.
+            claimed_at=timezone.now(),
+            updated_at=timezone.now(),
+        )
+
+
+def drain_announcements(chunk_size=500):
+    """
+    Send every queued announcement. An announcement that fails part way is
+    put back in the queue and resumes after the last recipient it reached.
+    """
+    with query_stats() as stats:
+        sent = 0
+        failed = 0
+        last_id = 0
+
+        while True:
+            announcements = claim_rows(Announcement, last_id, 1)
+            if not announcements:
+                break
+
+            announcement = announcements[0]
+            last_id = announcement.id
+
+            try:
+                send_announcement(announcement, chunk_size)
+            except Exception as e:
+                logger.exception(f"Announcement {announcement.id} failed")
+                mark_failed(Announcement, [announcement.id], e)
+                failed += 1
+            else:
+                mark_sent(Announcement, [announcement.id])
+                sent += 1
+
+    stats['sent'] = sent
+    stats['failed'] = failed
+    return stats
@@ -0,0 +1,133 @@
+"""
+Namespaced cache keys on top of the default cache.
+
+Every key starts with the deploy version, read once per process, so a
+release (see the bump_cache_version command) starts from a clean cache while
+the old dynos keep using theirs until they are replaced. Namespaces that are
+invalidated as a whole carry their own version as well; bumping it orphans
+every key made with `versioned_key`. Invalidations wait for the transaction
+that made the change to commit.
+
+Lookups through `get_cached` count hits and misses per namespace for the
+cache_stats command.
+"""
+import time
+from functools import lru_cache
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+CALENDAR = 'calendar'
+CALENDAR_FEED = 'calendar-feed'
+UPCOMING_SESSIONS = 'upcoming-sessions'
+
+NAMESPACES = (
+    CALENDAR,
+    CALENDAR_FEED,
+    UPCOMING_SESSIONS,
+)
+
+DEPLOY_VERSION_KEY = 'deploy-version'
+
+
+def _new_version():
+    return int(time.time())
+
+
+@lru_cache(maxsize=None)
+def deploy_version():
+    return cache.get_or_set(DEPLOY_VERSION_KEY, _new_version, None)
+
+
+def bump_deploy_version():
+    """
+    Start a new deploy version for processes started from now on.
+    """
+    try:
+        return cache.incr(DEPLOY_VERSION_KEY)
+    except ValueError:
+        version = _new_version()
+        cache.set(DEPLOY_VERSION_KEY, version, None)
+        return version
+
+
+def make_key(namespace, *parts):
+    return ':'.join(str(part) for part in (deploy_version(), namespace, *parts))
+
+
+def namespace_version(namespace):
+    return cache.get_or_set(make_key(namespace, 'version'), _new_version, None)
+
+
+def versioned_key(namespace, *parts):
+    return make_key(namespace, namespace_version(namespace), *parts)
+
+
+def _bump_namespace_version(namespace):
+    try:
+        cache.incr(make_key(namespace, 'version'))
+    except ValueError:
+        # Nothing has been cached against a version yet.
+        pass
+
+
+def invalidate_namespace(namespace):
+    """
+    Drop everything cached under `versioned_key(namespace, ...)` once the
+    current transaction commits. Bumping the version any earlier would let
+    a concurrent request cache the old rows under the new version.
+    """
+    transaction.on_commit(lambda: _bump_namespace_version(namespace))
+
+
+def _stat_key(namespace, stat):
+    return make_key('cache-stats', namespace, stat)
+
+
+def _count(namespace, stat):
+    if not settings.CACHE_STATS:
+        return
+
+    key = _stat_key(namespace, stat)
+
+    if not cache.add(key, 1, None):
+        try:
+            cache.incr(key)
+        except ValueError:
+            # Evicted between the add and the incr.
+            pass
+
+
+def get_cached(namespace, key):
+    value = cache.get(key)
+    _count(namespace, 'misses' if value is None else 'hits')
+    return value
+
+
+def stats():
+    """
+    {namespace: (hits, misses)} since the last deploy or reset.
+    """
+    keys = {
+        (namespace, stat): _stat_key(namespace, stat)
+        for namespace in NAMESPACES
+        for stat in ('hits', 'misses')
+    }
+    values = cache.get_many(keys.values())
+
+    return {
+        namespace: tuple(
+            values.get(keys[(namespace, stat)], 0)
+            for stat in ('hits', 'misses')
+        )
+        for namespace in NAMESPACES
+    }
+
+
+def reset_stats():
+    cache.delete_many([
+        _stat_key(namespace, stat)
+        for namespace in NAMESPACES
+        for stat in ('hits', 'misses')
+    ])
@@ -0,0 +1,250 @@
+from operator import attrgetter, itemgetter
+
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+from coderdojochi.models import MeetingOrder, MentorOrder, Order
+from coderdojochi.stats import refresh_session_stats
+
+# The kinds of order that can be checked in, as named in check-in URLs.
+CHECK_IN_ORDERS = {
+    'student': Order,
+    'mentor': MentorOrder,
+    'meeting': MeetingOrder,
+}
+
+
+class CheckInConflict(Exception):
+    """
+    The order changed since the version the client last saw. `order` holds
+    its current state.
+    """
+
+    def __init__(self, order):
+        super().__init__(f"{order._meta.verbose_name} {order.id} was changed by someone else.")
+        self.order = order
+
+
+def check_in_version(order):
+    """
+    The optimistic concurrency token for `order`: its last change.
+    """
+    return order.updated_at.isoformat()
+
+
+def toggle_check_in(order, version, alternate_guardian=None):
+    """
+    Check `order` in, or undo its check in, provided nobody has changed it
+    since `version`. The write is a conditional UPDATE, so of two volunteers
+    tapping the same row only the first wins; the second gets a
+    CheckInConflict with the row as it is now.
+
+    For student orders a non-empty `alternate_guardian` different from the
+    guardian's own name is recorded as the person doing the drop off.
+    """
+    model = type(order)
+
+    if version != check_in_version(order):
+        raise CheckInConflict(order)
+
+    now = timezone.now()
+    changes = {
+        'check_in': None if order.check_in else now,
+        'updated_at': now,
+    }
+
+    if model is Order and alternate_guardian:
+        guardian_name = f"{order.guardian.user.first_name} {order.guardian.user.last_name}"
+        if alternate_guardian != guardian_name:
+            changes['alternate_guardian'] = alternate_guardian
+
+    updated = model.objects.filter(
+        id=order.id,
+        updated_at=order.updated_at,
+    ).update(**changes)
+
+    if not updated:
+        order.refresh_from_db()
+        raise CheckInConflict(order)
+
+    for field, value in changes.items():
+        setattr(order, field, value)
+
+    if model is Order:
+        refresh_session_stats([order.session_id])
+
+    return order
+
+
+def set_check_in(queryset, check_in):
+    """
+    Set `check_in` on every order in `queryset` with a single UPDATE. The
+    change bumps `updated_at` so pages holding an older version see a
+    conflict, and student orders keep their sessions' stats current.
+    """
+    session_ids = None
+
+    if queryset.model is Order:
+        session_ids = set(queryset.values_list('session_id', flat=True).distinct())
+
+    updated = queryset.update(check_in=check_in, updated_at=timezone.now())
+
+    if session_ids:
+        refresh_session_stats(session_ids)
+
+    return updated
+
+
+def sync_check_ins(session, events):
+    """
+    Apply check-in events recorded by a device, possibly while it was
+    offline, to the student and mentor orders of `session`.
+
+    Each event is a dict with `kind` ('student' or 'mentor'), `order` (its
+    id), `checked_in` (bool) and `at`, the aware datetime it happened on the
+    device. Only the latest event per order counts. An event loses to any
+    change the server has seen since `at`.
+
+    Returns `(applied, conflicts)`: the orders as they now are, and
+    `(event, order, reason)` for each event that was not applied, where
+    `order` is the current order or None when it is not part of `session`.
+    """
+    latest = {}
+    for event in sorted(events, key=itemgetter('at')):
+        latest[(event['kind'], event['order'])] = event
+
+    now = timezone.now()
+    applied = []
+    conflicts = []
+
+    with transaction.atomic():
+        for kind in ('student', 'mentor'):
+            model = CHECK_IN_ORDERS[kind]
+            ids = [order_id for event_kind, order_id in latest if event_kind == kind]
+
+            if not ids:
+                continue
+
+            orders = model.objects.select_for_update().filter(session=session).in_bulk(ids)
+            changed = []
+
+            for order_id in ids:
+                event = latest[(kind, order_id)]
+                order = orders.get(order_id)
+
+                if order is None:
+                    conflicts.append((event, None, 'not found'))
+                    continue
+
+                if order.updated_at > event['at']:
+                    conflicts.append((event, order, 'changed'))
+                    continue
+
+                applied.append(order)
+
+                if event['checked_in'] == bool(order.check_in):
+                    continue
+
+                order.check_in = min(event['at'], now) if event['checked_in'] else None
+                order.updated_at = now
+                changed.append(order)
+
+            model.objects.bulk_update(changed, ['check_in', 'updated_at'])
+
+            if model is Order and changed:
+                refresh_session_stats([session.id])
+
+    return applied, conflicts
+
+
+def check_in_counts(order):
+    """
+    Attendance counters for the session or meeting `order` belongs to.
+    """
+    if isinstance(order, MeetingOrder):
+        orders = MeetingOrder.objects.filter(meeting_id=order.meeting_id)
+    else:
+        orders = type(order).objects.filter(session_id=order.session_id)
+
+    return attendance_counts(orders)
+
+
+def attendance_counts(orders):
+    """
+    Active, checked in and no show totals for `orders`, in one query.
+    """
+    counts = orders.aggregate(
+        active=Count('id', filter=Q(is_active=True)),
+        checked_in=Count('id', filter=Q(is_active=True, check_in__isnull=False)),
+    )
+    counts['no_show'] = counts['active'] - counts['checked_in']
+
+    return counts
+
+
+def lifetime_attendance(student_ids):
+    """
+    {student_id: (attended, missed)} counted over every order each student
+    has ever had. `student_ids` may be a queryset, in which case it is run as
+    a subquery of the single grouped query.
+    """
+    rows = Order.objects.filter(
+        student_id__in=student_ids,
+    ).values(
+        'student_id',
+    ).annotate(
+        attended=Count('id', filter=Q(check_in__isnull=False)),
+        missed=Count('id', filter=Q(check_in__isnull=True)),
+    ).order_by()
+
+    return {
+        row['student_id']: (row['attended'], row['missed'])
+        for row in rows
+    }
+
+
+def session_check_in_orders(session, active_session):
+    """
+    Load the orders for `session` once, with each student's lifetime
+    attended/missed counts as `num_attended`/`num_missed`, and split them the
+    way the check-in page lists them:
+
+    - active_orders: every active order while the class is on, afterwards
+      only those that checked in, by student first name
+    - inactive_orders: cancelled orders, most recently changed first
+    - no_show_orders: active orders that never checked in
+    - checked_in_orders: active orders that checked in
+    """
+    orders = list(
+        Order.objects.filter(
+            session=session,
+        ).select_related(
+            'student',
+            'guardian__user',
+        ).order_by('id')
+    )
+
+    history = lifetime_attendance(
+        Order.objects.filter(session=session).values('student_id')
+    )
+
+    for order in orders:
+        order.num_attended, order.num_missed = history.get(order.student_id, (0, 0))
+
+    current = [order for order in orders if order.is_active]
+    checked_in = [order for order in current if order.check_in]
+
+    return {
+        'active_orders': sorted(
+            current if active_session else checked_in,
+            key=lambda order: order.student.first_name,
+        ),
+        'inactive_orders': sorted(
+            [order for order in orders if not order.is_active],
+            key=attrgetter('updated_at'),
+            reverse=True,
+        ),
+        'no_show_orders': [order for order in current if not order.check_in],
+        'checked_in_orders': checked_in,
+    }
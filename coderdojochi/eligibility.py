@@ -0,0 +1,80 @@
+"""
+Which students may take which classes, by the class's age and gender limits.
+
+`eligibility` works out every student x session pair in one pass: each
+session's limits, which fall back to its course, and each student's clean
+gender are read once, and ages come from Student.age_on. The same reason
+codes drive the sign-up checks and the enroll buttons, so they always agree.
+"""
+from coderdojochi.models import Student
+
+AGE = 'age'
+GENDER = 'gender'
+
+
+def eligibility(students, sessions):
+    """
+    {(student_id, session_id): reasons} for every pair of `students` and
+    `sessions`, where `reasons` is a tuple of the limits the student falls
+    outside of, AGE and/or GENDER, and empty when they may enroll. Sessions
+    should come with their course.
+    """
+    limits = [
+        (
+            session.id,
+            session.start_date,
+            session.minimum_age,
+            session.maximum_age,
+            session.gender_limitation,
+        )
+        for session in sessions
+    ]
+
+    reasons = {}
+    for student in students:
+        gender = student.get_clean_gender()
+
+        for session_id, start_date, minimum_age, maximum_age, gender_limitation in limits:
+            age = Student.age_on(student.birthday, start_date)
+            student_reasons = ()
+
+            if not minimum_age <= age <= maximum_age:
+                student_reasons += (AGE,)
+
+            if gender_limitation and gender not in (gender_limitation.lower(), 'other'):
+                student_reasons += (GENDER,)
+
+            reasons[(student.id, session_id)] = student_reasons
+
+    return reasons
+
+
+def limitation_title(reasons, session):
+    if AGE in reasons and GENDER in reasons:
+        return "Limited event."
+
+    if AGE in reasons:
+        return "Age-limited event."
+
+    return "{gender}-only event.".format(
+        gender='Girls' if session.gender_limitation == 'female' else 'Boys'
+    )
+
+
+def limitation_message(reasons, session):
+    """
+    Why a student with `reasons` can't take `session`.
+    """
+    if AGE in reasons and GENDER in reasons:
+        return (
+            f"Sorry, this class is limited to {session.gender_limitation}s between {session.minimum_age} "
+            f"and {session.maximum_age} this time around."
+        )
+
+    if AGE in reasons:
+        return (
+            f"Sorry, this class is limited to students between ages {session.minimum_age} and "
+            f"{session.maximum_age} this time around."
+        )
+
+    return f"Sorry, this class is limited to {session.gender_limitation}s this time around."
@@ -0,0 +1,74 @@
+import logging
+
+from coderdojochi.models import EmailJob
+from coderdojochi.outbox import claim_rows, mark_failed, mark_sent
+from coderdojochi.util import email, query_stats
+
+logger = logging.getLogger(__name__)
+
+
+def queue_email(**kwargs):
+    """
+    Queue an email for the worker instead of sending it inside the request.
+    Takes the same arguments as `util.email`, except attachments.
+
+    The job is written in the caller's transaction, so it only becomes visible
+    to the worker once that transaction commits, and disappears with it on a
+    rollback. Sign-up views no longer wait on the ESP.
+    """
+    if kwargs.get('attachments'):
+        raise TypeError("queued emails can't have attachments, use util.email")
+
+    if not (kwargs.get('subject') and kwargs.get('template_name') and kwargs.get('recipients')):
+        raise NameError()
+
+    if not isinstance(kwargs['recipients'], list):
+        raise TypeError("recipients must be a list")
+
+    return EmailJob.objects.create(
+        template_name=kwargs['template_name'],
+        payload=kwargs,
+    )
+
+
+def send_email_job(job):
+    try:
+        summary = email(**job.payload)
+    except Exception as e:
+        logger.exception(f"Email job {job.id} failed")
+        mark_failed(EmailJob, [job.id], e)
+        return False
+
+    if summary['rejected']:
+        logger.warning(f"Email job {job.id}: {summary}")
+
+    mark_sent(EmailJob, [job.id])
+    return True
+
+
+def drain_email_queue(batch_size=100):
+    """
+    Send every pending email job, `batch_size` at a time. Each claim is
+    committed before sending, so several workers can drain at once.
+    """
+    with query_stats() as stats:
+        sent = 0
+        failed = 0
+        last_id = 0
+
+        while True:
+            jobs = claim_rows(EmailJob, last_id, batch_size)
+            if not jobs:
+                break
+
+            last_id = jobs[-1].id
+
+            for job in jobs:
+                if send_email_job(job):
+                    sent += 1
+                else:
+                    failed += 1
+
+    stats['sent'] = sent
+    stats['failed'] = failed
+    return stats
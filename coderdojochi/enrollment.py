@@ -0,0 +1,106 @@
+"""
+Enrolling students and mentors in sessions without overselling them.
+
+An enrollment locks the session row, checks its seat counter (see
+coderdojochi.seats) against the capacity and saves the order, which moves
+the counter, before the lock is released. Concurrent sign-ups for the same
+session queue on that lock, so the last seat goes to exactly one of them and
+the others get SOLD_OUT. Seats held for promoted waitlist students (see
+coderdojochi.waitlist) count as taken for everyone else. Run it outside a
+request-wide transaction so the lock is only held for as long as the
+enrollment takes.
+"""
+from django.db import transaction
+
+from coderdojochi.models import MentorOrder, Order, Session
+from coderdojochi.seats import SEAT_COUNTERS
+from coderdojochi.waitlist import held_seats, mark_enrolled
+
+ENROLLED = 'enrolled'
+ALREADY_ENROLLED = 'already enrolled'
+SOLD_OUT = 'sold out'
+CANCELLED = 'cancelled'
+
+
+def _enroll(model, session, capacity, ip, **lookup):
+    counter = SEAT_COUNTERS[model]
+
+    with transaction.atomic():
+        locked = Session.objects.select_for_update().get(id=session.id)
+
+        # Keep the caller's copy current for whatever it renders next.
+        setattr(session, counter, getattr(locked, counter))
+
+        orders = model.objects.filter(session=session, **lookup).order_by('-is_active', '-id')
+        order = orders.first()
+
+        if order and order.is_active:
+            return ALREADY_ENROLLED, order
+
+        if getattr(locked, counter) >= capacity(locked):
+            return SOLD_OUT, None
+
+        if order is None:
+            order = model(session=session, **lookup)
+
+        order.ip = ip
+        order.is_active = True
+        order.save()
+
+        setattr(session, counter, getattr(session, counter) + 1)
+
+    return ENROLLED, order
+
+
+def enroll_student(session, guardian, student, ip):
+    """
+    Give `student` a seat in `session`, reusing a cancelled order if there is
+    one, and close their waitlist entry. Returns `(status, order)`: ENROLLED
+    or ALREADY_ENROLLED with the active order, or SOLD_OUT with None.
+    """
+    with transaction.atomic():
+        status, order = _enroll(
+            Order,
+            session,
+            lambda locked: locked.capacity - held_seats(locked, exclude_student=student),
+            ip,
+            guardian=guardian,
+            student=student,
+        )
+
+        if order:
+            mark_enrolled(session, student)
+
+    return status, order
+
+
+def enroll_mentor(session, mentor, ip):
+    """
+    Like `enroll_student`, against the session's mentor capacity.
+    """
+    return _enroll(
+        MentorOrder,
+        session,
+        Session.get_mentor_capacity,
+        ip,
+        mentor=mentor,
+    )
+
+
+def enrollment_states(student_ids, session_ids):
+    """
+    {(student_id, session_id): ENROLLED or CANCELLED} for every student and
+    session in `student_ids` x `session_ids` that have an order together, in
+    one query. Either argument may be a queryset of ids.
+    """
+    rows = Order.objects.filter(
+        student_id__in=student_ids,
+        session_id__in=session_ids,
+    ).values_list('student_id', 'session_id', 'is_active')
+
+    states = {}
+    for student_id, session_id, is_active in rows:
+        if is_active or (student_id, session_id) not in states:
+            states[(student_id, session_id)] = ENROLLED if is_active else CANCELLED
+
+    return states
@@ -3,7 +3,18 @@ from datetime import datetime
 import factory
 from pytz import utc
 
-from .models import CDCUser, Course, Location, Mentor, PartnerPasswordAccess, Session
+from .models import (
+    CDCUser,
+    Course,
+    Guardian,
+    Location,
+    Mentor,
+    MentorOrder,
+    Order,
+    PartnerPasswordAccess,
+    Session,
+    Student,
+)
 
 
 class CourseFactory(factory.DjangoModelFactory):
@@ -27,26 +38,44 @@ class LocationFactory(factory.DjangoModelFactory):
 
 class CDCUserFactory(factory.DjangoModelFactory):
     username = factory.Sequence(lambda n: f"username_{n}")
+    email = factory.Sequence(lambda n: f"user_{n}@example.com")
+    first_name = factory.Sequence(lambda n: f"First {n}")
+    last_name = factory.Sequence(lambda n: f"Last {n}")
 
     class Meta:
         model = CDCUser
 
 
 class MentorFactory(factory.DjangoModelFactory):
-    user = factory.SubFactory(CDCUserFactory)
-    active = True
+    user = factory.SubFactory(CDCUserFactory, role=CDCUser.MENTOR)
+    is_active = True
 
     class Meta:
         model = Mentor
 
 
+class GuardianFactory(factory.DjangoModelFactory):
+    user = factory.SubFactory(CDCUserFactory, role=CDCUser.GUARDIAN)
+
+    class Meta:
+        model = Guardian
+
+
+class StudentFactory(factory.DjangoModelFactory):
+    guardian = factory.SubFactory(GuardianFactory)
+    first_name = factory.Sequence(lambda n: f"Student {n}")
+    last_name = factory.Sequence(lambda n: f"Last {n}")
+    birthday = datetime(2010, 1, 1, tzinfo=utc)
+    gender = 'female'
+
+    class Meta:
+        model = Student
+
+
 class SessionFactory(factory.DjangoModelFactory):
     course = factory.SubFactory(CourseFactory)
     location = factory.SubFactory(LocationFactory)
     start_date = datetime.now(utc)
-    end_date = datetime.now(utc)
-    mentor_start_date = datetime.now(utc)
-    mentor_end_date = datetime.now(utc)
     password = ''
     instructor = factory.SubFactory(MentorFactory)
 
@@ -60,3 +89,20 @@ class PartnerPasswordAccessFactory(factory.DjangoModelFactory):
 
     class Meta:
         model = PartnerPasswordAccess
+
+
+class OrderFactory(factory.DjangoModelFactory):
+    student = factory.SubFactory(StudentFactory)
+    guardian = factory.SelfAttribute('student.guardian')
+    session = factory.SubFactory(SessionFactory)
+
+    class Meta:
+        model = Order
+
+
+class MentorOrderFactory(factory.DjangoModelFactory):
+    mentor = factory.SubFactory(MentorFactory)
+    session = factory.SubFactory(SessionFactory)
+
+    class Meta:
+        model = MentorOrder
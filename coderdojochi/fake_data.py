@@ -0,0 +1,542 @@
+"""
+Production-shaped fake data for load testing and profiling.
+
+`generate_fake_data` fills the database with guardians and their students,
+mentors, years of weekly classes and summer camps with their student and
+mentor orders, mentor meetings, donations and equipment. Rows are built
+lazily and saved with `bulk_create` in chunks of `batch_size`, so memory
+stays flat however many are asked for; ids are read back in one query per
+model rather than per row. Courses, locations, meeting types, equipment
+types and race/ethnicities already in the database (e.g. from fixtures/)
+are reused.
+
+bulk_create skips signals, so the seat counters and attendance stats are
+rebuilt once at the end.
+
+The numbers are loosely modelled on ours: one to four students per
+family, weekend classes filling up to capacity, about one order in ten
+cancelled and most of the rest checked in. A given `seed` always produces
+the same dataset, except for the usernames and emails, which are unique to
+each run so it can be repeated to grow the database.
+"""
+import logging
+import random
+import uuid
+from bisect import bisect_right
+from datetime import datetime, time, timedelta
+from itertools import islice
+
+from django.contrib.auth.hashers import make_password
+from django.db.models import Max
+from django.utils import timezone
+from django.utils.timezone import utc
+
+from coderdojochi.models import (
+    CDCUser,
+    Course,
+    Donation,
+    Equipment,
+    EquipmentType,
+    Guardian,
+    Location,
+    Meeting,
+    MeetingOrder,
+    MeetingType,
+    Mentor,
+    MentorOrder,
+    Order,
+    RaceEthnicity,
+    Session,
+    Student,
+)
+from coderdojochi.seats import reconcile_seat_counts
+from coderdojochi.stats import rebuild_stats
+
+logger = logging.getLogger(__name__)
+
+FIRST_NAMES = [
+    'Aaliyah', 'Alejandro', 'Amara', 'Andre', 'Ava', 'Carlos', 'Chloe', 'Darius', 'Diego', 'Elena',
+    'Emma', 'Ethan', 'Fatima', 'Gabriel', 'Grace', 'Hannah', 'Isaiah', 'Jada', 'Jamal', 'Jasmine',
+    'Kai', 'Layla', 'Liam', 'Lucia', 'Malik', 'Maya', 'Mia', 'Noah', 'Nia', 'Olivia',
+    'Omar', 'Priya', 'Rohan', 'Santiago', 'Sofia', 'Tariq', 'Valentina', 'Wei', 'Xavier', 'Zara',
+]
+
+LAST_NAMES = [
+    'Adams', 'Brown', 'Chen', 'Davis', 'Garcia', 'Gonzalez', 'Harris', 'Hernandez', 'Jackson', 'Johnson',
+    'Kim', 'Lee', 'Lopez', 'Martin', 'Martinez', 'Miller', 'Moore', 'Nguyen', 'Patel', 'Perez',
+    'Ramirez', 'Robinson', 'Rodriguez', 'Sanchez', 'Smith', 'Taylor', 'Thomas', 'Walker', 'White', 'Williams',
+]
+
+# (gender, weight) as families enter it on the sign-up form.
+STUDENT_GENDERS = [('female', 45), ('male', 45), ('Female', 3), ('Male', 3), ('non-binary', 4)]
+ADULT_GENDERS = [('female', 50), ('male', 46), ('other', 4)]
+
+# Ages 7 to 17 as (minimum, maximum, title, course type).
+DEFAULT_COURSES = [
+    (7, 10, 'Intro to Game Design', Course.WEEKEND),
+    (8, 12, 'Web Design', Course.WEEKEND),
+    (10, 14, 'Python Basics', Course.WEEKEND),
+    (11, 17, 'JavaScript Apps', Course.WEEKEND),
+    (12, 17, 'Robotics', Course.WEEKEND),
+    (8, 14, 'Summer Code Camp', Course.CAMP),
+]
+
+DEFAULT_LOCATIONS = [
+    ('Loop Campus', '180 N Michigan Ave', '60601'),
+    ('West Loop Campus', '1000 W Fulton Market', '60607'),
+    ('South Side Library', '6100 S Halsted St', '60621'),
+]
+
+DONATION_AMOUNTS = [(10, 10), (25, 30), (50, 30), (100, 20), (250, 7), (500, 3)]
+
+EQUIPMENT_MODELS = [('Apple', 'MacBook Air'), ('Lenovo', 'ThinkPad E14'), ('Google', 'Pixelbook Go')]
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+
+    while True:
+        chunk = list(islice(iterator, size))
+        if not chunk:
+            return
+        yield chunk
+
+
+def bulk_insert(model, rows, batch_size):
+    """
+    Save the objects yielded by `rows` in chunks of `batch_size` and return
+    the new rows, by id range rather than a list of ids, which would make for
+    huge queries.
+    """
+    last_id = model.objects.aggregate(last_id=Max('id'))['last_id'] or 0
+    created = 0
+
+    for chunk in chunked(rows, batch_size):
+        model.objects.bulk_create(chunk, batch_size=batch_size)
+        created += len(chunk)
+
+    logger.info(f"Created {created} {model._meta.verbose_name_plural}")
+
+    return model.objects.filter(id__gt=last_id).order_by('id')
+
+
+def ids(queryset):
+    return list(queryset.values_list('id', flat=True))
+
+
+def weighted(rng, choices):
+    values, weights = zip(*choices)
+    return rng.choices(values, weights)[0]
+
+
+def local(day, hour, minute=0):
+    return timezone.make_aware(datetime.combine(day, time(hour, minute)))
+
+
+def utc_day(day):
+    # For birthdays; far quicker than making hundreds of thousands of local
+    # times aware.
+    return datetime.combine(day, time(), tzinfo=utc)
+
+
+def generate_fake_data(
+    guardians=20000,
+    mentors=2000,
+    years=5,
+    sessions_per_week=4,
+    meetings_per_month=2,
+    equipment=250,
+    password=None,
+    batch_size=2000,
+    seed=0,
+):
+    """
+    Generate a dataset with `guardians` families and `mentors` volunteers,
+    and `years` of classes up to a couple of months from now. Every user's
+    password is `password`, or unusable when None. Returns the number of
+    rows created per model.
+    """
+    rng = random.Random(seed)
+    now = timezone.now()
+    today = timezone.localdate(now)
+    first_day = today - timedelta(days=365 * years)
+    last_day = today + timedelta(weeks=8)
+    # Keeps usernames unique across runs.
+    run = uuid.uuid4().hex[:8]
+    password = make_password(password)
+    counts = {}
+
+    def name():
+        return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+    def moment_between(start, end):
+        return start + timedelta(seconds=rng.randint(0, int((end - start).total_seconds())))
+
+    # Reference data, reused when loaded from fixtures.
+    courses = list(Course.objects.filter(is_active=True))
+    if not courses:
+        courses = [
+            Course.objects.create(
+                title=title,
+                slug=title.lower().replace(' ', '-'),
+                course_type=course_type,
+                minimum_age=minimum_age,
+                maximum_age=maximum_age,
+                duration=timedelta(hours=6 if course_type == Course.CAMP else 3),
+            )
+            for minimum_age, maximum_age, title, course_type in DEFAULT_COURSES
+        ]
+
+    weekend_courses = [course for course in courses if course.course_type != Course.CAMP] or courses
+    camp_courses = [course for course in courses if course.course_type == Course.CAMP]
+
+    locations = list(Location.objects.filter(is_active=True))
+    if not locations:
+        locations = [
+            Location.objects.create(name=location, address=address, city='Chicago', state='IL', zip=zip_code)
+            for location, address, zip_code in DEFAULT_LOCATIONS
+        ]
+
+    meeting_types = list(MeetingType.objects.all()) or [
+        MeetingType.objects.create(title='Mentor Orientation', slug='mentor-orientation'),
+        MeetingType.objects.create(title='Volunteer Training', slug='volunteer-training'),
+    ]
+
+    equipment_types = list(EquipmentType.objects.all()) or [
+        EquipmentType.objects.create(name='Laptop'),
+    ]
+
+    race_ethnicity_ids = list(RaceEthnicity.objects.values_list('id', flat=True))
+
+    # Users: one per guardian and mentor.
+    def users(role, total):
+        for n in range(total):
+            first_name, last_name = name()
+            yield CDCUser(
+                username=f"fake-{run}-{role}-{n}",
+                email=f"{first_name}.{last_name}.{run}.{role}.{n}@example.com".lower(),
+                first_name=first_name,
+                last_name=last_name,
+                role=role,
+                password=password,
+                date_joined=moment_between(local(first_day, 0), now),
+                last_login=now,
+            )
+
+    guardian_user_ids = ids(bulk_insert(CDCUser, users(CDCUser.GUARDIAN, guardians), batch_size))
+    mentor_user_ids = ids(bulk_insert(CDCUser, users(CDCUser.MENTOR, mentors), batch_size))
+    counts['users'] = len(guardian_user_ids) + len(mentor_user_ids)
+
+    guardian_ids = ids(bulk_insert(
+        Guardian,
+        (
+            Guardian(
+                user_id=user_id,
+                phone=f"312555{rng.randint(0, 9999):04d}",
+                zip=rng.choice(['60601', '60607', '60614', '60621', '60622', '60637', '60647']),
+                birthday=utc_day(today - timedelta(days=365 * rng.randint(28, 55))),
+                gender=weighted(rng, ADULT_GENDERS),
+            )
+            for user_id in guardian_user_ids
+        ),
+        batch_size,
+    ))
+    counts['guardians'] = len(guardian_ids)
+
+    # Most mentors are cleared to volunteer; the rest signed up and stalled.
+    new_mentors = bulk_insert(
+        Mentor,
+        (
+            Mentor(
+                user_id=user_id,
+                is_active=rng.random() < 0.95,
+                background_check=rng.random() < 0.8,
+                is_public=rng.random() < 0.6,
+                avatar_approved=rng.random() < 0.5,
+                birthday=utc_day(today - timedelta(days=365 * rng.randint(20, 60))),
+                gender=weighted(rng, ADULT_GENDERS),
+                work_place=rng.choice(['', 'Acme Corp', 'Chicago Public Schools', 'Self-employed']),
+            )
+            for user_id in mentor_user_ids
+        ),
+        batch_size,
+    )
+    mentor_ids = ids(new_mentors)
+    counts['mentors'] = len(mentor_ids)
+    cleared_mentor_ids = ids(new_mentors.filter(is_active=True, background_check=True)) or mentor_ids
+
+    # Students were born so that they're 5 to 17 over the years of classes.
+    def students():
+        for guardian_id in guardian_ids:
+            last_name = rng.choice(LAST_NAMES)
+
+            for n in range(weighted(rng, [(1, 55), (2, 33), (3, 10), (4, 2)])):
+                born = today - timedelta(days=rng.randint(365 * 5, 365 * (17 + years)))
+                yield Student(
+                    guardian_id=guardian_id,
+                    first_name=rng.choice(FIRST_NAMES),
+                    last_name=last_name,
+                    birthday=utc_day(born),
+                    gender=weighted(rng, STUDENT_GENDERS),
+                    photo_release=rng.random() < 0.9,
+                    consent=True,
+                )
+
+    new_students = bulk_insert(Student, students(), batch_size)
+    student_ids = ids(new_students)
+    counts['students'] = len(student_ids)
+
+    if race_ethnicity_ids:
+        Through = Student.race_ethnicity.through
+        bulk_insert(
+            Through,
+            (
+                Through(student_id=student_id, raceethnicity_id=rng.choice(race_ethnicity_ids))
+                for student_id in student_ids
+            ),
+            batch_size,
+        )
+
+    # Students by birth year, sorted by birthday, to sign each class up with
+    # kids of the right age without going through them all for each class.
+    students_by_year = {}
+    for student_id, guardian_id, birthday in new_students.values_list('id', 'guardian_id', 'birthday').iterator():
+        students_by_year.setdefault(birthday.year, []).append(
+            ((birthday.month, birthday.day), (student_id, guardian_id)),
+        )
+
+    for students in students_by_year.values():
+        students.sort()
+
+    birthdays_by_year = {
+        year: [birthday for birthday, student in students]
+        for year, students in students_by_year.items()
+    }
+
+    def eligible_students(start_date, minimum_age, maximum_age, count):
+        """
+        `count` random (student_id, guardian_id) of students aged `minimum_age`
+        to `maximum_age` on `start_date`, as Student.age_on has it.
+        """
+        day = (start_date.month, start_date.day)
+        oldest = start_date.year - maximum_age - 1
+        youngest = start_date.year - minimum_age
+
+        # Kids born in between are the right age whatever their birthday;
+        # in the oldest year only those yet to turn a year older, in the
+        # youngest only those who have had their birthday.
+        pools = []
+        for year in range(oldest, youngest + 1):
+            students = students_by_year.get(year, [])
+            start, end = 0, len(students)
+
+            if year == oldest:
+                start = bisect_right(birthdays_by_year.get(year, []), day)
+            elif year == youngest:
+                end = bisect_right(birthdays_by_year.get(year, []), day)
+
+            if start < end:
+                pools.append((students, start, end))
+
+        total = sum(end - start for students, start, end in pools)
+
+        for index in rng.sample(range(total), min(total, count)):
+            for students, start, end in pools:
+                if index < end - start:
+                    yield students[start + index][1]
+                    break
+                index -= end - start
+
+    # Classes: a few every Saturday, and a camp each summer weekday week.
+    def sessions():
+        day = first_day + timedelta(days=(5 - first_day.weekday()) % 7)
+
+        while day <= last_day:
+            for n in range(sessions_per_week):
+                course = rng.choice(weekend_courses)
+                capacity = rng.choice([16, 20, 20, 24, 30])
+                yield Session(
+                    course=course,
+                    location=rng.choice(locations),
+                    instructor_id=rng.choice(cleared_mentor_ids),
+                    start_date=local(day, rng.choice([10, 13]), 0),
+                    capacity=capacity,
+                    mentor_capacity=capacity // 2,
+                    is_active=rng.random() < 0.97,
+                    is_public=rng.random() < 0.95,
+                    gender_limitation=Session.FEMALE if rng.random() < 0.05 else None,
+                    announced_date_mentors=local(day - timedelta(weeks=3), 9) if day < today else None,
+                    announced_date_guardians=local(day - timedelta(weeks=2), 9) if day < today else None,
+                )
+
+            monday = day + timedelta(days=2)
+            if camp_courses and monday.month in (6, 7, 8) and monday <= last_day:
+                yield Session(
+                    course=rng.choice(camp_courses),
+                    location=rng.choice(locations),
+                    instructor_id=rng.choice(cleared_mentor_ids),
+                    start_date=local(monday, 9),
+                    capacity=30,
+                    mentor_capacity=10,
+                    is_active=True,
+                    is_public=True,
+                    cost=rng.choice([0, 100, 250]),
+                )
+
+            day += timedelta(weeks=1)
+
+    new_sessions = bulk_insert(Session, sessions(), batch_size)
+
+    def fill(capacity, is_past):
+        """
+        How many seats a class gets booked: older classes filled up.
+        """
+        share = rng.uniform(0.6, 1.1) if is_past else rng.uniform(0.1, 0.9)
+        return min(capacity, int(capacity * share))
+
+    def checked_in(start_date, is_past, is_active, rate):
+        if is_past and is_active and rng.random() < rate:
+            return start_date + timedelta(minutes=rng.randint(-20, 30))
+        return None
+
+    session_rows = list(
+        new_sessions.values_list(
+            'id',
+            'start_date',
+            'capacity',
+            'mentor_capacity',
+            'course__minimum_age',
+            'course__maximum_age',
+        )
+    )
+
+    def orders():
+        for session_id, start_date, capacity, mentor_capacity, minimum_age, maximum_age in session_rows:
+            is_past = start_date < now
+            students = eligible_students(start_date, minimum_age, maximum_age, fill(capacity, is_past))
+
+            for student_id, guardian_id in students:
+                is_active = rng.random() < 0.9
+                yield Order(
+                    session_id=session_id,
+                    student_id=student_id,
+                    guardian_id=guardian_id,
+                    is_active=is_active,
+                    ip='127.0.0.1',
+                    check_in=checked_in(start_date, is_past, is_active, 0.8),
+                    week_reminder_sent=is_past,
+                    day_reminder_sent=is_past,
+                )
+
+    counts['sessions'] = len(session_rows)
+    counts['orders'] = bulk_insert(Order, orders(), batch_size).count()
+
+    def mentor_orders():
+        for session_id, start_date, capacity, mentor_capacity, minimum_age, maximum_age in session_rows:
+            is_past = start_date < now
+
+            count = min(len(cleared_mentor_ids), fill(mentor_capacity, is_past))
+
+            for mentor_id in rng.sample(cleared_mentor_ids, count):
+                is_active = rng.random() < 0.92
+                yield MentorOrder(
+                    session_id=session_id,
+                    mentor_id=mentor_id,
+                    is_active=is_active,
+                    ip='127.0.0.1',
+                    check_in=checked_in(start_date, is_past, is_active, 0.85),
+                    week_reminder_sent=is_past,
+                    day_reminder_sent=is_past,
+                )
+
+    counts['mentor_orders'] = bulk_insert(MentorOrder, mentor_orders(), batch_size).count()
+
+    # Mentor meetings on weekday evenings.
+    def meetings():
+        day = first_day
+
+        while day <= last_day:
+            for n in range(meetings_per_month):
+                meeting_day = day + timedelta(days=rng.randint(0, 27))
+                meeting_day += timedelta(days=max(0, meeting_day.weekday() - 3))
+                start_date = local(meeting_day, 18)
+                yield Meeting(
+                    meeting_type=rng.choice(meeting_types),
+                    location=rng.choice(locations),
+                    start_date=start_date,
+                    end_date=start_date + timedelta(hours=2),
+                    is_active=True,
+                    is_public=True,
+                    announced_date=start_date - timedelta(weeks=2) if start_date < now else None,
+                )
+
+            day += timedelta(days=30)
+
+    meeting_rows = list(bulk_insert(Meeting, meetings(), batch_size).values_list('id', 'start_date'))
+    counts['meetings'] = len(meeting_rows)
+
+    def meeting_orders():
+        for meeting_id, start_date in meeting_rows:
+            is_past = start_date < now
+
+            for mentor_id in rng.sample(mentor_ids, min(len(mentor_ids), rng.randint(5, 25))):
+                yield MeetingOrder(
+                    meeting_id=meeting_id,
+                    mentor_id=mentor_id,
+                    ip='127.0.0.1',
+                    check_in=checked_in(start_date, is_past, True, 0.7),
+                    week_reminder_sent=is_past,
+                    day_reminder_sent=is_past,
+                )
+
+    counts['meeting_orders'] = bulk_insert(MeetingOrder, meeting_orders(), batch_size).count()
+
+    # A few families donate, mostly towards a class; so do some strangers.
+    past_session_ids = [row[0] for row in session_rows if row[1] < now] or [None]
+
+    def donations():
+        for user_id in guardian_user_ids:
+            if rng.random() < 0.04:
+                is_verified = rng.random() < 0.9
+                yield Donation(
+                    user_id=user_id,
+                    session_id=rng.choice(past_session_ids) if rng.random() < 0.7 else None,
+                    amount=weighted(rng, DONATION_AMOUNTS),
+                    is_verified=is_verified,
+                    receipt_sent=is_verified,
+                )
+
+        for n in range(len(guardian_user_ids) // 100):
+            first_name, last_name = name()
+            yield Donation(
+                first_name=first_name,
+                last_name=last_name,
+                email=f"{first_name}.{last_name}.{run}.donor.{n}@example.com".lower(),
+                referral_code=rng.choice([None, 'newsletter', 'gala']),
+                amount=weighted(rng, DONATION_AMOUNTS),
+                is_verified=True,
+                receipt_sent=True,
+            )
+
+    counts['donations'] = bulk_insert(Donation, donations(), batch_size).count()
+
+    def equipment_rows():
+        for n in range(equipment):
+            make, model = rng.choice(EQUIPMENT_MODELS)
+            yield Equipment(
+                uuid=str(uuid.UUID(int=rng.getrandbits(128))),
+                equipment_type=rng.choice(equipment_types),
+                make=make,
+                model=model,
+                asset_tag=f"WAC-{run}-{n:05d}",
+                acquisition_date=moment_between(local(first_day, 0), now),
+                condition=weighted(rng, [(Equipment.WORKING, 85), (Equipment.ISSUE, 10), (Equipment.UNUSABLE, 5)]),
+                last_system_update_check_in=moment_between(now - timedelta(days=60), now),
+            )
+
+    counts['equipment'] = bulk_insert(Equipment, equipment_rows(), batch_size).count()
+
+    reconcile_seat_counts()
+    rebuild_stats()
+
+    return counts
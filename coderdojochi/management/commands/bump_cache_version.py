@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from coderdojochi.cache import bump_deploy_version
+
+
+class Command(BaseCommand):
+    help = 'Start a new cache version, so processes started from now on ignore everything cached before.'
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Cache version is now {bump_deploy_version()}.")
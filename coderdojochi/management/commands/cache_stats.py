@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+
+from coderdojochi.cache import deploy_version, reset_stats, stats
+
+
+class Command(BaseCommand):
+    help = 'Show cache hits and misses per namespace since the last deploy.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--reset',
+            action='store_true',
+            help='Zero the counters after showing them.',
+        )
+
+    def handle(self, *args, **options):
+        self.stdout.write(f"Backend: {settings.CACHES['default']['BACKEND']}")
+        self.stdout.write(f"Version: {deploy_version()}")
+
+        if not settings.CACHE_STATS:
+            self.stdout.write('Counting is off (CACHE_STATS=False).')
+
+        for namespace, (hits, misses) in stats().items():
+            lookups = hits + misses
+            rate = f"{hits / lookups:.0%}" if lookups else '-'
+            self.stdout.write(f"{namespace:<20} {hits:>8} hits {misses:>8} misses {rate:>5}")
+
+        if options['reset']:
+            reset_stats()
+            self.stdout.write('Counters reset.')
@@ -0,0 +1,84 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from coderdojochi.fake_data import generate_fake_data
+
+
+class Command(BaseCommand):
+    help = 'Fill the database with a production-sized fake dataset for load testing and profiling.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--guardians',
+            type=int,
+            default=20000,
+            help='Families to create, each with one to four students.',
+        )
+        parser.add_argument(
+            '--mentors',
+            type=int,
+            default=2000,
+        )
+        parser.add_argument(
+            '--years',
+            type=int,
+            default=5,
+            help='Years of classes and meetings, up to two months from now.',
+        )
+        parser.add_argument(
+            '--sessions-per-week',
+            type=int,
+            default=4,
+            help='Weekend classes per week, besides summer camps.',
+        )
+        parser.add_argument(
+            '--meetings-per-month',
+            type=int,
+            default=2,
+        )
+        parser.add_argument(
+            '--equipment',
+            type=int,
+            default=250,
+        )
+        parser.add_argument(
+            '--password',
+            help='Password of every fake user. Unusable by default.',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=2000,
+            help='Rows per INSERT.',
+        )
+        parser.add_argument(
+            '--seed',
+            type=int,
+            default=0,
+        )
+        parser.add_argument(
+            '--force',
+            action='store_true',
+            help='Run even though DEBUG is off.',
+        )
+
+    def handle(self, *args, **options):
+        if not settings.DEBUG and not options['force']:
+            raise CommandError('DEBUG is off; is this a production database? Pass --force if not.')
+
+        counts = generate_fake_data(
+            guardians=options['guardians'],
+            mentors=options['mentors'],
+            years=options['years'],
+            sessions_per_week=options['sessions_per_week'],
+            meetings_per_month=options['meetings_per_month'],
+            equipment=options['equipment'],
+            password=options['password'],
+            batch_size=options['batch_size'],
+            seed=options['seed'],
+        )
+
+        for name, count in counts.items():
+            self.stdout.write(f"{name.replace('_', ' ').capitalize()}: {count}")
+
+        self.stdout.write(f"{sum(counts.values())} rows created.")
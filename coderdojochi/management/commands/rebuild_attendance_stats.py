@@ -0,0 +1,16 @@
+from django.core.management.base import BaseCommand
+
+from coderdojochi.models import AttendanceStat
+from coderdojochi.stats import rebuild_stats
+
+
+class Command(BaseCommand):
+    help = 'Recount the attendance and demographic stats shown on the CDC admin page.'
+
+    def handle(self, *args, **options):
+        totals = rebuild_stats()
+
+        self.stdout.write(
+            f"{totals[(AttendanceStat.ATTENDANCE, AttendanceStat.CHECKED_IN)]} of "
+            f"{totals[(AttendanceStat.ATTENDANCE, AttendanceStat.ORDERS)]} orders checked in."
+        )
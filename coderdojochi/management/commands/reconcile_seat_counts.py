@@ -0,0 +1,36 @@
+from django.core.management.base import BaseCommand
+
+from coderdojochi.seats import reconcile_seat_counts
+
+
+class Command(BaseCommand):
+    help = 'Recount the active students and mentors of each session and repair drifted counters.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--session',
+            type=int,
+            action='append',
+            dest='session_ids',
+            help='Only reconcile this session. May be repeated.',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without fixing it.',
+        )
+
+    def handle(self, *args, **options):
+        drifted = reconcile_seat_counts(
+            session_ids=options['session_ids'],
+            dry_run=options['dry_run'],
+        )
+
+        for session_id, (old_students, old_mentors), (students, mentors) in drifted:
+            self.stdout.write(
+                f"Session {session_id}: students {old_students} -> {students}, "
+                f"mentors {old_mentors} -> {mentors}"
+            )
+
+        action = 'found' if options['dry_run'] else 'fixed'
+        self.stdout.write(f"{len(drifted)} drifted sessions {action}.")
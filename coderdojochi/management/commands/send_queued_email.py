@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from coderdojochi.announcements import drain_announcements
+from coderdojochi.email_queue import drain_email_queue
+
+
+class Command(BaseCommand):
+    help = 'Send queued emails and session announcements.'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=100,
+            help='Number of jobs to claim at a time.',
+        )
+        parser.add_argument(
+            '--loop',
+            action='store_true',
+            help='Keep running, polling for new jobs.',
+        )
+        parser.add_argument(
+            '--interval',
+            type=float,
+            default=5,
+            help='Seconds to wait between polls when the queue is empty.',
+        )
+
+    def handle(self, *args, **options):
+        while True:
+            results = {
+                'emails': drain_email_queue(batch_size=options['batch_size']),
+                'announcements': drain_announcements(),
+            }
+
+            for name, stats in results.items():
+                if stats['sent'] or stats['failed'] or not options['loop']:
+                    self.stdout.write(
+                        f"{name}: {stats['sent']} sent, {stats['failed']} failed, "
+                        f"{stats['queries']} queries, {stats['duration']:.2f}s"
+                    )
+
+            if not options['loop']:
+                break
+
+            time.sleep(options['interval'])
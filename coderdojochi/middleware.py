@@ -1,4 +1,5 @@
 import logging
+import random
 import traceback
 
 from django.conf import settings
@@ -6,6 +7,8 @@ from django.shortcuts import render
 
 from sentry_sdk import last_event_id
 
+from coderdojochi.timing import RequestTimer, instrument_templates
+
 logger = logging.getLogger(__name__)
 
 
@@ -26,3 +29,26 @@ class HandleExceptionMiddleware:
             'sentry_event_id': last_event_id(),
             'SENTRY_DSN': settings.SENTRY_DSN,
         }, status=500)
+
+
+class RequestTimingMiddleware:
+    """
+    Time each request and log it, see coderdojochi.timing.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        instrument_templates()
+
+    def __call__(self, request):
+        timer = RequestTimer(sampled=random.random() < settings.REQUEST_TIMING_SAMPLE_RATE)
+
+        with timer.measure():
+            response = self.get_response(request)
+
+        if timer.sampled and settings.REQUEST_TIMING_HEADER:
+            response['Server-Timing'] = timer.server_timing()
+
+        timer.log(request, response)
+
+        return response
@@ -0,0 +1,43 @@
+# Generated by Django 3.1 on 2026-10-18 17:29
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0035_auto_20200811_2046'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ReminderOutbox',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('kind', models.CharField(choices=[('guardian_week', 'Guardian one week'), ('guardian_day', 'Guardian 24 hour')], max_length=20)),
+                ('recipient', models.EmailField(max_length=254)),
+                ('merge_data', models.JSONField(default=dict)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveIntegerField(default=0)),
+                ('claimed_at', models.DateTimeField(blank=True, null=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('last_error', models.TextField(blank=True, null=True)),
+                ('order', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.order')),
+            ],
+            options={
+                'verbose_name': 'reminder',
+                'verbose_name_plural': 'reminder outbox',
+            },
+        ),
+        migrations.AddIndex(
+            model_name='reminderoutbox',
+            index=models.Index(fields=['status', 'id'], name='coderdojoch_status_3c2f39_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderoutbox',
+            constraint=models.UniqueConstraint(fields=('order', 'kind'), name='unique_reminder_per_order'),
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 3.1 on 2026-10-18 17:30
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0036_reminderoutbox'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='reminderoutbox',
+            name='mentor_order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.mentororder'),
+        ),
+        migrations.AlterField(
+            model_name='reminderoutbox',
+            name='kind',
+            field=models.CharField(choices=[('guardian_week', 'Guardian one week'), ('guardian_day', 'Guardian 24 hour'), ('mentor_week', 'Mentor one week'), ('mentor_day', 'Mentor 24 hour')], max_length=20),
+        ),
+        migrations.AlterField(
+            model_name='reminderoutbox',
+            name='order',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.order'),
+        ),
+        migrations.AddConstraint(
+            model_name='reminderoutbox',
+            constraint=models.UniqueConstraint(fields=('mentor_order', 'kind'), name='unique_reminder_per_mentor_order'),
+        ),
+    ]
@@ -0,0 +1,36 @@
+# Generated by Django 3.1 on 2026-10-18 17:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0039_announcement'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AttendanceStat',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('dimension', models.CharField(choices=[('attendance', 'Attendance'), ('gender', 'Gender'), ('age', 'Age')], max_length=20)),
+                ('key', models.CharField(max_length=20)),
+                ('count', models.IntegerField(default=0)),
+                ('session', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.session')),
+            ],
+            options={
+                'verbose_name': 'attendance stat',
+                'verbose_name_plural': 'attendance stats',
+            },
+        ),
+        migrations.AddConstraint(
+            model_name='attendancestat',
+            constraint=models.UniqueConstraint(condition=models.Q(session__isnull=False), fields=('session', 'dimension', 'key'), name='unique_session_attendance_stat'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancestat',
+            constraint=models.UniqueConstraint(condition=models.Q(session__isnull=True), fields=('dimension', 'key'), name='unique_global_attendance_stat'),
+        ),
+    ]
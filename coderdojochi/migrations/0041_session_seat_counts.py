@@ -0,0 +1,43 @@
+# Generated by Django 3.1 on 2026-10-18 17:58
+
+from django.db import migrations, models
+from django.db.models import Count, IntegerField, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_seats(apps, schema_editor):
+    Session = apps.get_model('coderdojochi', 'Session')
+
+    for field, model_name in (
+        ('active_student_count', 'Order'),
+        ('active_mentor_count', 'MentorOrder'),
+    ):
+        orders = apps.get_model('coderdojochi', model_name).objects.filter(
+            session=OuterRef('pk'),
+            is_active=True,
+        ).values('session').annotate(count=Count('id')).values('count')
+
+        Session.objects.update(**{
+            field: Coalesce(Subquery(orders, output_field=IntegerField()), 0),
+        })
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0040_attendancestat'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='session',
+            name='active_mentor_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.AddField(
+            model_name='session',
+            name='active_student_count',
+            field=models.IntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(count_seats, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,51 @@
+# Generated by Django 3.1 on 2026-10-18 18:03
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def copy_waitlists(apps, schema_editor):
+    Session = apps.get_model('coderdojochi', 'Session')
+    WaitlistEntry = apps.get_model('coderdojochi', 'WaitlistEntry')
+
+    WaitlistEntry.objects.bulk_create([
+        WaitlistEntry(session_id=row.session_id, student_id=row.student_id, guardian_id=row.student.guardian_id)
+        for row in Session.waitlist_students.through.objects.select_related('student')
+    ])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0041_session_seat_counts'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='WaitlistEntry',
+            fields=[
+                ('id', models.AutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('status', models.CharField(choices=[('waiting', 'Waiting'), ('held', 'Seat held'), ('enrolled', 'Enrolled'), ('expired', 'Hold expired')], default='waiting', max_length=20)),
+                ('held_until', models.DateTimeField(blank=True, null=True)),
+                ('guardian', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.guardian')),
+                ('session', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.session')),
+                ('student', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.student')),
+            ],
+            options={
+                'verbose_name': 'waitlist entry',
+                'verbose_name_plural': 'waitlist entries',
+                'ordering': ['created_at', 'id'],
+            },
+        ),
+        migrations.AddIndex(
+            model_name='waitlistentry',
+            index=models.Index(fields=['status', 'session'], name='coderdojoch_status_6b0f58_idx'),
+        ),
+        migrations.AddConstraint(
+            model_name='waitlistentry',
+            constraint=models.UniqueConstraint(fields=('session', 'student'), name='unique_waitlist_entry'),
+        ),
+        migrations.RunPython(copy_waitlists, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 3.1 on 2026-10-18 18:44
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0042_waitlistentry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='cdcuser',
+            name='calendar_feed_key',
+            field=models.CharField(blank=True, default='', editable=False, max_length=32),
+        ),
+    ]
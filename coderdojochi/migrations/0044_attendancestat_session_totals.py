@@ -0,0 +1,37 @@
+# Generated by Django 3.1 on 2026-10-18 19:40
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+def delete_global_stats(apps, schema_editor):
+    AttendanceStat = apps.get_model('coderdojochi', 'AttendanceStat')
+    AttendanceStat.objects.filter(session__isnull=True).delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('coderdojochi', '0043_cdcuser_calendar_feed_key'),
+    ]
+
+    operations = [
+        migrations.RemoveConstraint(
+            model_name='attendancestat',
+            name='unique_global_attendance_stat',
+        ),
+        migrations.RemoveConstraint(
+            model_name='attendancestat',
+            name='unique_session_attendance_stat',
+        ),
+        migrations.RunPython(delete_global_stats, migrations.RunPython.noop),
+        migrations.AlterField(
+            model_name='attendancestat',
+            name='session',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, to='coderdojochi.session'),
+        ),
+        migrations.AddConstraint(
+            model_name='attendancestat',
+            constraint=models.UniqueConstraint(fields=('session', 'dimension', 'key'), name='unique_session_attendance_stat'),
+        ),
+    ]
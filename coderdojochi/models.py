@@ -1,8 +1,10 @@
 import os
+import secrets
 from datetime import timedelta
 
 from django.contrib.auth.models import AbstractUser
 from django.contrib.contenttypes.models import ContentType
+from django.core.serializers.json import DjangoJSONEncoder
 from django.core.validators import MaxValueValidator, MinValueValidator
 from django.db import models
 from django.template.defaultfilters import slugify
@@ -42,10 +44,22 @@ class CDCUser(AbstractUser):
         null=True,
     )
 
+    # Signed into the calendar feed URL; changing it revokes the old URL.
+    calendar_feed_key = models.CharField(
+        max_length=32,
+        blank=True,
+        default='',
+        editable=False,
+    )
+
     @cached_property
     def name(self):
         return f"{self.first_name} {self.last_name}"
 
+    def reset_calendar_feed_key(self):
+        self.calendar_feed_key = secrets.token_urlsafe(16)
+        self.save(update_fields=['calendar_feed_key'])
+
     def save(self, *args, **kwargs):
         if self.pk is None:
             self.last_login = timezone.now()
@@ -271,6 +285,10 @@ class Guardian(CommonInfo):
 
 
 class Student(CommonInfo):
+    # Free-text genders counted as male or female by get_clean_gender.
+    MALE_GENDERS = ['male', 'm', 'boy', 'nino', 'masculino']
+    FEMALE_GENDERS = ['female', 'f', 'girl', 'femail', 'femal', 'femenino']
+
     guardian = models.ForeignKey(
         Guardian,
         on_delete=models.CASCADE,
@@ -358,22 +376,27 @@ class Student(CommonInfo):
         return is_registered
 
     def get_age(self, date=timezone.now()):
-        return date.year - self.birthday.year - (
-            (date.month, date.day) < (self.birthday.month, self.birthday.day)
-        )
+        return self.age_on(self.birthday, date)
     get_age.short_description = 'Age'
 
     def get_clean_gender(self):
-        MALE = ['male', 'm', 'boy', 'nino', 'masculino']
-        FEMALE = ['female', 'f', 'girl', 'femail', 'femal', 'femenino']
+        return self.clean_gender(self.gender)
+    get_clean_gender.short_description = 'Clean Gender'
 
-        if self.gender.lower() in MALE:
+    @classmethod
+    def clean_gender(cls, gender):
+        if gender.lower() in cls.MALE_GENDERS:
             return 'male'
-        elif self.gender.lower() in FEMALE:
+        elif gender.lower() in cls.FEMALE_GENDERS:
             return 'female'
         else:
             return 'other'
-    get_clean_gender.short_description = 'Clean Gender'
+
+    @staticmethod
+    def age_on(birthday, date):
+        return date.year - birthday.year - (
+            (date.month, date.day) < (birthday.month, birthday.day)
+        )
 
     # returns True if the student age is between minimum_age and maximum_age
     def is_within_age_range(self, minimum_age, maximum_age, date=timezone.now()):
@@ -524,6 +547,11 @@ class Session(CommonInfo):
         (FEMALE, 'Female'),
     )
 
+    SEAT_COUNTER_FIELDS = (
+        'active_student_count',
+        'active_mentor_count',
+    )
+
     course = models.ForeignKey(
         Course,
         on_delete=models.CASCADE,
@@ -547,6 +575,17 @@ class Session(CommonInfo):
         null=True,
     )
 
+    # Active orders, kept current by the order signals (see coderdojochi.seats).
+    active_student_count = models.IntegerField(
+        default=0,
+        editable=False,
+    )
+
+    active_mentor_count = models.IntegerField(
+        default=0,
+        editable=False,
+    )
+
     instructor = models.ForeignKey(
         Mentor,
         on_delete=models.CASCADE,
@@ -735,6 +774,13 @@ class Session(CommonInfo):
         if self.mentor_capacity is None:
             self.mentor_capacity = int(self.capacity / 2)
 
+        # The seat counters move with F() updates; never write back a stale copy.
+        if self.pk and not self._state.adding and not args and not kwargs:
+            kwargs['update_fields'] = [
+                field.name for field in self._meta.concrete_fields
+                if not field.primary_key and field.name not in self.SEAT_COUNTER_FIELDS
+            ]
+
         super(Session, self).save(*args, **kwargs)
 
     def get_absolute_url(self):
@@ -1446,3 +1492,363 @@ class PartnerPasswordAccess(CommonInfo):
     class Meta:
         verbose_name = _("partner_password_access")
         db_table = _("partner_password_access")
+
+
+class ReminderOutbox(CommonInfo):
+    GUARDIAN_WEEK = 'guardian_week'
+    GUARDIAN_DAY = 'guardian_day'
+    MENTOR_WEEK = 'mentor_week'
+    MENTOR_DAY = 'mentor_day'
+
+    KIND_CHOICES = [
+        (GUARDIAN_WEEK, 'Guardian one week'),
+        (GUARDIAN_DAY, 'Guardian 24 hour'),
+        (MENTOR_WEEK, 'Mentor one week'),
+        (MENTOR_DAY, 'Mentor 24 hour'),
+    ]
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    order = models.ForeignKey(
+        Order,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+
+    mentor_order = models.ForeignKey(
+        MentorOrder,
+        on_delete=models.CASCADE,
+        blank=True,
+        null=True,
+    )
+
+    kind = models.CharField(
+        max_length=20,
+        choices=KIND_CHOICES,
+    )
+
+    recipient = models.EmailField()
+
+    merge_data = models.JSONField(
+        default=dict,
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = _("reminder")
+        verbose_name_plural = _("reminder outbox")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['order', 'kind'],
+                name='unique_reminder_per_order',
+            ),
+            models.UniqueConstraint(
+                fields=['mentor_order', 'kind'],
+                name='unique_reminder_per_mentor_order',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.recipient} | {self.get_kind_display()} | {self.status}"
+
+
+class EmailJob(CommonInfo):
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    template_name = models.CharField(
+        max_length=255,
+    )
+
+    # Keyword arguments for coderdojochi.util.email.
+    payload = models.JSONField(
+        default=dict,
+        encoder=DjangoJSONEncoder,
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = _("email job")
+        verbose_name_plural = _("email queue")
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.template_name} | {self.status}"
+
+
+class Announcement(CommonInfo):
+    MENTORS = 'mentors'
+    GUARDIANS = 'guardians'
+
+    AUDIENCE_CHOICES = [
+        (MENTORS, 'Mentors'),
+        (GUARDIANS, 'Guardians'),
+    ]
+
+    PENDING = 'pending'
+    SENDING = 'sending'
+    SENT = 'sent'
+    FAILED = 'failed'
+
+    STATUS_CHOICES = [
+        (PENDING, 'Pending'),
+        (SENDING, 'Sending'),
+        (SENT, 'Sent'),
+        (FAILED, 'Failed'),
+    ]
+
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+    )
+
+    audience = models.CharField(
+        max_length=10,
+        choices=AUDIENCE_CHOICES,
+    )
+
+    status = models.CharField(
+        max_length=10,
+        choices=STATUS_CHOICES,
+        default=PENDING,
+    )
+
+    queued = models.PositiveIntegerField(
+        default=0,
+        help_text="Recipients when the announcement was queued.",
+    )
+
+    sent = models.PositiveIntegerField(
+        default=0,
+    )
+
+    failed = models.PositiveIntegerField(
+        default=0,
+    )
+
+    # Recipients are sent to in user id order; this is the last one done, so
+    # a job picked up again after a crash carries on where it stopped.
+    last_recipient_id = models.PositiveIntegerField(
+        default=0,
+    )
+
+    attempts = models.PositiveIntegerField(
+        default=0,
+    )
+
+    claimed_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    sent_at = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    last_error = models.TextField(
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = _("announcement")
+        verbose_name_plural = _("announcements")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'audience'],
+                name='unique_announcement_per_session',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.session} | {self.get_audience_display()} | {self.status}"
+
+    @property
+    def progress(self):
+        if not self.queued:
+            return 100 if self.status == self.SENT else 0
+
+        return min(100, round((self.sent + self.failed) * 100 / self.queued))
+
+
+class AttendanceStat(models.Model):
+    ATTENDANCE = 'attendance'
+    GENDER = 'gender'
+    AGE = 'age'
+
+    DIMENSION_CHOICES = [
+        (ATTENDANCE, 'Attendance'),
+        (GENDER, 'Gender'),
+        (AGE, 'Age'),
+    ]
+
+    # Keys for the attendance dimension.
+    ORDERS = 'orders'
+    CHECKED_IN = 'checked_in'
+
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+    )
+
+    dimension = models.CharField(
+        max_length=20,
+        choices=DIMENSION_CHOICES,
+    )
+
+    key = models.CharField(
+        max_length=20,
+    )
+
+    count = models.IntegerField(
+        default=0,
+    )
+
+    class Meta:
+        verbose_name = _("attendance stat")
+        verbose_name_plural = _("attendance stats")
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'dimension', 'key'],
+                name='unique_session_attendance_stat',
+            ),
+        ]
+
+    def __str__(self):
+        return f"{self.session_id} | {self.dimension} | {self.key}: {self.count}"
+
+
+class WaitlistEntry(CommonInfo):
+    WAITING = 'waiting'
+    HELD = 'held'
+    ENROLLED = 'enrolled'
+    EXPIRED = 'expired'
+
+    STATUS_CHOICES = [
+        (WAITING, 'Waiting'),
+        (HELD, 'Seat held'),
+        (ENROLLED, 'Enrolled'),
+        (EXPIRED, 'Hold expired'),
+    ]
+
+    session = models.ForeignKey(
+        Session,
+        on_delete=models.CASCADE,
+    )
+
+    student = models.ForeignKey(
+        Student,
+        on_delete=models.CASCADE,
+    )
+
+    guardian = models.ForeignKey(
+        Guardian,
+        on_delete=models.CASCADE,
+    )
+
+    status = models.CharField(
+        max_length=20,
+        choices=STATUS_CHOICES,
+        default=WAITING,
+    )
+
+    # While HELD, a seat is kept for the student until then.
+    held_until = models.DateTimeField(
+        blank=True,
+        null=True,
+    )
+
+    class Meta:
+        verbose_name = _("waitlist entry")
+        verbose_name_plural = _("waitlist entries")
+        # First come, first promoted.
+        ordering = ['created_at', 'id']
+        constraints = [
+            models.UniqueConstraint(
+                fields=['session', 'student'],
+                name='unique_waitlist_entry',
+            ),
+        ]
+        indexes = [
+            models.Index(fields=['status', 'session']),
+        ]
+
+    def __str__(self):
+        return f"{self.student.first_name} {self.student.last_name} | {self.session} | {self.status}"
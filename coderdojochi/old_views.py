@@ -1,9 +1,7 @@
 import calendar
 import logging
 import operator
-from collections import Counter
 from datetime import date, timedelta
-from functools import reduce
 
 from django.conf import settings
 from django.contrib import messages
@@ -11,7 +9,7 @@ from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
 from django.core.exceptions import ObjectDoesNotExist
 from django.core.mail import EmailMultiAlternatives, get_connection
-from django.db.models import Case, Count, IntegerField, When
+from django.db.models import Case, Count, IntegerField, Q, When
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
@@ -21,10 +19,11 @@ from django.views.decorators.cache import never_cache
 from django.views.decorators.csrf import csrf_exempt
 from django.views.generic import TemplateView
 
-import arrow
 from dateutil.relativedelta import relativedelta
 from icalendar import Calendar, Event, vText
 
+from coderdojochi.announcements import queue_announcement
+from coderdojochi.check_in import session_check_in_orders
 from coderdojochi.forms import (
     CDCModelForm,
     ContactForm,
@@ -34,6 +33,8 @@ from coderdojochi.forms import (
     StudentForm,
 )
 from coderdojochi.models import (
+    Announcement,
+    AttendanceStat,
     Donation,
     Equipment,
     EquipmentType,
@@ -47,6 +48,7 @@ from coderdojochi.models import (
     Session,
     Student,
 )
+from coderdojochi.stats import age_counts, gender_counts, global_stats
 from coderdojochi.util import email
 
 logger = logging.getLogger(__name__)
@@ -102,6 +104,8 @@ def mentors(request, template_name="mentors.html"):
         is_public=True,
         background_check=True,
         avatar_approved=True,
+    ).select_related(
+        'user',
     ).order_by('user__date_joined')
 
     # mentors = Mentor.objects.filter(
@@ -279,18 +283,30 @@ def cdc_admin(request, template_name="admin.html"):
         )
         return redirect('weallcode-home')
 
-    sessions = Session.objects.select_related().annotate(
+    # Orders and mentor orders are both joined, so count distinct rows.
+    sessions = Session.objects.select_related(
+        'course',
+        'location',
+        'instructor__user',
+    ).annotate(
         num_orders=Count(
-            'order'
+            'order',
+            distinct=True,
         ),
 
         num_attended=Count(
-            Case(
-                When(
-                    order__check_in__isnull=False,
-                    then=1
-                )
-            )
+            'order',
+            filter=Q(order__check_in__isnull=False),
+            distinct=True,
+        ),
+
+        num_mentors_attended=Count(
+            'mentororder',
+            filter=Q(
+                mentororder__is_active=True,
+                mentororder__check_in__isnull=False,
+            ),
+            distinct=True,
         ),
 
         is_future=Case(
@@ -332,54 +348,43 @@ def cdc_admin(request, template_name="admin.html"):
         '-start_date'
     )
 
-    orders = Order.objects.select_related()
+    announcements = Announcement.objects.select_related(
+        'session__course',
+    ).order_by(
+        '-created_at',
+    )[:10]
 
-    total_past_orders = orders.filter(is_active=True)
-    total_past_orders_count = total_past_orders.count()
-    total_checked_in_orders = orders.filter(
-        is_active=True,
-        check_in__isnull=False
-    )
-    total_checked_in_orders_count = total_checked_in_orders.count()
+    # Kept up to date as orders change, see coderdojochi.stats.
+    stats = global_stats()
+
+    total_past_orders_count = stats[AttendanceStat.ATTENDANCE].get(AttendanceStat.ORDERS, 0)
+    total_checked_in_orders_count = stats[AttendanceStat.ATTENDANCE].get(AttendanceStat.CHECKED_IN, 0)
 
     # Genders
-    gender_count = list(
-        Counter(
-            e.student.get_clean_gender() for e in total_checked_in_orders
-        ).items()
-    )
     gender_count = sorted(
-        list(dict(gender_count).items()),
+        stats[AttendanceStat.GENDER].items(),
         key=operator.itemgetter(1)
     )
 
     # Ages
-    ages = sorted(
-        list(
-            e.student.get_age(e.session.start_date) for e in total_checked_in_orders
-        )
-    )
     age_count = sorted(
-        list(dict(
-            list(
-                Counter(ages).items()
-            )
-        ).items()),
-        key=operator.itemgetter(0)
+        (int(age), count) for age, count in stats[AttendanceStat.AGE].items()
     )
 
     # Average Age
+    students = sum(count for age, count in age_count)
     average_age = int(
         round(
-            sum(ages) / float(len(ages))
+            sum(age * count for age, count in age_count) / float(students)
         )
-    )
+    ) if students else 0
 
     return render(
         request,
         template_name,
         {
             'age_count': age_count,
+            'announcements': announcements,
             'average_age': average_age,
             'gender_count': gender_count,
             'meetings': meetings,
@@ -408,67 +413,44 @@ def session_stats(request, pk, template_name="session-stats.html"):
         )
         return redirect('weallcode-home')
 
-    session_obj = get_object_or_404(Session, pk=pk)
-
-    current_orders_checked_in = session_obj.get_current_orders(
-        checked_in=True
+    session_obj = get_object_or_404(
+        Session.objects.select_related('course'),
+        pk=pk,
     )
 
-    students_checked_in = current_orders_checked_in.values('student')
+    current_orders = session_obj.get_current_orders()
+
+    orders = list(current_orders.select_related(
+        'student',
+        'guardian__user',
+    ))
+    checked_in_count = sum(1 for order in orders if order.check_in)
 
-    if students_checked_in:
+    if checked_in_count:
         attendance_percentage = round(
-            (
-                float(current_orders_checked_in.count()) /
-                float(session_obj.get_current_students().count())
-            ) * 100
+            (float(checked_in_count) / float(len(orders))) * 100
         )
 
     else:
         attendance_percentage = False
 
     # Genders
-    gender_count = list(
-        Counter(
-            e.student.get_clean_gender()
-            for e in session_obj.get_current_orders()
-        ).items()
-    )
-
-    gender_count = sorted(
-        list(dict(gender_count).items()),
-        key=operator.itemgetter(1)
-    )
+    gender_count = gender_counts(current_orders)
 
-    # Ages
-    ages = sorted(
-        list(
-            e.student.get_age(e.session.start_date) for e in session_obj.get_current_orders()
-        )
-    )
+    # Ages, as of the class
+    ages = age_counts(current_orders)
 
     age_count = sorted(
-        list(dict(
-            list(
-                Counter(ages).items()
-            )
-        ).items()),
+        [(age, count) for age, count, checked_in in ages],
         key=operator.itemgetter(1)
     )
 
-    # Average Age
+    # Average age of the students who came
     average_age = False
-    if current_orders_checked_in:
-        student_ages = []
-        for order in current_orders_checked_in:
-            student_ages.append(order.student.get_age(order.session.start_date))
-
+    if checked_in_count:
         average_age = (
-            reduce(
-                lambda x, y: x + y,
-                student_ages
-            ) /
-            len(student_ages)
+            sum(age * checked_in for age, count, checked_in in ages) /
+            sum(checked_in for age, count, checked_in in ages)
         )
 
     return render(
@@ -476,7 +458,8 @@ def session_stats(request, pk, template_name="session-stats.html"):
         template_name,
         {
             'session': session_obj,
-            'students_checked_in': students_checked_in,
+            'orders': orders,
+            'checked_in_count': checked_in_count,
             'attendance_percentage': attendance_percentage,
             'average_age': average_age,
             'age_count': age_count,
@@ -500,7 +483,7 @@ def session_check_in(request, pk, template_name="session-check-in.html"):
     if request.method == 'POST':
         if 'order_id' in request.POST:
             order = get_object_or_404(
-                Order,
+                Order.objects.select_related('guardian__user'),
                 id=request.POST['order_id']
             )
 
@@ -527,99 +510,25 @@ def session_check_in(request, pk, template_name="session-check-in.html"):
     # Active Session
     active_session = True if timezone.now() < session.end_date else False
 
-    # get the orders
-    orders = Order.objects.select_related().filter(session_id=pk).annotate(
-        num_attended=Count(
-            Case(
-                When(
-                    student__order__check_in__isnull=False,
-                    then=1
-                )
-            )
-        ),
-        num_missed=Count(
-            Case(
-                When(
-                    student__order__check_in__isnull=True,
-                    then=1
-                )
-            )
-        )
-    )
+    orders = session_check_in_orders(session, active_session)
 
+    # Genders and ages of the students listed, counted in the database.
     if active_session:
-        active_orders = orders.filter(
-            is_active=True
-        ).order_by(
-            'student__first_name'
-        )
-
+        listed_orders = session.get_current_orders()
     else:
-        active_orders = orders.filter(
-            is_active=True,
-            check_in__isnull=False
-        ).order_by(
-            'student__first_name'
-        )
-
-    inactive_orders = orders.filter(
-        is_active=False
-    ).order_by('-updated_at')
-
-    no_show_orders = orders.filter(
-        is_active=True,
-        check_in__isnull=True
-    )
-
-    checked_in_orders = orders.filter(
-        is_active=True,
-        check_in__isnull=False
-    )
-
-    # Genders
-    gender_count = sorted(
-        list(dict(
-            list(
-                Counter(
-                    e.student.get_clean_gender() for e in active_orders
-                ).items()
-            )
-        ).items()),
-        key=operator.itemgetter(1)
-    )
+        listed_orders = session.get_current_orders(checked_in=True)
 
-    # Ages
-    ages = sorted(
-        list(
-            e.student.get_age(e.session.start_date) for e in active_orders
-        )
-    )
+    gender_count = gender_counts(listed_orders)
 
-    age_count = sorted(
-        list(dict(
-            list(
-                Counter(ages).items()
-            )
-        ).items()),
-        key=operator.itemgetter(0)
-    )
-
-    # age_count = sorted(
-    #     dict(
-    #         list(
-    #             Counter(ages).items()
-    #         )
-    #     ).items(),
-    #     key=operator.itemgetter(1),
-    #     reverse=True
-    # )
+    age_count = [(age, count) for age, count, checked_in in age_counts(listed_orders)]
 
     # Average Age
+    students = sum(count for age, count in age_count)
     average_age = int(
         round(
-            sum(ages) / float(len(ages))
+            sum(age * count for age, count in age_count) / float(students)
         )
-    ) if orders and ages else 0
+    ) if students else 0
 
     return render(
         request,
@@ -627,13 +536,10 @@ def session_check_in(request, pk, template_name="session-check-in.html"):
         {
             'session': session,
             'active_session': active_session,
-            'active_orders': active_orders,
-            'inactive_orders': inactive_orders,
-            'no_show_orders': no_show_orders,
             'gender_count': gender_count,
             'age_count': age_count,
             'average_age': average_age,
-            'checked_in_orders': checked_in_orders,
+            **orders,
         }
     )
 
@@ -835,62 +741,20 @@ def session_announce_mentors(request, pk):
             request,
             'You do not have permission to access this page.'
         )
-        return redirect('home')
+        return redirect('weallcode-home')
 
     session_obj = get_object_or_404(Session, pk=pk)
 
     if not session_obj.announced_date_mentors:
-        merge_data = {}
-        merge_global_data = {
-            'class_code': session_obj.course.code,
-            'class_title': session_obj.course.title,
-            'class_description': session_obj.course.description,
-            'class_start_date': arrow.get(session_obj.mentor_start_date).to('local').format('dddd, MMMM D, YYYY'),
-            'class_start_time': arrow.get(session_obj.mentor_start_date).to('local').format('h:mma'),
-            'class_end_date': arrow.get(session_obj.end_date).to('local').format('dddd, MMMM D, YYYY'),
-            'class_end_time': arrow.get(session_obj.end_date).to('local').format('h:mma'),
-            'minimum_age': session_obj.minimum_age,
-            'maximum_age': session_obj.maximum_age,
-            'class_location_name': session_obj.location.name,
-            'class_location_address': session_obj.location.address,
-            'class_location_city': session_obj.location.city,
-            'class_location_state': session_obj.location.state,
-            'class_location_zip': session_obj.location.zip,
-            'class_additional_info': session_obj.additional_info,
-            'class_url': f"{settings.SITE_URL}{session_obj.get_absolute_url()}",
-            'class_calendar_url': f"{settings.SITE_URL}{session_obj.get_calendar_url()}",
-        }
-        recipients = []
-
-        # send mentor announcements
-        mentors = Mentor.objects.filter(
-            is_active=True,
-            user__is_active=True,
-        )
-
-        for mentor in mentors:
-            recipients.append(mentor.user.email)
-            merge_data[mentor.user.email] = {
-                'first_name': mentor.user.first_name,
-                'last_name': mentor.user.last_name,
-            }
-
-        email(
-            subject='New We All Code class date announced! Come mentor!',
-            template_name='class-announcement-mentor',
-            merge_data=merge_data,
-            merge_global_data=merge_global_data,
-            recipients=recipients,
-            preheader='Help us make a huge difference! A brand new class was just announced.',
-            unsub_group_id=settings.SENDGRID_UNSUB_CLASSANNOUNCE,
-        )
+        # Sent by the email worker; progress shows on the CDC admin page.
+        announcement, created = queue_announcement(session_obj, Announcement.MENTORS)
 
         session_obj.announced_date_mentors = timezone.now()
         session_obj.save()
 
         messages.success(
             request,
-            f'Session announced to {mentors.count()} mentors.'
+            f'Session announcement queued for {announcement.queued} mentors.'
         )
 
     else:
@@ -909,61 +773,20 @@ def session_announce_guardians(request, pk):
             request,
             'You do not have permission to access this page.'
         )
-        return redirect('home')
+        return redirect('weallcode-home')
 
     session_obj = get_object_or_404(Session, pk=pk)
 
     if not session_obj.announced_date_guardians:
-        merge_data = {}
-        merge_global_data = {
-            'class_code': session_obj.course.code,
-            'class_title': session_obj.course.title,
-            'class_description': session_obj.course.description,
-            'class_start_date': arrow.get(session_obj.start_date).to('local').format('dddd, MMMM D, YYYY'),
-            'class_start_time': arrow.get(session_obj.start_date).to('local').format('h:mma'),
-            'class_end_date': arrow.get(session_obj.end_date).to('local').format('dddd, MMMM D, YYYY'),
-            'class_end_time': arrow.get(session_obj.end_date).to('local').format('h:mma'),
-            'minimum_age': session_obj.minimum_age,
-            'maximum_age': session_obj.maximum_age,
-            'class_location_name': session_obj.location.name,
-            'class_location_address': session_obj.location.address,
-            'class_location_city': session_obj.location.city,
-            'class_location_state': session_obj.location.state,
-            'class_location_zip': session_obj.location.zip,
-            'class_additional_info': session_obj.additional_info,
-            'class_url': f"{settings.SITE_URL}{session_obj.get_absolute_url()}",
-            'class_calendar_url': f"{settings.SITE_URL}{session_obj.get_calendar_url()}",
-        }
-        recipients = []
-
-        guardians = Guardian.objects.filter(
-            is_active=True,
-            user__is_active=True,
-        )
-
-        for guardian in guardians:
-            recipients.append(guardian.user.email)
-            merge_data[guardian.user.email] = {
-                'first_name': guardian.user.first_name,
-                'last_name': guardian.user.last_name,
-            }
-
-        email(
-            subject='New We All Code class date announced!',
-            template_name='class-announcement-guardian',
-            merge_data=merge_data,
-            merge_global_data=merge_global_data,
-            recipients=recipients,
-            preheader="We're super excited to bring you another class date. Sign up to reserve your spot",
-            unsub_group_id=settings.SENDGRID_UNSUB_CLASSANNOUNCE,
-        )
+        # Sent by the email worker; progress shows on the CDC admin page.
+        announcement, created = queue_announcement(session_obj, Announcement.GUARDIANS)
 
         session_obj.announced_date_guardians = timezone.now()
         session_obj.save()
 
         messages.success(
             request,
-            f'Session announced to {guardians.count()} guardians!'
+            f'Session announcement queued for {announcement.queued} guardians!'
         )
 
     else:
@@ -0,0 +1,86 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Case, F, Q, Value, When
+from django.utils import timezone
+
+# Give up on an outbox row after this many send attempts.
+MAX_ATTEMPTS = 5
+
+# A row still marked `sending` after this long belongs to a run that died.
+CLAIM_TIMEOUT = timedelta(minutes=30)
+
+
+def claim_rows(model, after_id, batch_size, **filters):
+    """
+    Mark the next batch of sendable `model` rows as ours. Rows locked by a
+    concurrent run are skipped, and rows left in `sending` by a run that died
+    are picked up again once their claim is older than `CLAIM_TIMEOUT`, or
+    marked failed if that was their last attempt.
+
+    `model` is any outbox model with the `status`, `attempts` and `claimed_at`
+    fields and the PENDING/SENDING/SENT/FAILED statuses.
+    """
+    now = timezone.now()
+    stale = Q(status=model.SENDING, claimed_at__lt=now - CLAIM_TIMEOUT)
+
+    with transaction.atomic():
+        model.objects.filter(
+            stale,
+            attempts__gte=MAX_ATTEMPTS,
+            **filters,
+        ).update(
+            status=model.FAILED,
+            last_error='Abandoned while sending on the last attempt.',
+            updated_at=now,
+        )
+
+        rows = list(
+            model.objects.select_for_update(
+                skip_locked=True,
+            ).filter(
+                Q(status=model.PENDING) | stale,
+                id__gt=after_id,
+                attempts__lt=MAX_ATTEMPTS,
+                **filters,
+            ).order_by('id')[:batch_size]
+        )
+
+        model.objects.filter(
+            id__in=[row.id for row in rows],
+        ).update(
+            status=model.SENDING,
+            claimed_at=now,
+            attempts=F('attempts') + 1,
+            updated_at=now,
+        )
+
+    for row in rows:
+        row.attempts += 1
+
+    return rows
+
+
+def mark_sent(model, ids):
+    now = timezone.now()
+
+    model.objects.filter(id__in=ids).update(
+        status=model.SENT,
+        sent_at=now,
+        updated_at=now,
+    )
+
+
+def mark_failed(model, ids, error):
+    """
+    Put rows back in the queue after a failed send, or give up on those that
+    have used all their attempts.
+    """
+    model.objects.filter(id__in=ids).update(
+        status=Case(
+            When(attempts__gte=MAX_ATTEMPTS, then=Value(model.FAILED)),
+            default=Value(model.PENDING),
+        ),
+        last_error=str(error),
+        updated_at=timezone.now(),
+    )
@@ -0,0 +1,345 @@
+import logging
+from collections import OrderedDict
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.utils import timezone
+
+import arrow
+
+from coderdojochi.models import MentorOrder, Order, ReminderOutbox, Session
+from coderdojochi.outbox import claim_rows, mark_failed, mark_sent
+from coderdojochi.util import email, query_stats
+
+logger = logging.getLogger(__name__)
+
+GUARDIAN_REMINDER_FIELDS = {
+    ReminderOutbox.GUARDIAN_WEEK: 'week_reminder_sent',
+    ReminderOutbox.GUARDIAN_DAY: 'day_reminder_sent',
+}
+
+MENTOR_REMINDER_FIELDS = {
+    ReminderOutbox.MENTOR_WEEK: 'mentors_week_reminder_sent',
+    ReminderOutbox.MENTOR_DAY: 'mentors_day_reminder_sent',
+}
+
+REMINDER_EMAILS = {
+    ReminderOutbox.GUARDIAN_WEEK: {
+        'subject': 'Upcoming class reminder',
+        'template_name': 'class-reminder-guardian-one-week',
+        'preheader': 'Your class is just a few days away!',
+    },
+    ReminderOutbox.GUARDIAN_DAY: {
+        'subject': 'Your class is coming up!',
+        'template_name': 'class-reminder-guardian-24-hour',
+        'preheader': 'Your class is just hours away!',
+    },
+    ReminderOutbox.MENTOR_WEEK: {
+        'subject': 'Your We All Code class is in less than a week!',
+        'template_name': 'class-reminder-mentor-one-week',
+        'preheader': 'The class is just a few days away!',
+    },
+    ReminderOutbox.MENTOR_DAY: {
+        'subject': 'Your We All Code class is tomorrow!',
+        'template_name': 'class-reminder-mentor-24-hour',
+        'preheader': 'The class is just a few hours away!',
+    },
+}
+
+
+def session_merge_data(session, mentor=False):
+    """
+    Merge fields shared by every reminder for `session`. Mentors get the mentor
+    arrival and departure times instead of the class times.
+    """
+    if mentor:
+        start_date = session.mentor_start_date
+        end_date = session.mentor_end_date
+    else:
+        start_date = session.start_date
+        end_date = session.end_date
+
+    return {
+        'class_code': session.course.code,
+        'class_title': session.course.title,
+        'class_description': session.course.description,
+        'class_start_date': arrow.get(start_date).to('local').format('dddd, MMMM D, YYYY'),
+        'class_start_time': arrow.get(start_date).to('local').format('h:mma'),
+        'class_end_date': arrow.get(end_date).to('local').format('dddd, MMMM D, YYYY'),
+        'class_end_time': arrow.get(end_date).to('local').format('h:mma'),
+        'class_location_name': session.location.name,
+        'class_location_address': session.location.address,
+        'class_location_city': session.location.city,
+        'class_location_state': session.location.state,
+        'class_location_zip': session.location.zip,
+        'class_additional_info': session.additional_info,
+        'class_url': f"{settings.SITE_URL}{session.get_absolute_url()}",
+        'class_calendar_url': f"{settings.SITE_URL}{session.get_calendar_url()}",
+        'microdata_start_date': arrow.get(session.start_date).to('local').isoformat(),
+        'microdata_end_date': arrow.get(session.end_date).to('local').isoformat(),
+        'online_video_link': session.online_video_link,
+        'online_video_description': session.online_video_description,
+    }
+
+
+def guardian_orders_due(reminder_sent_field, start, end):
+    return Order.objects.filter(
+        is_active=True,
+        session__start_date__lte=end,
+        session__start_date__gte=start,
+        **{reminder_sent_field: False},
+    ).select_related(
+        'guardian__user',
+        'student',
+        'session__course',
+        'session__location',
+    )
+
+
+def sessions_due(reminder_sent_field, start, end):
+    return Session.objects.filter(
+        is_active=True,
+        start_date__lte=end,
+        start_date__gte=start,
+        **{reminder_sent_field: False},
+    ).select_related(
+        'course',
+        'location',
+    )
+
+
+def enqueue_guardian_reminders(kind, start, end):
+    """
+    Write one outbox row per guardian order for a class starting between
+    `start` and `end`, and flag the orders as queued in the same transaction.
+    """
+    reminder_sent_field = GUARDIAN_REMINDER_FIELDS[kind]
+
+    with query_stats() as stats:
+        orders = list(guardian_orders_due(reminder_sent_field, start, end))
+
+        session_data = {}
+        reminders = []
+
+        for order in orders:
+            if order.session_id not in session_data:
+                session_data[order.session_id] = session_merge_data(order.session)
+
+            user = order.guardian.user
+            reminders.append(ReminderOutbox(
+                order=order,
+                kind=kind,
+                recipient=user.email,
+                merge_data={
+                    'first_name': user.first_name,
+                    'last_name': user.last_name,
+                    'student_first_name': order.student.first_name,
+                    'student_last_name': order.student.last_name,
+                    'order_id': order.id,
+                    **session_data[order.session_id],
+                },
+            ))
+
+        if reminders:
+            with transaction.atomic():
+                # An overlapping run may have queued some of these already;
+                # the (order, kind) constraint keeps one row each.
+                ReminderOutbox.objects.bulk_create(reminders, ignore_conflicts=True)
+
+                Order.objects.filter(
+                    id__in=[order.id for order in orders],
+                ).update(
+                    updated_at=timezone.now(),
+                    **{reminder_sent_field: True},
+                )
+
+    stats['queued'] = len(reminders)
+    return stats
+
+
+def enqueue_mentor_reminders(kind, start, end):
+    """
+    Write one outbox row per mentor per session starting between `start` and
+    `end`, and flag the sessions as queued in the same transaction. Session
+    merge fields are built once per session, and the rows are sent together
+    by the outbox drain.
+    """
+    reminder_sent_field = MENTOR_REMINDER_FIELDS[kind]
+
+    with query_stats() as stats:
+        sessions = list(sessions_due(reminder_sent_field, start, end))
+        session_data = {
+            session.id: session_merge_data(session, mentor=True)
+            for session in sessions
+        }
+
+        orders = MentorOrder.objects.filter(
+            session__in=sessions,
+            is_active=True,
+        ).select_related(
+            'mentor__user',
+        ).order_by('id')
+
+        seen = set()
+        reminders = []
+
+        for order in orders:
+            # One email per mentor per session, even with duplicate orders.
+            if (order.mentor_id, order.session_id) in seen:
+                continue
+            seen.add((order.mentor_id, order.session_id))
+
+            user = order.mentor.user
+            reminders.append(ReminderOutbox(
+                mentor_order=order,
+                kind=kind,
+                recipient=user.email,
+                merge_data={
+                    'first_name': user.first_name,
+                    'last_name': user.last_name,
+                    'order_id': order.id,
+                    **session_data[order.session_id],
+                },
+            ))
+
+        if sessions:
+            with transaction.atomic():
+                ReminderOutbox.objects.bulk_create(reminders, ignore_conflicts=True)
+
+                Session.objects.filter(
+                    id__in=list(session_data),
+                ).update(
+                    updated_at=timezone.now(),
+                    **{reminder_sent_field: True},
+                )
+
+    stats['queued'] = len(reminders)
+    return stats
+
+
+def send_reminder_batch(kind, reminders):
+    """
+    Send one email per outbox row. SendGrid merge data is keyed by address,
+    so a guardian with two students, or a mentor with two sessions, in the
+    batch is split across two sends.
+    """
+    rounds = []
+    for reminder in reminders:
+        for batch in rounds:
+            if reminder.recipient not in batch:
+                batch[reminder.recipient] = reminder
+                break
+        else:
+            rounds.append({reminder.recipient: reminder})
+
+    sent = 0
+    failed = 0
+
+    for batch in rounds:
+        ids = [reminder.id for reminder in batch.values()]
+
+        try:
+            summary = email(
+                merge_data={recipient: reminder.merge_data for recipient, reminder in batch.items()},
+                recipients=list(batch.keys()),
+                unsub_group_id=settings.SENDGRID_UNSUB_CLASSANNOUNCE,
+                **REMINDER_EMAILS[kind],
+            )
+        except Exception as e:
+            logger.exception(f"Reminder batch {kind} failed")
+
+            mark_failed(ReminderOutbox, ids, e)
+            failed += len(ids)
+        else:
+            if summary['rejected']:
+                logger.warning(f"Reminder batch {kind}: {summary}")
+
+            mark_sent(ReminderOutbox, ids)
+            sent += len(ids)
+
+    return sent, failed
+
+
+def drain_reminder_outbox(batch_size=500):
+    """
+    Send every pending outbox row, `batch_size` rows at a time. Each claim is
+    committed before sending, so a crash resumes from the first unsent row.
+    The default matches util.email's batch size, so every send is one API call.
+    """
+    with query_stats() as stats:
+        sent = 0
+        failed = 0
+        last_id = 0
+
+        while True:
+            reminders = claim_rows(ReminderOutbox, last_id, batch_size)
+            if not reminders:
+                break
+
+            last_id = reminders[-1].id
+
+            by_kind = OrderedDict()
+            for reminder in reminders:
+                by_kind.setdefault(reminder.kind, []).append(reminder)
+
+            for kind, kind_reminders in by_kind.items():
+                batch_sent, batch_failed = send_reminder_batch(kind, kind_reminders)
+                sent += batch_sent
+                failed += batch_failed
+
+    stats['sent'] = sent
+    stats['failed'] = failed
+    return stats
+
+
+def send_reminders(now=None):
+    """
+    Queue the guardian and mentor reminders for every window, then drain the
+    outbox. Returns the stats for each step: rows queued,
+    emails sent or failed, queries run and seconds taken.
+    """
+    if now is None:
+        now = timezone.now()
+
+    week_start = now + timedelta(days=1)
+    week_end = now + timedelta(days=7)
+    day_start = now - timedelta(days=2)
+    day_end = now + timedelta(days=1)
+
+    results = OrderedDict()
+
+    results['guardian_week'] = enqueue_guardian_reminders(
+        ReminderOutbox.GUARDIAN_WEEK,
+        week_start,
+        week_end,
+    )
+
+    results['guardian_day'] = enqueue_guardian_reminders(
+        ReminderOutbox.GUARDIAN_DAY,
+        day_start,
+        day_end,
+    )
+
+    results['mentor_week'] = enqueue_mentor_reminders(
+        ReminderOutbox.MENTOR_WEEK,
+        week_start,
+        week_end,
+    )
+
+    results['mentor_day'] = enqueue_mentor_reminders(
+        ReminderOutbox.MENTOR_DAY,
+        day_start,
+        day_end,
+    )
+
+    results['outbox'] = drain_reminder_outbox()
+
+    for window, stats in results.items():
+        logger.info(
+            f"Reminders {window}: {stats.get('queued', 0)} queued, {stats.get('sent', 0)} sent, "
+            f"{stats.get('failed', 0)} failed, {stats['queries']} queries, "
+            f"{stats['db_time']:.3f}s db, {stats['duration']:.3f}s total"
+        )
+
+    return results
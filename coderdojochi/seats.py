@@ -0,0 +1,92 @@
+"""
+Live seat counters on Session.
+
+`Session.active_student_count` and `active_mentor_count` hold the number of
+active orders of each kind, so capacity checks don't have to count orders.
+Order and MentorOrder saves and deletes move them with F() updates (see
+signals_handlers); `reconcile_seat_counts` repairs any drift, e.g. from
+queryset updates that bypass the signals.
+"""
+from django.db import transaction
+from django.db.models import Count, F
+
+from coderdojochi.models import MentorOrder, Order, Session
+
+SEAT_COUNTERS = {
+    Order: 'active_student_count',
+    MentorOrder: 'active_mentor_count',
+}
+
+
+def seat_session_id(session_id, is_active):
+    """
+    The session an order holds a seat in, or None.
+    """
+    return session_id if is_active else None
+
+
+def move_seat(model, old_session_id, new_session_id):
+    """
+    Move one seat of `model`'s kind from `old_session_id` to
+    `new_session_id`, either of which may be None for no seat.
+    """
+    if old_session_id == new_session_id:
+        return
+
+    field = SEAT_COUNTERS[model]
+
+    if old_session_id:
+        Session.objects.filter(id=old_session_id).update(**{field: F(field) - 1})
+
+    if new_session_id:
+        Session.objects.filter(id=new_session_id).update(**{field: F(field) + 1})
+
+
+def count_seats(model, session_ids=None):
+    """
+    {session_id: active orders of `model`}, counted from the orders.
+    """
+    orders = model.objects.filter(is_active=True)
+
+    if session_ids is not None:
+        orders = orders.filter(session_id__in=session_ids)
+
+    rows = orders.values_list('session_id').annotate(count=Count('id')).order_by()
+
+    return dict(rows)
+
+
+def reconcile_seat_counts(session_ids=None, dry_run=False):
+    """
+    Recount the seats of every session, or of `session_ids`, and fix the
+    counters that drifted unless `dry_run`. Returns `(session_id, old, new)`
+    for each drifted session, where `old` and `new` are
+    `(active_student_count, active_mentor_count)`.
+    """
+    with transaction.atomic():
+        sessions = Session.objects.select_for_update().order_by('id')
+
+        if session_ids is not None:
+            sessions = sessions.filter(id__in=session_ids)
+
+        # Lock first, so orders saved meanwhile move the counters after the recount.
+        counters = list(sessions.values_list('id', 'active_student_count', 'active_mentor_count'))
+
+        students = count_seats(Order, session_ids)
+        mentors = count_seats(MentorOrder, session_ids)
+
+        drifted = []
+        for session_id, *old in counters:
+            new = (students.get(session_id, 0), mentors.get(session_id, 0))
+
+            if tuple(old) != new:
+                drifted.append((session_id, tuple(old), new))
+
+        if not dry_run:
+            for session_id, old, (student_count, mentor_count) in drifted:
+                Session.objects.filter(id=session_id).update(
+                    active_student_count=student_count,
+                    active_mentor_count=mentor_count,
+                )
+
+    return drifted
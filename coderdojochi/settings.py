@@ -115,6 +115,9 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # First, so its timings cover the whole request.
+    'coderdojochi.middleware.RequestTimingMiddleware',
+
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -158,6 +161,8 @@ TEMPLATES = [
 
 WSGI_APPLICATION = 'coderdojochi.wsgi.application'
 
+TEST_RUNNER = 'coderdojochi.tests.runner.TestRunner'
+
 
 # Database
 # https://docs.djangoproject.com/en/2.0/ref/settings/#databases
@@ -182,6 +187,25 @@ DATABASES["default"]["ATOMIC_REQUESTS"] = True
 DATABASES['default'].update(dj_database_url.config(conn_max_age=500, ssl_require=True))
 
 
+# Cache
+# https://docs.djangoproject.com/en/3.1/topics/cache/
+# CACHE_URL picks the backend, e.g. redis://host:6379/0 or locmemcache://,
+# and defaults to the Heroku Redis addon's REDIS_URL. The calendar, feed and
+# upcoming session caches are invalidated by bumping a version in the cache,
+# so with locmemcache:// invalidation only reaches the process that made the
+# change and other workers serve stale pages until the entries time out.
+# Only use it with a single process.
+CACHES = {
+    'default': env.cache('CACHE_URL', default=env.str('REDIS_URL', default='locmemcache://')),
+}
+
+CACHES['default'].setdefault('KEY_PREFIX', 'coderdojochi')
+CACHES['default'].setdefault('TIMEOUT', env.int('CACHE_TIMEOUT', default=300))
+
+# Count hits and misses per namespace for the cache_stats command.
+CACHE_STATS = env.bool('CACHE_STATS', default=True)
+
+
 # Password validation
 # https://docs.djangoproject.com/en/2.0/ref/settings/#auth-password-validators
 
@@ -354,11 +378,34 @@ SOCIALACCOUNT_ADAPTER = 'coderdojochi.social_account_adapter.SocialAccountAdapte
 ANYMAIL = {
     'SENDGRID_API_KEY': env('SENDGRID_API_KEY'),
 }
-EMAIL_BACKEND = 'anymail.backends.sendgrid.EmailBackend'
+EMAIL_BACKEND = env('EMAIL_BACKEND', default='anymail.backends.sendgrid.EmailBackend')
 DEFAULT_FROM_EMAIL = env('DEFAULT_FROM_EMAIL')
 CONTACT_EMAIL = env('CONTACT_EMAIL')
 SENDGRID_UNSUB_CLASSANNOUNCE = env.int('SENDGRID_UNSUB_CLASSANNOUNCE')
 
+# Parallel batch sending for meeting announcements and other large emails.
+# Class announcements go out a batch at a time, so they can resume safely.
+EMAIL_CONCURRENCY = env.int('EMAIL_CONCURRENCY', default=4)
+EMAIL_SEND_RETRIES = env.int('EMAIL_SEND_RETRIES', default=3)
+EMAIL_RETRY_BACKOFF = env.float('EMAIL_RETRY_BACKOFF', default=1.0)
+
+
+# Waitlist
+# How long a promoted family has to take the seat held for them.
+WAITLIST_HOLD_HOURS = env.int('WAITLIST_HOLD_HOURS', default=24)
+
+
+# Request timing, see coderdojochi.middleware.RequestTimingMiddleware
+# Share of requests whose queries and templates are timed, from 0 to 1.
+# coderdojochi.tests.runner.TestRunner turns it off for the test suite.
+REQUEST_TIMING_SAMPLE_RATE = env.float('REQUEST_TIMING_SAMPLE_RATE', default=0.1)
+# Requests and queries slower than these are logged as warnings, sampled or not.
+REQUEST_TIMING_SLOW_REQUEST_MS = env.int('REQUEST_TIMING_SLOW_REQUEST_MS', default=1000)
+REQUEST_TIMING_SLOW_QUERY_MS = env.int('REQUEST_TIMING_SLOW_QUERY_MS', default=200)
+# Send the timings of sampled requests to browsers in a Server-Timing header.
+# They show anyone how long our queries take, so only turn it on to debug.
+REQUEST_TIMING_HEADER = env.bool('REQUEST_TIMING_HEADER', default=False)
+
 
 # Slack
 SLACK_WEBHOOK_URL = env('SLACK_WEBHOOK_URL')
@@ -401,3 +448,17 @@ if DEBUG:
 
 # Activate Django-Heroku.
 django_heroku.settings(locals(), staticfiles=False)
+
+# Request timings as one JSON object per line, for the log drain to index.
+LOGGING['formatters']['json'] = {
+    '()': 'jsonlogging.JSONFormatter',
+}
+LOGGING['handlers']['json'] = {
+    'class': 'logging.StreamHandler',
+    'formatter': 'json',
+}
+LOGGING['loggers']['coderdojochi.timing'] = {
+    'handlers': ['json'],
+    'level': 'INFO',
+    'propagate': False,
+}
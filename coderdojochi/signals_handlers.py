@@ -2,14 +2,31 @@ from email.mime.image import MIMEImage
 
 from django.conf import settings
 from django.core.exceptions import ObjectDoesNotExist
-from django.db.models.signals import pre_save
+from django.db.models.signals import post_delete, post_save, pre_save
 from django.dispatch import receiver
 from django.shortcuts import get_object_or_404
 
 import arrow
 
-from coderdojochi.models import Donation, Mentor
+from coderdojochi.cache import CALENDAR_FEED, UPCOMING_SESSIONS, invalidate_namespace
+from coderdojochi.models import (
+    Course,
+    Donation,
+    Location,
+    Meeting,
+    MeetingOrder,
+    MeetingType,
+    Mentor,
+    MentorOrder,
+    Order,
+    Session,
+    Student,
+)
+from coderdojochi.seats import move_seat, seat_session_id
+from coderdojochi.stats import refresh_session_stats
 from coderdojochi.util import email
+from coderdojochi.views.meetings import MeetingCalendarView
+from coderdojochi.views.sessions import SessionCalendarView
 
 
 @receiver(pre_save, sender=Mentor)
@@ -45,3 +62,118 @@ def avatar_updated_handler(sender, instance, **kwargs):
             attachments=[img],
             mixed_subtype='related',
         )
+
+
+@receiver(pre_save, sender=Order)
+@receiver(pre_save, sender=MentorOrder)
+def order_session_handler(sender, instance, **kwargs):
+    # Remember the order's previous session, so its stats are recounted too,
+    # and whether it held a seat there.
+    instance._previous_session_id = None
+    instance._previous_seat_session_id = None
+
+    if instance.id:
+        previous = sender.objects.filter(
+            id=instance.id,
+        ).values_list('session_id', 'is_active').first()
+
+        if previous:
+            instance._previous_session_id = previous[0]
+            instance._previous_seat_session_id = seat_session_id(*previous)
+
+
+@receiver(post_save, sender=Order)
+@receiver(post_save, sender=MentorOrder)
+def order_seats_handler(sender, instance, **kwargs):
+    move_seat(
+        sender,
+        getattr(instance, '_previous_seat_session_id', None),
+        seat_session_id(instance.session_id, instance.is_active),
+    )
+
+
+@receiver(post_delete, sender=Order)
+@receiver(post_delete, sender=MentorOrder)
+def order_deleted_seats_handler(sender, instance, **kwargs):
+    move_seat(sender, seat_session_id(instance.session_id, instance.is_active), None)
+
+
+@receiver(post_save, sender=Order)
+def order_stats_handler(sender, instance, **kwargs):
+    refresh_session_stats([instance.session_id, getattr(instance, '_previous_session_id', None)])
+
+
+@receiver(post_delete, sender=Order)
+def order_deleted_stats_handler(sender, instance, **kwargs):
+    refresh_session_stats([instance.session_id])
+
+
+@receiver(post_save, sender=Student)
+def student_stats_handler(sender, instance, created, **kwargs):
+    # Gender and birthday feed the stats of every session the student attended.
+    if not created:
+        refresh_session_stats(Order.objects.filter(student=instance).values_list('session_id', flat=True).distinct())
+
+
+@receiver(post_save, sender=Session)
+def session_stats_handler(sender, instance, created, **kwargs):
+    # Ages are counted as of the session's start date.
+    if not created:
+        refresh_session_stats([instance.id])
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+def session_calendar_handler(sender, instance, **kwargs):
+    SessionCalendarView.invalidate([instance.id])
+
+
+@receiver(post_save, sender=Course)
+def course_calendar_handler(sender, instance, **kwargs):
+    SessionCalendarView.invalidate(instance.session_set.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Location)
+def location_calendar_handler(sender, instance, **kwargs):
+    SessionCalendarView.invalidate(instance.session_set.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Meeting)
+@receiver(post_delete, sender=Meeting)
+def meeting_calendar_handler(sender, instance, **kwargs):
+    MeetingCalendarView.invalidate([instance.id])
+
+
+@receiver(post_save, sender=MeetingType)
+def meeting_type_calendar_handler(sender, instance, **kwargs):
+    MeetingCalendarView.invalidate(instance.meeting_set.values_list('id', flat=True))
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=Meeting)
+@receiver(post_delete, sender=Meeting)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=MeetingType)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=MentorOrder)
+@receiver(post_delete, sender=MentorOrder)
+@receiver(post_save, sender=MeetingOrder)
+@receiver(post_delete, sender=MeetingOrder)
+def calendar_feed_handler(sender, **kwargs):
+    invalidate_namespace(CALENDAR_FEED)
+
+
+@receiver(post_save, sender=Session)
+@receiver(post_delete, sender=Session)
+@receiver(post_save, sender=Course)
+@receiver(post_save, sender=Location)
+@receiver(post_save, sender=Order)
+@receiver(post_delete, sender=Order)
+@receiver(post_save, sender=MentorOrder)
+@receiver(post_delete, sender=MentorOrder)
+def upcoming_sessions_handler(sender, **kwargs):
+    # Orders change the counts behind the waitlist buttons.
+    invalidate_namespace(UPCOMING_SESSIONS)
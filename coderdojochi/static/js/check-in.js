@@ -0,0 +1,75 @@
+/*
+ * Check-in pages: send each Check In / Undo click to the check-in endpoint
+ * and update just that row and the attendance counters, instead of posting
+ * the whole page. Falls back to the normal form post if the request fails.
+ */
+(function($, window, undefined) {
+    'use strict';
+
+    function updateCounts(counts) {
+        var percent = counts.active ? Math.round(counts.checked_in * 100 / counts.active) : 0;
+
+        $('.js-check-in-count').each(function() {
+            var $count = $(this);
+            $count.text(counts[$count.data('count')]);
+        });
+
+        $('.js-check-in-progress')
+            .attr('aria-valuenow', percent)
+            .css('width', percent + '%')
+            .text(percent + '%');
+    }
+
+    function updateRow(form, order) {
+        var $form = $(form),
+            $row = $form.closest('tr'),
+            $button = $(form.elements).filter('button');
+
+        $form.data('version', order.version);
+        $row.toggleClass('success', !!order.check_in);
+        $row.find('.js-check-in-date').text(order.check_in_display);
+
+        $button
+            .toggleClass('tertiary', !!order.check_in)
+            .text(order.check_in ? 'Undo' : 'Check In')
+            .prop('disabled', false);
+    }
+
+    function submit(e) {
+        var form = this,
+            $form = $(form),
+            $fields = $(form.elements);
+
+        e.preventDefault();
+        $fields.filter('button').prop('disabled', true);
+
+        $.ajax({
+            url: $form.data('url'),
+            method: 'POST',
+            dataType: 'json',
+            data: {
+                csrfmiddlewaretoken: $fields.filter('[name=csrfmiddlewaretoken]').val(),
+                version: $form.data('version'),
+                alternate_guardian: $fields.filter('[name=order_alternate_guardian]').val() || ''
+            }
+        }).done(function(data) {
+            updateRow(form, data.order);
+            updateCounts(data.counts);
+        }).fail(function(xhr) {
+            var data = xhr.responseJSON;
+
+            if (xhr.status === 409 && data) {
+                updateRow(form, data.order);
+                updateCounts(data.counts);
+                window.alert(data.error);
+            } else {
+                form.submit();
+            }
+        });
+    }
+
+    $(function() {
+        $('form.js-check-in').on('submit', submit);
+    });
+
+}(jQuery, window));
@@ -0,0 +1,194 @@
+from collections import Counter, defaultdict
+from functools import reduce
+from operator import or_
+
+from django.db import transaction
+from django.db.models import Case, CharField, Count, IntegerField, Q, Sum, Value, When
+from django.db.models.functions import Cast, ExtractDay, ExtractMonth, ExtractYear
+from django.utils.timezone import utc
+
+from coderdojochi.models import AttendanceStat, Order, Session, Student
+
+
+def _date_number(field):
+    # YYYYMMDD as an integer, using the same UTC date parts as Student.get_age.
+    return (
+        ExtractYear(field, tzinfo=utc) * 10000 +
+        ExtractMonth(field, tzinfo=utc) * 100 +
+        ExtractDay(field, tzinfo=utc)
+    )
+
+
+def age_expression(birthday='student__birthday', date='session__start_date'):
+    """
+    SQL for Student.age_on(birthday, date): whole years between the two,
+    from the difference of their YYYYMMDD numbers.
+    """
+    return Cast(
+        _date_number(date) - _date_number(birthday),
+        IntegerField(),
+    ) / Value(10000)
+
+
+def gender_expression(gender='student__gender'):
+    """
+    SQL for Student.clean_gender: 'male', 'female' or 'other'.
+    """
+    def matches(values):
+        return reduce(or_, [Q(**{f"{gender}__iexact": value}) for value in values])
+
+    return Case(
+        When(matches(Student.MALE_GENDERS), then=Value('male')),
+        When(matches(Student.FEMALE_GENDERS), then=Value('female')),
+        default=Value('other'),
+        output_field=CharField(),
+    )
+
+
+def gender_counts(orders):
+    """
+    [(gender, students)] for `orders`, least common first.
+    """
+    rows = orders.annotate(
+        clean_gender=gender_expression(),
+    ).values_list(
+        'clean_gender',
+    ).annotate(
+        count=Count('id'),
+    ).order_by(
+        'count',
+        'clean_gender',
+    )
+
+    return list(rows)
+
+
+def age_counts(orders):
+    """
+    [(age, students, students checked in)] for `orders`, youngest first. The
+    age is as of the session's start date.
+    """
+    rows = orders.annotate(
+        age=age_expression(),
+    ).filter(
+        age__isnull=False,
+    ).values_list(
+        'age',
+    ).annotate(
+        count=Count('id'),
+        checked_in=Count('id', filter=Q(check_in__isnull=False)),
+    ).order_by(
+        'age',
+    )
+
+    return list(rows)
+
+
+def order_contributions(is_active, check_in, gender, birthday, start_date):
+    """
+    The (dimension, key) counts a single order adds to its session's stats.
+    Gender and age are only counted for students who attended.
+    """
+    counts = Counter()
+
+    if not is_active:
+        return counts
+
+    counts[(AttendanceStat.ATTENDANCE, AttendanceStat.ORDERS)] += 1
+
+    if check_in:
+        counts[(AttendanceStat.ATTENDANCE, AttendanceStat.CHECKED_IN)] += 1
+        counts[(AttendanceStat.GENDER, Student.clean_gender(gender or ''))] += 1
+
+        if birthday:
+            counts[(AttendanceStat.AGE, str(Student.age_on(birthday, start_date)))] += 1
+
+    return counts
+
+
+def compute_session_stats(**filters):
+    """
+    Count every order matching `filters`, grouped by session.
+    """
+    orders = Order.objects.filter(**filters).values_list(
+        'session_id',
+        'is_active',
+        'check_in',
+        'student__gender',
+        'student__birthday',
+        'session__start_date',
+    )
+
+    stats = defaultdict(Counter)
+    for session_id, *order in orders.iterator():
+        stats[session_id].update(order_contributions(*order))
+
+    return stats
+
+
+def refresh_session_stats(session_ids):
+    """
+    Recount the stats of the given sessions. Work is proportional to the size
+    of those sessions, not to the order history.
+    """
+    session_ids = {session_id for session_id in session_ids if session_id}
+    if not session_ids:
+        return
+
+    with transaction.atomic():
+        # Serialise refreshes of the same session, so one's rows don't
+        # collide with the other's.
+        list(Session.objects.select_for_update().filter(id__in=session_ids).order_by('id').values_list('id'))
+
+        stats = compute_session_stats(session_id__in=session_ids)
+
+        AttendanceStat.objects.filter(session_id__in=session_ids).delete()
+        AttendanceStat.objects.bulk_create([
+            AttendanceStat(session_id=session_id, dimension=dimension, key=key, count=count)
+            for session_id, counts in stats.items()
+            for (dimension, key), count in counts.items()
+        ])
+
+
+def rebuild_stats():
+    """
+    Recount every session from scratch. Returns the totals.
+    """
+    with transaction.atomic():
+        stats = compute_session_stats()
+
+        AttendanceStat.objects.all().delete()
+        AttendanceStat.objects.bulk_create([
+            AttendanceStat(session_id=session_id, dimension=dimension, key=key, count=count)
+            for session_id, counts in stats.items()
+            for (dimension, key), count in counts.items()
+        ])
+
+    totals = Counter()
+    for counts in stats.values():
+        totals.update(counts)
+
+    return totals
+
+
+def global_stats():
+    """
+    The totals across every session as {dimension: {key: count}}. Summed
+    when asked for rather than kept in shared rows, which every sign-up and
+    check-in would have to lock.
+    """
+    stats = defaultdict(dict)
+
+    rows = AttendanceStat.objects.values_list(
+        'dimension',
+        'key',
+    ).annotate(
+        total=Sum('count'),
+    ).filter(
+        total__gt=0,
+    ).order_by()
+
+    for dimension, key, count in rows:
+        stats[dimension][key] = count
+
+    return stats
@@ -1,10 +1,13 @@
 import re
 
 from django import template
-from django.template import Template
+from django.forms.utils import flatatt
 from django.urls import reverse
+from django.utils.html import format_html
 
-from coderdojochi.models import Order
+from coderdojochi.check_in import check_in_version
+from coderdojochi.eligibility import eligibility, limitation_message, limitation_title
+from coderdojochi.enrollment import ENROLLED, enrollment_states
 
 register = template.Library()
 
@@ -14,110 +17,81 @@ def subtract(value, arg):
     return value - arg
 
 
-@register.simple_tag(takes_context=False)
-def student_session_order_count(student, session):
-    orders_count = Order.objects.filter(
-        student=student,
-        session=session
-    ).count()
+@register.filter(name='check_in_version')
+def check_in_version_filter(order):
+    return check_in_version(order)
 
-    return orders_count
+
+def _enrollment_state(context, student, session):
+    # Views listing several students or sessions put one batched
+    # `enrollment_states` map in the context; otherwise look up this pair.
+    states = context.get('enrollment_states')
+
+    if states is None:
+        states = enrollment_states([student.id], [session.id])
+
+    return states.get((student.id, session.id))
+
+
+def _eligibility(context, student, session):
+    # Likewise for a batched `eligibility` map of the page's students and sessions.
+    reasons = context.get('eligibility') or {}
+    key = (student.id, session.id)
+
+    if key not in reasons:
+        reasons = eligibility([student], [session])
+
+    return reasons[key]
 
 
 @register.simple_tag(takes_context=True)
-def student_register_link(context, student, session):
-    orders = Order.objects.filter(
-        student=student,
-        session=session,
-        is_active=True
-    )
+def student_is_enrolled(context, student, session):
+    return _enrollment_state(context, student, session) == ENROLLED
 
+
+def _popover(title, message):
+    return {
+        'data-trigger': 'hover',
+        'data-placement': 'top',
+        'data-toggle': 'popover',
+        'title': '',
+        'data-content': message,
+        'data-original-title': title,
+    }
+
+
+@register.simple_tag(takes_context=True)
+def student_register_link(context, student, session):
     url = reverse('session-sign-up', kwargs={'pk': session.id, 'student_id': student.id, })
 
     button_tag = 'a'
     button_modifier = ''
-    button_additional_attributes = ''
     button_msg = 'Enroll'
-    button_href = f'href={url}'
+    attrs = {'href': url}
+
+    enrolled = _enrollment_state(context, student, session) == ENROLLED
+    reasons = () if enrolled else _eligibility(context, student, session)
 
-    if orders.count():
+    if enrolled:
         button_modifier = "tertiary"
         button_msg = "Can't make it"
 
-    elif (
-        not student.is_within_age_range(
-            session.minimum_age,
-            session.maximum_age,
-            session.start_date
-        ) or
-        not student.is_within_gender_limitation(
-            session.gender_limitation
-        )
-    ):
+    elif reasons:
         button_modifier = 'btn-default'
-        button_additional_attributes = 'disabled'
         button_tag = 'span'
-
-        if (
-            not student.is_within_age_range(
-                session.minimum_age,
-                session.maximum_age,
-                session.start_date
-            ) and
-            not student.is_within_gender_limitation(
-                session.gender_limitation
-            )
-        ):
-            title = "Limited event."
-            message = (
-                f"Sorry, this class is limited to {session.gender_limitation}s between {session.minimum_age} "
-                f"and {session.maximum_age} this time around."
-            )
-
-            button_href = (
-                'data-trigger="hover" data-placement="top" data-toggle="popover" title="" '
-                f'data-content="{message}" data-original-title="{title}"'
-            )
-
-        elif (
-            not student.is_within_age_range(
-                session.minimum_age,
-                session.maximum_age,
-                session.start_date
-            )
-        ):
-            title = "Age-limited event."
-            message = (
-                f"Sorry, this class is limited to student between ages {session.minimum_age} and "
-                f"{session.maximum_age} this time around."
-            )
-            button_href = (
-                'data-trigger="hover" data-placement="top" data-toggle="popover" title="" '
-                f'data-content="{message}" data-original-title="{title}"'
-            )
-
-        elif (
-            not student.is_within_gender_limitation(
-                session.gender_limitation
-            )
-        ):
-            title = "{gender}-only event.".format(
-                gender='Girls' if session.gender_limitation == 'female' else 'Boys'
-            )
-            message = f"Sorry, this class is limited to {session.gender_limitation}s this time around."
-            button_href = (
-                'data-trigger="hover" data-placement="top" data-toggle="popover" title="" '
-                f'data-content="{message}" data-original-title="{title}" '
-            )
-
-    form = (
-        f"<{button_tag} {button_href} class='button small {button_modifier}' {button_additional_attributes}>"
-        f"{button_msg}"
-        f"</{button_tag}>"
+        attrs = _popover(limitation_title(reasons, session), limitation_message(reasons, session))
+        attrs['disabled'] = True
+
+    # Built directly rather than through a Template, which would be compiled
+    # again for every student on the page.
+    return format_html(
+        '<{tag}{attrs} class="button small {modifier}">{msg}</{tag}>',
+        tag=button_tag,
+        attrs=flatatt(attrs),
+        modifier=button_modifier,
+        msg=button_msg,
     )
 
-    return Template(form).render(context)
-
 
 @register.filter
 def student_age(student, date):
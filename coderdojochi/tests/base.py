@@ -0,0 +1,39 @@
+from contextlib import contextmanager
+
+from django.db import DEFAULT_DB_ALIAS, connections
+
+import mock
+
+
+class SlackMutedMixin:
+    """
+    Keep the Slack notifications sent by model signals from going out,
+    including for objects made in `setUpTestData`.
+    """
+
+    @classmethod
+    def setUpClass(cls):
+        patcher = mock.patch('coderdojochi.notifications.SlackNotification.send')
+        patcher.start()
+        cls.addClassCleanup(patcher.stop)
+
+        super().setUpClass()
+
+
+@contextmanager
+def run_on_commit(using=DEFAULT_DB_ALIAS):
+    """
+    Run the `transaction.on_commit` callbacks registered in the block, which
+    a TestCase would otherwise never commit. Like Django 3.2's
+    `captureOnCommitCallbacks(execute=True)`; yields the callbacks.
+    """
+    callbacks = []
+    start = len(connections[using].run_on_commit)
+
+    try:
+        yield callbacks
+    finally:
+        callbacks[:] = [func for savepoint_ids, func in connections[using].run_on_commit[start:]]
+
+        for callback in callbacks:
+            callback()
@@ -0,0 +1,52 @@
+from anymail.backends.test import EmailBackend
+from anymail.exceptions import AnymailAPIError
+from anymail.message import AnymailRecipientStatus
+
+
+class BouncingEmailBackend(EmailBackend):
+    """
+    Anymail test backend that rejects every address starting with `bounce`.
+    """
+
+    def post_to_esp(self, payload, message):
+        response = super().post_to_esp(payload, message)
+
+        for email in payload.recipient_emails:
+            if email.startswith('bounce'):
+                status = AnymailRecipientStatus(
+                    message_id=None,
+                    status='rejected',
+                )
+                status.reject_reason = 'bounced'
+                response['recipient_status'][email] = status
+
+        return response
+
+
+class BarrierEmailBackend(EmailBackend):
+    """
+    Anymail test backend whose sends wait at `barrier`, so they only go
+    through when as many as it has parties are in flight at once.
+    """
+
+    barrier = None
+
+    def post_to_esp(self, payload, message):
+        self.barrier.wait()
+        return super().post_to_esp(payload, message)
+
+
+class FlakyEmailBackend(EmailBackend):
+    """
+    Anymail test backend that fails the first attempt at every message.
+
+    Attempts are marked on the message itself, so nothing carries over
+    between messages or tests.
+    """
+
+    def post_to_esp(self, payload, message):
+        if not getattr(message, 'flaky_attempted', False):
+            message.flaky_attempted = True
+            raise AnymailAPIError("Service unavailable")
+
+        return super().post_to_esp(payload, message)
@@ -0,0 +1,20 @@
+from django.test.runner import DiscoverRunner
+from django.test.utils import override_settings
+
+
+class TestRunner(DiscoverRunner):
+    """
+    Test runner that turns request timing off, so the sampled timings stay
+    out of the test output. Tests that need it override the setting back on.
+    """
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+
+        self.timing_off = override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+        self.timing_off.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.timing_off.disable()
+
+        super().teardown_test_environment(**kwargs)
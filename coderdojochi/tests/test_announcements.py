@@ -0,0 +1,89 @@
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import mock
+
+from coderdojochi.announcements import drain_announcements, queue_announcement, send_announcement
+from coderdojochi.factories import CDCUserFactory, GuardianFactory, MentorFactory, SessionFactory
+from coderdojochi.models import Announcement, Mentor
+from coderdojochi.tests.base import SlackMutedMixin
+
+
+@override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend')
+class TestAnnouncements(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(is_active=True)
+
+    def test_announce_view_queues_without_sending(self):
+        GuardianFactory.create_batch(3)
+        self.client.force_login(CDCUserFactory.create(is_staff=True))
+
+        response = self.client.get(reverse('session-announce-guardians', args=[self.session.id]))
+
+        self.assertRedirects(response, reverse('cdc-admin'), fetch_redirect_response=False)
+        self.assertEqual(len(mail.outbox), 0)
+
+        announcement = Announcement.objects.get()
+        self.assertEqual(announcement.audience, Announcement.GUARDIANS)
+        self.assertEqual(announcement.queued, 3)
+
+        self.session.refresh_from_db()
+        self.assertIsNotNone(self.session.announced_date_guardians)
+
+    def test_worker_sends_and_records_progress(self):
+        GuardianFactory.create_batch(5)
+        GuardianFactory.create(is_active=False)
+        announcement, created = queue_announcement(self.session, Announcement.GUARDIANS)
+
+        stats = drain_announcements()
+
+        self.assertEqual(stats['sent'], 1)
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.status, Announcement.SENT)
+        self.assertEqual((announcement.queued, announcement.sent, announcement.failed), (5, 5, 0))
+        self.assertEqual(announcement.progress, 100)
+        self.assertEqual(sum(len(m.to) for m in mail.outbox), 5)
+
+    def test_queries_do_not_grow_with_recipients(self):
+        MentorFactory.create_batch(2)
+        announcement, created = queue_announcement(self.session, Announcement.MENTORS)
+
+        with self.assertNumQueries(4):
+            send_announcement(announcement, chunk_size=50)
+
+        MentorFactory.create_batch(8)
+        Announcement.objects.update(last_recipient_id=0)
+        announcement.refresh_from_db()
+
+        with self.assertNumQueries(4):
+            send_announcement(announcement, chunk_size=50)
+
+    def test_failed_announcement_resumes_after_last_recipient(self):
+        MentorFactory.create_batch(3)
+        mentors = list(Mentor.objects.select_related('user').order_by('user_id'))
+        self.assertEqual(len(mentors), 4)
+        announcement, created = queue_announcement(self.session, Announcement.MENTORS)
+
+        # The first chunk goes out, then SendGrid falls over.
+        with mock.patch('coderdojochi.announcements.email') as email:
+            email.side_effect = [
+                {'accepted': 2, 'rejected': {}},
+                Exception('SendGrid is down'),
+            ]
+            stats = drain_announcements(chunk_size=2)
+
+        self.assertEqual(stats['failed'], 1)
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.status, Announcement.PENDING)
+        self.assertEqual(announcement.last_recipient_id, mentors[1].user_id)
+
+        drain_announcements(chunk_size=2)
+
+        announcement.refresh_from_db()
+        self.assertEqual(announcement.status, Announcement.SENT)
+        self.assertEqual(announcement.sent, 4)
+        self.assertEqual(
+            [m.to for m in mail.outbox],
+            [[mentors[2].user.email, mentors[3].user.email]],
+        )
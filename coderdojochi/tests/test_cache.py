@@ -0,0 +1,66 @@
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import TestCase, override_settings
+
+from coderdojochi.cache import (
+    UPCOMING_SESSIONS,
+    bump_deploy_version,
+    deploy_version,
+    get_cached,
+    invalidate_namespace,
+    make_key,
+    stats,
+    versioned_key,
+)
+from coderdojochi.tests.base import run_on_commit
+
+
+class TestCacheHelpers(TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        cache.clear()
+
+    def test_keys_are_namespaced_by_deploy_version(self):
+        self.assertEqual(make_key('calendar', 'class', 1), f'{deploy_version()}:calendar:class:1')
+
+    def test_invalidating_a_namespace_orphans_its_keys(self):
+        key = versioned_key(UPCOMING_SESSIONS, 'public')
+        cache.set(key, ['session'])
+
+        with run_on_commit():
+            invalidate_namespace(UPCOMING_SESSIONS)
+
+            # Not until the transaction commits.
+            self.assertEqual(versioned_key(UPCOMING_SESSIONS, 'public'), key)
+
+        self.assertNotEqual(versioned_key(UPCOMING_SESSIONS, 'public'), key)
+        self.assertIsNone(get_cached(UPCOMING_SESSIONS, versioned_key(UPCOMING_SESSIONS, 'public')))
+
+    def test_bump_deploy_version(self):
+        first = bump_deploy_version()
+
+        self.assertEqual(bump_deploy_version(), first + 1)
+
+    def test_hits_and_misses_are_counted(self):
+        key = make_key(UPCOMING_SESSIONS, 'public')
+
+        get_cached(UPCOMING_SESSIONS, key)
+        cache.set(key, [])
+        get_cached(UPCOMING_SESSIONS, key)
+        get_cached(UPCOMING_SESSIONS, key)
+
+        self.assertEqual(stats()[UPCOMING_SESSIONS], (2, 1))
+
+        out = StringIO()
+        call_command('cache_stats', '--reset', stdout=out)
+
+        self.assertIn('67%', out.getvalue())
+        self.assertEqual(stats()[UPCOMING_SESSIONS], (0, 0))
+
+    @override_settings(CACHE_STATS=False)
+    def test_counting_can_be_turned_off(self):
+        get_cached(UPCOMING_SESSIONS, make_key(UPCOMING_SESSIONS, 'public'))
+
+        self.assertEqual(stats()[UPCOMING_SESSIONS], (0, 0))
@@ -0,0 +1,139 @@
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+
+from coderdojochi.factories import GuardianFactory, MentorFactory, MentorOrderFactory, OrderFactory, SessionFactory
+from coderdojochi.tests.base import SlackMutedMixin, run_on_commit
+from coderdojochi.views.feeds import calendar_feed_url
+
+
+class TestSessionCalendar(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        cache.clear()
+
+        self.session = SessionFactory.create(online_video_link='https://meet.example.com/class')
+        self.url = reverse('session-calendar', args=[self.session.id])
+
+    def test_cached_calendar_skips_the_database(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.status_code, 200)
+        self.assertIn(b'BEGIN:VCALENDAR', response.content)
+
+        with self.assertNumQueries(0):
+            cached = self.client.get(self.url)
+
+        self.assertEqual(cached.content, response.content)
+        self.assertEqual(cached['ETag'], response['ETag'])
+
+    def test_conditional_requests_get_304(self):
+        response = self.client.get(self.url)
+
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag']).status_code,
+            304,
+        )
+        self.assertEqual(
+            self.client.get(self.url, HTTP_IF_MODIFIED_SINCE=response['Last-Modified']).status_code,
+            304,
+        )
+
+    def test_changes_invalidate_the_calendar(self):
+        response = self.client.get(self.url)
+
+        self.session.course.title = 'Renamed Course'
+        with run_on_commit():
+            self.session.course.save()
+
+        changed = self.client.get(self.url, HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn(b'Renamed Course', changed.content)
+
+    def test_ticket_holders_get_their_own_calendar(self):
+        guardian = GuardianFactory.create()
+        public = self.client.get(self.url)
+
+        OrderFactory.create(session=self.session, guardian=guardian, student__guardian=guardian)
+        self.client.force_login(guardian.user)
+        ticket = self.client.get(self.url)
+
+        self.assertNotIn(b'meet.example.com', public.content)
+        self.assertIn(b'meet.example.com', ticket.content)
+
+
+class TestCalendarFeed(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        cache.clear()
+
+        self.public = SessionFactory.create(is_active=True, is_public=True, course__title='Public Class')
+        self.private = SessionFactory.create(is_active=True, is_public=False, course__title='Private Class')
+
+    def get(self, url, **headers):
+        response = self.client.get(url, **headers)
+        if response.streaming:
+            response.body = b''.join(response.streaming_content)
+        else:
+            response.body = response.content
+        return response
+
+    def test_public_feed_lists_public_classes(self):
+        response = self.get(reverse('calendar-feed'))
+
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.body.count(b'BEGIN:VEVENT'), 1)
+        self.assertIn(b'Public Class', response.body)
+        self.assertTrue(response.body.endswith(b'END:VCALENDAR\r\n'))
+
+    def test_feed_is_cached_until_something_changes(self):
+        response = self.get(reverse('calendar-feed'))
+
+        with self.assertNumQueries(0):
+            cached = self.get(reverse('calendar-feed'))
+            not_modified = self.get(reverse('calendar-feed'), HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(cached.body, response.body)
+        self.assertEqual(not_modified.status_code, 304)
+
+        self.public.course.title = 'Renamed Class'
+        with run_on_commit():
+            self.public.course.save()
+
+        changed = self.get(reverse('calendar-feed'), HTTP_IF_NONE_MATCH=response['ETag'])
+
+        self.assertEqual(changed.status_code, 200)
+        self.assertIn(b'Renamed Class', changed.body)
+
+    def test_user_feed_lists_their_classes(self):
+        mentor = MentorFactory.create()
+        MentorOrderFactory.create(mentor=mentor, session=self.private)
+
+        response = self.get(calendar_feed_url(mentor.user))
+
+        self.assertEqual(response.body.count(b'BEGIN:VEVENT'), 1)
+        self.assertIn(b'Private Class', response.body)
+
+    def test_user_feed_needs_a_valid_signature(self):
+        mentor = MentorFactory.create()
+        url = calendar_feed_url(mentor.user).replace('.ics', 'x.ics')
+
+        self.assertEqual(self.client.get(url).status_code, 404)
+
+    def test_resetting_the_feed_key_revokes_the_old_url(self):
+        mentor = MentorFactory.create()
+        MentorOrderFactory.create(mentor=mentor, session=self.private)
+        old_url = calendar_feed_url(mentor.user)
+
+        self.assertEqual(self.get(old_url).status_code, 200)
+
+        self.client.force_login(mentor.user)
+        with run_on_commit():
+            response = self.client.post(reverse('calendar-feed-reset'))
+        self.client.logout()
+        mentor.user.refresh_from_db()
+
+        self.assertRedirects(response, reverse('account_home'), fetch_redirect_response=False)
+        self.assertEqual(self.client.get(old_url).status_code, 404)
+        self.assertIn(b'Private Class', self.get(calendar_feed_url(mentor.user)).body)
@@ -0,0 +1,153 @@
+import json
+from datetime import timedelta
+
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from coderdojochi.check_in import check_in_version
+from coderdojochi.factories import CDCUserFactory, MentorOrderFactory, OrderFactory, SessionFactory
+from coderdojochi.models import AttendanceStat, MentorOrder, Order
+from coderdojochi.stats import global_stats
+from coderdojochi.tests.base import SlackMutedMixin
+
+
+class TestCheckInToggle(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(CDCUserFactory.create(is_staff=True))
+        self.session = SessionFactory.create()
+
+    def toggle(self, kind, order, version=None, **data):
+        return self.client.post(
+            reverse('check-in-toggle', args=[kind, order.id]),
+            {'version': version or check_in_version(order), **data},
+        )
+
+    def test_toggle_returns_row_and_counts(self):
+        order = OrderFactory.create(session=self.session)
+        OrderFactory.create(session=self.session)
+
+        response = self.toggle('student', order, alternate_guardian='Aunt May')
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        order.refresh_from_db()
+        self.assertIsNotNone(order.check_in)
+        self.assertEqual(order.alternate_guardian, 'Aunt May')
+        self.assertEqual(data['order']['version'], check_in_version(order))
+        self.assertEqual(data['counts'], {'active': 2, 'checked_in': 1, 'no_show': 1})
+        self.assertEqual(global_stats()['attendance']['checked_in'], 1)
+
+        response = self.toggle('student', order, version=data['order']['version'])
+
+        order.refresh_from_db()
+        self.assertIsNone(order.check_in)
+        self.assertEqual(response.json()['counts']['checked_in'], 0)
+
+    def test_stale_version_is_a_conflict(self):
+        order = MentorOrderFactory.create(session=self.session)
+        stale = check_in_version(order)
+
+        # Another volunteer checks the mentor in first.
+        self.assertEqual(self.toggle('mentor', order).status_code, 200)
+
+        response = self.toggle('mentor', order, version=stale)
+
+        self.assertEqual(response.status_code, 409)
+        order.refresh_from_db()
+        self.assertIsNotNone(order.check_in)
+        self.assertEqual(response.json()['order']['version'], check_in_version(order))
+
+    def test_requires_staff(self):
+        order = OrderFactory.create(session=self.session)
+        self.client.force_login(CDCUserFactory.create())
+
+        self.assertEqual(self.toggle('student', order).status_code, 403)
+        self.assertEqual(self.toggle('volunteer', order).status_code, 403)
+
+        order.refresh_from_db()
+        self.assertIsNone(order.check_in)
+
+
+class TestCheckInSync(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(CDCUserFactory.create(is_staff=True))
+        self.session = SessionFactory.create()
+
+    def sync(self, *events):
+        return self.client.post(
+            reverse('check-in-sync', args=[self.session.id]),
+            json.dumps({'events': list(events)}),
+            content_type='application/json',
+        )
+
+    def event(self, order, checked_in, at):
+        return {
+            'kind': 'student' if isinstance(order, Order) else 'mentor',
+            'order': order.id,
+            'checked_in': checked_in,
+            'at': at.isoformat(),
+        }
+
+    def test_applies_latest_event_per_order(self):
+        students = OrderFactory.create_batch(3, session=self.session)
+        mentor = MentorOrderFactory.create(session=self.session)
+        arrived = timezone.now() + timedelta(minutes=1)
+
+        response = self.sync(
+            self.event(students[0], True, arrived),
+            self.event(students[1], True, arrived),
+            # Checked in by mistake, then undone.
+            self.event(students[2], False, arrived + timedelta(seconds=30)),
+            self.event(students[2], True, arrived),
+            self.event(mentor, True, arrived),
+        )
+
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(len(data['applied']), 4)
+        self.assertEqual(data['conflicts'], [])
+        self.assertEqual(data['counts'], {'active': 3, 'checked_in': 2, 'no_show': 1})
+        self.assertEqual(
+            set(Order.objects.filter(check_in__isnull=False).values_list('id', flat=True)),
+            {students[0].id, students[1].id},
+        )
+        self.assertIsNotNone(MentorOrder.objects.get().check_in)
+        self.assertEqual(
+            AttendanceStat.objects.get(session=self.session, dimension='attendance', key='checked_in').count,
+            2,
+        )
+
+    def test_newer_server_change_wins(self):
+        order = OrderFactory.create(session=self.session)
+        other_session = OrderFactory.create()
+        queued_at = timezone.now()
+
+        # Someone checks the student in at the desk after the tablet went offline.
+        self.client.post(
+            reverse('check-in-toggle', args=['student', order.id]),
+            {'version': check_in_version(order)},
+        )
+
+        response = self.sync(
+            self.event(order, False, queued_at),
+            self.event(other_session, True, queued_at),
+        )
+
+        conflicts = response.json()['conflicts']
+        self.assertEqual(
+            [(conflict['order'], conflict['reason']) for conflict in conflicts],
+            [(order.id, 'changed'), (other_session.id, 'not found')],
+        )
+        self.assertIsNotNone(conflicts[0]['current']['check_in'])
+        order.refresh_from_db()
+        self.assertIsNotNone(order.check_in)
+
+    def test_rejects_malformed_events(self):
+        response = self.sync({'kind': 'student', 'order': 1, 'checked_in': True, 'at': 'yesterday'})
+
+        self.assertEqual(response.status_code, 400)
+
+        response = self.sync({'kind': 'student', 'order': True, 'checked_in': True, 'at': timezone.now().isoformat()})
+
+        self.assertEqual(response.status_code, 400)
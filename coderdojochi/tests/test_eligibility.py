@@ -0,0 +1,62 @@
+from datetime import datetime, timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from pytz import utc
+
+from coderdojochi.eligibility import AGE, GENDER, eligibility, limitation_message
+from coderdojochi.factories import SessionFactory, StudentFactory
+from coderdojochi.models import Session
+from coderdojochi.tests.base import SlackMutedMixin
+from coderdojochi.views.sessions import SessionSignUpView
+
+
+class TestEligibility(SlackMutedMixin, TestCase):
+    def setUp(self):
+        start_date = datetime(2030, 6, 1, 15, tzinfo=utc)
+        self.open = SessionFactory.create(start_date=start_date)
+        self.girls = SessionFactory.create(start_date=start_date, gender_limitation='female')
+        self.teens = SessionFactory.create(
+            start_date=start_date,
+            override_minimum_age_limitation=13,
+            course__maximum_age=18,
+        )
+
+        self.girl = StudentFactory.create(gender='F', birthday=datetime(2017, 6, 2, tzinfo=utc))
+        self.boy = StudentFactory.create(gender='boy', birthday=datetime(2017, 6, 1, tzinfo=utc))
+        self.other = StudentFactory.create(gender='Non-binary', birthday=datetime(2015, 1, 1, tzinfo=utc))
+
+    def test_matrix_matches_student_checks(self):
+        students = [self.girl, self.boy, self.other]
+        sessions = list(Session.objects.select_related('course'))
+
+        with self.assertNumQueries(0):
+            reasons = eligibility(students, sessions)
+
+        self.assertEqual(len(reasons), 9)
+
+        for student in students:
+            for session in sessions:
+                expected = ()
+                if not student.is_within_age_range(session.minimum_age, session.maximum_age, session.start_date):
+                    expected += (AGE,)
+                if not student.is_within_gender_limitation(session.gender_limitation):
+                    expected += (GENDER,)
+
+                self.assertEqual(reasons[(student.id, session.id)], expected)
+
+        # Turning 13 on the day of class counts; the day before doesn't.
+        self.assertEqual(reasons[(self.boy.id, self.teens.id)], ())
+        self.assertEqual(reasons[(self.girl.id, self.teens.id)], (AGE,))
+        self.assertEqual(reasons[(self.boy.id, self.girls.id)], (GENDER,))
+        self.assertEqual(reasons[(self.other.id, self.girls.id)], ())
+
+    def test_sign_up_refuses_ineligible_student(self):
+        self.girls.start_date = timezone.now() + timedelta(days=7)
+        self.girls.save()
+
+        message = SessionSignUpView().student_limitations(self.boy, self.girls, user_signed_up=False)
+
+        self.assertEqual(message, limitation_message((GENDER,), self.girls))
+        self.assertEqual(message, 'Sorry, this class is limited to females this time around.')
@@ -0,0 +1,184 @@
+import threading
+
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.db import transaction
+from django.test import TestCase, override_settings
+
+import factory
+import mock
+from anymail.exceptions import AnymailAPIError
+
+from coderdojochi import util
+from coderdojochi.email_queue import drain_email_queue, queue_email
+from coderdojochi.factories import CDCUserFactory
+from coderdojochi.models import EmailJob
+from coderdojochi.tests.email_backends import BarrierEmailBackend
+from coderdojochi.util import email, render_email_template
+
+User = get_user_model()
+
+TEMPLATE = 'class-reminder-guardian-24-hour'
+
+
+@override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend')
+class TestEmailTemplateCache(TestCase):
+    def setUp(self):
+        util._template_cache.clear()
+        util._template_variables.clear()
+
+    def test_repeat_send_does_not_render(self):
+        with mock.patch('coderdojochi.util.render_to_string', wraps=util.render_to_string) as render:
+            for _ in range(3):
+                email(
+                    subject='Your class is coming up!',
+                    template_name=TEMPLATE,
+                    recipients=['guardian@example.com'],
+                    merge_data={'guardian@example.com': {'first_name': 'Ada'}},
+                    merge_global_data={'class_location_name': 'Main Library'},
+                )
+
+        self.assertEqual(render.call_count, 1)
+
+    def test_conditional_variables_are_part_of_the_key(self):
+        in_person, _ = render_email_template(TEMPLATE, {'class_location_name': 'Main Library'})
+        online, _ = render_email_template(TEMPLATE, {'online_video_link': 'https://example.com'})
+
+        self.assertNotEqual(in_person, online)
+
+        self.assertEqual(
+            render_email_template(TEMPLATE, {'class_location_name': 'Main Library'})[0],
+            in_person,
+        )
+
+    def test_merge_only_values_share_a_render(self):
+        render_email_template(TEMPLATE, {'class_title': 'Scratch'})
+
+        with mock.patch('coderdojochi.util.render_to_string') as render:
+            render_email_template(TEMPLATE, {'class_title': 'Python'})
+
+        render.assert_not_called()
+
+
+@override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend')
+class TestEmailQueue(TestCase):
+    def queue(self, **kwargs):
+        return queue_email(
+            subject='Welcome!',
+            template_name='welcome-mentor',
+            recipients=['mentor@example.com'],
+            merge_global_data={'first_name': 'Grace'},
+            **kwargs,
+        )
+
+    def test_queued_email_is_sent_by_the_worker(self):
+        job = self.queue()
+
+        self.assertEqual(len(mail.outbox), 0)
+
+        stats = drain_email_queue()
+
+        self.assertEqual(stats['sent'], 1)
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(mail.outbox[0].to, ['mentor@example.com'])
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.SENT)
+
+    def test_rolled_back_email_is_never_sent(self):
+        try:
+            with transaction.atomic():
+                self.queue()
+                raise ValueError()
+        except ValueError:
+            pass
+
+        self.assertFalse(EmailJob.objects.exists())
+
+    def test_failed_job_is_retried(self):
+        job = self.queue()
+
+        with mock.patch('coderdojochi.email_queue.email', side_effect=Exception('SendGrid is down')):
+            stats = drain_email_queue()
+
+        self.assertEqual(stats['failed'], 1)
+        job.refresh_from_db()
+        self.assertEqual((job.status, job.attempts), (EmailJob.PENDING, 1))
+
+        drain_email_queue()
+
+        job.refresh_from_db()
+        self.assertEqual(job.status, EmailJob.SENT)
+        self.assertEqual(len(mail.outbox), 1)
+
+    def test_attachments_are_rejected(self):
+        with self.assertRaises(TypeError):
+            self.queue(attachments=['avatar.png'])
+
+
+@override_settings(EMAIL_BACKEND='coderdojochi.tests.email_backends.BouncingEmailBackend')
+class TestEmailBounces(TestCase):
+    def test_rejected_recipients_deactivated_in_one_update(self):
+        users = CDCUserFactory.create_batch(3)
+        bounced = CDCUserFactory.create_batch(4, email=factory.Sequence(lambda n: f"bounce{n}@example.com"))
+        recipients = [user.email for user in users + bounced]
+
+        with self.assertNumQueries(1):
+            summary = email(
+                subject='New class announced!',
+                template_name='welcome-mentor',
+                recipients=recipients,
+                batch_size=2,
+            )
+
+        self.assertEqual(summary['batches'], 4)
+        self.assertEqual(summary['accepted'], 3)
+        self.assertEqual(set(summary['rejected']), {user.email for user in bounced})
+        self.assertEqual(summary['deactivated'], 4)
+
+        self.assertEqual(
+            set(User.objects.filter(is_active=False).values_list('email', flat=True)),
+            {user.email for user in bounced},
+        )
+        self.assertTrue(all(
+            note.startswith("User 'bounced'")
+            for note in User.objects.filter(is_active=False).values_list('admin_notes', flat=True)
+        ))
+
+
+@override_settings(EMAIL_RETRY_BACKOFF=0)
+class TestConcurrentEmail(TestCase):
+    recipients = [f"guardian{n}@example.com" for n in range(80)]
+
+    def send(self, **kwargs):
+        return email(
+            subject='New class announced!',
+            template_name='welcome-mentor',
+            recipients=self.recipients,
+            batch_size=10,
+            **kwargs,
+        )
+
+    @override_settings(EMAIL_BACKEND='coderdojochi.tests.email_backends.BarrierEmailBackend')
+    def test_batches_are_sent_concurrently(self):
+        # Sends only get past the barrier four at a time; sending fewer at
+        # once breaks it.
+        barrier = threading.Barrier(4, timeout=10)
+
+        with mock.patch.object(BarrierEmailBackend, 'barrier', barrier):
+            summary = self.send(concurrency=4)
+
+        self.assertFalse(barrier.broken)
+        self.assertEqual(summary['batches'], 8)
+        self.assertEqual(summary['accepted'], 80)
+        self.assertEqual(len(mail.outbox), 8)
+
+    @override_settings(EMAIL_BACKEND='coderdojochi.tests.email_backends.FlakyEmailBackend')
+    def test_failed_batches_are_retried(self):
+        summary = self.send(concurrency=4, retries=1)
+
+        self.assertEqual(summary['accepted'], 80)
+
+    @override_settings(EMAIL_BACKEND='coderdojochi.tests.email_backends.FlakyEmailBackend')
+    def test_batch_out_of_retries_raises(self):
+        with self.assertRaises(AnymailAPIError):
+            self.send(concurrency=4)
@@ -0,0 +1,182 @@
+import threading
+
+from django.contrib.messages import get_messages
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, skipUnlessDBFeature
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+import mock
+
+from coderdojochi.enrollment import (
+    ALREADY_ENROLLED,
+    CANCELLED,
+    ENROLLED,
+    SOLD_OUT,
+    enroll_mentor,
+    enroll_student,
+    enrollment_states,
+)
+from coderdojochi.factories import MentorFactory, MentorOrderFactory, OrderFactory, SessionFactory, StudentFactory
+from coderdojochi.models import EmailJob, MentorOrder, Order, Session
+from coderdojochi.tests.base import SlackMutedMixin
+from coderdojochi.views.sessions import MENTOR_SOLD_OUT_MESSAGE
+
+
+class TestEnrollment(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(capacity=2, mentor_capacity=1)
+
+    def enroll(self, student):
+        return enroll_student(self.session, student.guardian, student, '127.0.0.1')
+
+    def test_students_enroll_until_sold_out(self):
+        students = StudentFactory.create_batch(3)
+
+        self.assertEqual(self.enroll(students[0])[0], ENROLLED)
+        self.assertEqual(self.enroll(students[0])[0], ALREADY_ENROLLED)
+        self.assertEqual(self.enroll(students[1])[0], ENROLLED)
+        self.assertEqual(self.enroll(students[2]), (SOLD_OUT, None))
+
+        self.assertEqual(self.session.active_student_count, 2)
+        self.assertEqual(Order.objects.filter(session=self.session).count(), 2)
+
+    def test_cancelled_order_is_reused(self):
+        cancelled = OrderFactory.create(session=self.session, is_active=False)
+
+        status, order = self.enroll(cancelled.student)
+
+        self.assertEqual((status, order.id), (ENROLLED, cancelled.id))
+        self.assertTrue(order.is_active)
+        self.assertEqual(order.ip, '127.0.0.1')
+
+    def test_mentors_are_held_to_mentor_capacity(self):
+        MentorOrderFactory.create(session=self.session)
+
+        self.assertEqual(
+            enroll_mentor(self.session, MentorFactory.create(), '127.0.0.1'),
+            (SOLD_OUT, None),
+        )
+
+    def test_sold_out_sign_up_is_refused(self):
+        MentorOrderFactory.create(session=self.session)
+        mentor = MentorFactory.create(background_check=True)
+        self.client.force_login(mentor.user)
+
+        response = self.client.post(
+            reverse('session-sign-up', kwargs={'pk': self.session.id}),
+            REMOTE_ADDR='127.0.0.1',
+            HTTP_X_FORWARDED_FOR='127.0.0.1',
+        )
+
+        self.assertRedirects(response, self.session.get_absolute_url(), fetch_redirect_response=False)
+        self.assertEqual(
+            [message.message for message in get_messages(response.wsgi_request)],
+            [MENTOR_SOLD_OUT_MESSAGE],
+        )
+        self.assertFalse(MentorOrder.objects.filter(mentor=mentor).exists())
+        self.assertFalse(EmailJob.objects.exists())
+
+    def test_confirmation_is_queued_after_the_enrollment_commits(self):
+        mentor = MentorFactory.create(background_check=True)
+        self.client.force_login(mentor.user)
+        depth = len(connection.savepoint_ids)
+        depths = []
+
+        with mock.patch(
+            'coderdojochi.views.sessions.session_confirm_mentor',
+            side_effect=lambda *args: depths.append(len(connection.savepoint_ids)),
+        ):
+            self.client.post(
+                reverse('session-sign-up', kwargs={'pk': self.session.id}),
+                REMOTE_ADDR='127.0.0.1',
+                HTTP_X_FORWARDED_FOR='127.0.0.1',
+            )
+
+        # Outside every transaction the view opened, so the session lock is gone.
+        self.assertEqual(depths, [depth])
+        self.assertTrue(MentorOrder.objects.filter(mentor=mentor, is_active=True).exists())
+
+
+# Needs row locks and concurrent writers, i.e. PostgreSQL as in production.
+@skipUnlessDBFeature('has_select_for_update')
+class TestConcurrentEnrollment(SlackMutedMixin, TransactionTestCase):
+    threads = 12
+
+    def test_parallel_sign_ups_do_not_oversell(self):
+        session = SessionFactory.create(capacity=5)
+        students = StudentFactory.create_batch(self.threads)
+        barrier = threading.Barrier(self.threads)
+        results = []
+
+        def sign_up(student):
+            try:
+                barrier.wait()
+                status, order = enroll_student(
+                    Session.objects.get(id=session.id),
+                    student.guardian,
+                    student,
+                    '127.0.0.1',
+                )
+                results.append(status)
+            finally:
+                connection.close()
+
+        workers = [threading.Thread(target=sign_up, args=[student]) for student in students]
+        for worker in workers:
+            worker.start()
+        for worker in workers:
+            worker.join()
+
+        session.refresh_from_db()
+        self.assertEqual(results.count(ENROLLED), 5)
+        self.assertEqual(results.count(SOLD_OUT), self.threads - 5)
+        self.assertEqual(session.active_student_count, 5)
+        self.assertEqual(Order.objects.filter(session=session, is_active=True).count(), 5)
+
+
+class TestEnrollmentStates(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(is_active=True, capacity=10)
+        self.student = StudentFactory.create()
+        self.guardian = self.student.guardian
+
+    def test_states_for_students_and_sessions(self):
+        other = SessionFactory.create()
+        sibling = StudentFactory.create(guardian=self.guardian)
+        OrderFactory.create(session=self.session, student=self.student)
+        OrderFactory.create(session=other, student=self.student, is_active=False)
+        OrderFactory.create(session=other, student=sibling, is_active=False)
+        OrderFactory.create(session=other, student=sibling)
+
+        with self.assertNumQueries(1):
+            states = enrollment_states(
+                self.guardian.get_students().values('id'),
+                [self.session.id, other.id],
+            )
+
+        self.assertEqual(states, {
+            (self.student.id, self.session.id): ENROLLED,
+            (self.student.id, other.id): CANCELLED,
+            (sibling.id, other.id): ENROLLED,
+        })
+
+    def test_session_page_queries_do_not_grow_with_students(self):
+        self.client.force_login(self.guardian.user)
+        url = self.session.get_absolute_url()
+        OrderFactory.create(session=self.session, student=self.student)
+
+        def page_queries():
+            with CaptureQueriesContext(connection) as queries:
+                response = self.client.get(url)
+            self.assertEqual(response.status_code, 200)
+            return response, len(queries)
+
+        response, one_student = page_queries()
+        self.assertContains(response, 'Can&#x27;t make it')
+
+        StudentFactory.create_batch(3, guardian=self.guardian)
+        response, four_students = page_queries()
+
+        self.assertEqual(four_students, one_student)
+        self.assertContains(response, 'class="button small ">Enroll</a>', count=3)
@@ -0,0 +1,46 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.db.models import F
+from django.test import TestCase, override_settings
+
+from coderdojochi.models import AttendanceStat, Guardian, Order, Session, Student
+from coderdojochi.seats import reconcile_seat_counts
+
+
+@override_settings(DEBUG=True)
+class TestGenerateFakeData(TestCase):
+    def test_generates_consistent_dataset(self):
+        out = StringIO()
+
+        call_command(
+            'generate_fake_data',
+            guardians=40,
+            mentors=20,
+            years=1,
+            equipment=5,
+            batch_size=25,
+            stdout=out,
+        )
+
+        self.assertEqual(Guardian.objects.count(), 40)
+        self.assertGreaterEqual(Student.objects.count(), 40)
+        self.assertGreater(Session.objects.count(), 150)
+        self.assertIn('rows created.', out.getvalue())
+
+        # Seat counters and stats were rebuilt after the bulk inserts.
+        self.assertEqual(reconcile_seat_counts(dry_run=True), [])
+        self.assertTrue(AttendanceStat.objects.exists())
+
+        # Students only take classes for their age, at most once each.
+        for order in Order.objects.select_related('session__course', 'student'):
+            session = order.session
+            self.assertTrue(
+                order.student.is_within_age_range(session.minimum_age, session.maximum_age, session.start_date)
+            )
+
+        self.assertFalse(Session.objects.filter(active_student_count__gt=F('capacity')).exists())
+
+    def test_refuses_without_debug(self):
+        with override_settings(DEBUG=False), self.assertRaisesMessage(Exception, '--force'):
+            call_command('generate_fake_data', guardians=1, mentors=1, years=1)
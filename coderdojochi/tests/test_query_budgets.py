@@ -0,0 +1,287 @@
+"""
+Query budgets for every page in coderdojochi/urls.py and weallcode/urls.py
+(plus the account pages), as each kind of visitor, against a seeded dataset
+of hundreds of sessions and thousands of orders.
+
+Each page is requested with a cold cache and its query count compared with
+query_budgets.json; going over fails the suite, as does a page without a
+budget or a server error. After an intended change, regenerate the file with
+
+    UPDATE_QUERY_BUDGETS=1 python manage.py test coderdojochi.tests.test_query_budgets
+
+and review the diff. QUERY_BUDGET_REPORT=<path> writes the measured query
+counts and timings as JSON; QUERY_BUDGET_SESSIONS scales the dataset.
+"""
+import json
+import os
+import re
+import time
+from datetime import timedelta
+from pathlib import Path
+
+from django.contrib.sites.models import Site
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import URLPattern, URLResolver, get_resolver
+from django.utils import timezone
+
+from allauth.socialaccount.models import SocialApp
+
+from coderdojochi.factories import (
+    CDCUserFactory,
+    CourseFactory,
+    GuardianFactory,
+    LocationFactory,
+    MentorFactory,
+)
+from coderdojochi.models import (
+    CDCUser,
+    Course,
+    Guardian,
+    Meeting,
+    MeetingOrder,
+    MeetingType,
+    Mentor,
+    MentorOrder,
+    Order,
+    Session,
+    Student,
+)
+from coderdojochi.seats import reconcile_seat_counts
+from coderdojochi.stats import rebuild_stats
+from coderdojochi.tests.base import SlackMutedMixin
+from coderdojochi.views.feeds import calendar_feed_url
+
+BUDGETS_FILE = Path(__file__).with_name('query_budgets.json')
+
+SESSIONS = int(os.environ.get('QUERY_BUDGET_SESSIONS', 300))
+ORDERS_PER_SESSION = 10
+MENTOR_ORDERS_PER_SESSION = 4
+MEETINGS = 20
+
+ROLES = ('anonymous', 'mentor', 'guardian', 'staff')
+
+# Included URL confs whose pages are budgeted, besides our inline includes;
+# the rest (allauth, loginas, anymail, ...) and the namespaced Django admin
+# are third-party.
+BUDGETED_URLCONFS = ('weallcode.urls', 'accounts.urls')
+
+
+def budgeted_routes(patterns=None, prefix=''):
+    """
+    The full route of every page, e.g. 'classes/<int:pk>/calendar/'.
+    """
+    if patterns is None:
+        patterns = get_resolver().url_patterns
+
+    routes = []
+    for pattern in patterns:
+        route = prefix + str(pattern.pattern)
+
+        if isinstance(pattern, URLPattern):
+            routes.append(route)
+
+        elif isinstance(pattern, URLResolver):
+            if pattern.namespace:
+                continue
+
+            module = getattr(pattern.urlconf_module, '__name__', None)
+
+            if isinstance(pattern.urlconf_module, list) or module in BUDGETED_URLCONFS:
+                routes += budgeted_routes(pattern.url_patterns, route)
+
+    return routes
+
+
+class TestQueryBudgets(SlackMutedMixin, TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        now = timezone.now()
+
+        courses = [
+            CourseFactory.create(course_type=Course.CAMP if n % 3 == 0 else Course.WEEKEND)
+            for n in range(6)
+        ]
+        locations = LocationFactory.create_batch(4)
+        instructors = MentorFactory.create_batch(10, background_check=True, is_public=True)
+
+        # Two thirds of the sessions are history, the rest upcoming.
+        Session.objects.bulk_create([
+            Session(
+                course=courses[n % len(courses)],
+                location=locations[n % len(locations)],
+                instructor=instructors[n % len(instructors)],
+                start_date=now + timedelta(days=7 * (n - SESSIONS * 2 // 3)),
+                capacity=20,
+                mentor_capacity=10,
+                is_active=True,
+                is_public=n % 5 != 0,
+            )
+            for n in range(SESSIONS)
+        ])
+        sessions = list(Session.objects.order_by('start_date'))
+
+        guardians = GuardianFactory.create_batch(20)
+        Student.objects.bulk_create([
+            Student(
+                guardian=guardians[n % len(guardians)],
+                first_name=f"Student {n}",
+                last_name=f"Last {n}",
+                birthday=now - timedelta(days=365 * (7 + n % 10)),
+                gender=('female', 'male', 'other')[n % 3],
+            )
+            for n in range(200)
+        ])
+        students = list(Student.objects.select_related('guardian'))
+
+        Order.objects.bulk_create([
+            Order(
+                session=session,
+                student=student,
+                guardian=student.guardian,
+                is_active=n % 8 != 0,
+                check_in=session.start_date if session.start_date < now and n % 4 else None,
+            )
+            for s, session in enumerate(sessions)
+            for n, student in enumerate(
+                students[(s * ORDERS_PER_SESSION + i) % len(students)]
+                for i in range(ORDERS_PER_SESSION)
+            )
+        ])
+
+        mentors = MentorFactory.create_batch(30, background_check=True, is_public=True, avatar_approved=True)
+        MentorOrder.objects.bulk_create([
+            MentorOrder(
+                session=session,
+                mentor=mentors[(s * MENTOR_ORDERS_PER_SESSION + i) % len(mentors)],
+            )
+            for s, session in enumerate(sessions)
+            for i in range(MENTOR_ORDERS_PER_SESSION)
+        ])
+
+        meeting_type = MeetingType.objects.create(title='Mentor Meeting', slug='mentor-meeting')
+        Meeting.objects.bulk_create([
+            Meeting(
+                meeting_type=meeting_type,
+                location=locations[0],
+                start_date=now + timedelta(days=14 * (n - MEETINGS // 2)),
+                end_date=now + timedelta(days=14 * (n - MEETINGS // 2), hours=2),
+                is_active=True,
+                is_public=True,
+            )
+            for n in range(MEETINGS)
+        ])
+        meetings = list(Meeting.objects.order_by('start_date'))
+        MeetingOrder.objects.bulk_create([
+            MeetingOrder(meeting=meeting, mentor=mentor)
+            for meeting in meetings
+            for mentor in mentors[:5]
+        ])
+
+        # The sign-up and login pages need the social apps set up in production.
+        for provider in ('facebook', 'google'):
+            app = SocialApp.objects.create(provider=provider, name=provider, client_id=provider)
+            app.sites.add(Site.objects.get_current())
+
+        # bulk_create skips the signals that keep these current.
+        reconcile_seat_counts()
+        rebuild_stats()
+
+        cls.session = sessions[SESSIONS * 2 // 3 + 1]
+        cls.meeting = meetings[MEETINGS // 2 + 1]
+
+        cls.mentor = mentors[0]
+        cls.guardian = Guardian.objects.get(id=students[0].guardian_id)
+        cls.student = students[0]
+        cls.staff = CDCUserFactory.create(role=CDCUser.MENTOR, is_staff=True, is_superuser=True)
+        Mentor.objects.create(user=cls.staff, is_active=True, background_check=True)
+
+        Order.objects.get_or_create(
+            session=cls.session,
+            student=cls.student,
+            guardian=cls.guardian,
+        )
+        cls.order = Order.objects.filter(session=cls.session).first()
+
+        cls.users = {
+            'anonymous': None,
+            'mentor': cls.mentor.user,
+            'guardian': cls.guardian.user,
+            'staff': cls.staff,
+        }
+
+    def setUp(self):
+        self.addCleanup(cache.clear)
+
+    def url(self, route, user):
+        values = {
+            'pk': self.session.id,
+            'student_id': self.student.id,
+            'meeting_id': self.meeting.id,
+            'kind': 'student',
+            'token': calendar_feed_url(user or self.guardian.user).rsplit('/', 1)[-1][:-len('.ics')],
+        }
+
+        if route.startswith('old/meetings/'):
+            values['pk'] = self.meeting.id
+        elif route.startswith('mentors/'):
+            values['pk'] = self.mentor.id
+        elif route.startswith('admin/check-in/'):
+            values['pk'] = self.order.id
+
+        return '/' + re.sub(r'<(?:\w+:)?(\w+)>', lambda match: str(values[match.group(1)]), route)
+
+    def measure(self, client, url):
+        cache.clear()
+
+        with CaptureQueriesContext(connection) as queries:
+            start = time.perf_counter()
+            response = client.get(url)
+            duration = time.perf_counter() - start
+
+        return response.status_code, len(queries), round(duration * 1000, 1)
+
+    def test_pages_stay_within_query_budgets(self):
+        budgets = json.loads(BUDGETS_FILE.read_text()) if BUDGETS_FILE.exists() else {}
+        routes = sorted(set(budgeted_routes()))
+        measured = {route: {} for route in routes}
+        problems = []
+        errors = []
+
+        for role in ROLES:
+            client = Client()
+            if self.users[role]:
+                client.force_login(self.users[role])
+
+            for route in routes:
+                status, queries, ms = self.measure(client, self.url(route, self.users[role]))
+                measured[route][role] = {'status': status, 'queries': queries, 'ms': ms}
+
+                budget = budgets.get(route, {}).get(role)
+
+                if status >= 500:
+                    errors.append(f"{role} {route}: status {status}")
+
+                if budget is None:
+                    problems.append(f"{role} {route}: no budget ({queries} queries)")
+                elif queries > budget:
+                    problems.append(f"{role} {route}: {queries} queries, budget {budget}")
+
+        if os.environ.get('QUERY_BUDGET_REPORT'):
+            Path(os.environ['QUERY_BUDGET_REPORT']).write_text(json.dumps(measured, indent=2))
+
+        self.assertFalse(errors, "\n".join(errors))
+
+        if os.environ.get('UPDATE_QUERY_BUDGETS'):
+            BUDGETS_FILE.write_text(json.dumps(
+                {
+                    route: {role: result['queries'] for role, result in results.items()}
+                    for route, results in measured.items()
+                },
+                indent=2,
+            ) + '\n')
+            return
+
+        self.assertFalse(problems, "\n".join(problems))
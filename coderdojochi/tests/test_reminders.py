@@ -0,0 +1,229 @@
+from datetime import timedelta
+
+from django.core import mail
+from django.test import TestCase, override_settings
+from django.utils import timezone
+
+import mock
+
+from coderdojochi.factories import (
+    MentorFactory,
+    MentorOrderFactory,
+    OrderFactory,
+    SessionFactory,
+    StudentFactory,
+)
+from coderdojochi.models import Order, ReminderOutbox, Session
+from coderdojochi.outbox import CLAIM_TIMEOUT, MAX_ATTEMPTS
+from coderdojochi.reminders import (
+    drain_reminder_outbox,
+    enqueue_guardian_reminders,
+    enqueue_mentor_reminders,
+    send_reminders,
+)
+from coderdojochi.tests.base import SlackMutedMixin
+
+
+@override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend')
+@mock.patch('coderdojochi.notifications.SlackNotification.send')
+class TestSendReminders(TestCase):
+    def create_session(self, days):
+        start_date = timezone.now() + timedelta(days=days)
+        return SessionFactory.create(
+            is_active=True,
+            start_date=start_date,
+        )
+
+    def test_guardian_week_reminders_marked_sent(self, mock_slack):
+        session = self.create_session(days=3)
+        orders = OrderFactory.create_batch(3, session=session)
+
+        results = send_reminders()
+
+        self.assertEqual(results['guardian_week']['queued'], 3)
+        self.assertEqual(results['outbox']['sent'], 3)
+        self.assertEqual(
+            Order.objects.filter(id__in=[o.id for o in orders], week_reminder_sent=True).count(),
+            3,
+        )
+
+        # A second run has nothing left to send.
+        results = send_reminders()
+        self.assertEqual(results['guardian_week']['queued'], 0)
+        self.assertEqual(results['outbox']['sent'], 0)
+
+    def test_query_count_does_not_grow_with_orders(self, mock_slack):
+        session = self.create_session(days=3)
+        OrderFactory.create(session=session)
+        MentorOrderFactory.create(session=session)
+        small = send_reminders()
+
+        Order.objects.update(week_reminder_sent=False)
+        Session.objects.update(mentors_week_reminder_sent=False)
+        for _ in range(5):
+            other_session = self.create_session(days=4)
+            OrderFactory.create_batch(4, session=other_session)
+            MentorOrderFactory.create_batch(2, session=other_session)
+        large = send_reminders()
+
+        self.assertEqual(large['guardian_week']['queued'], 21)
+        self.assertEqual(large['mentor_week']['queued'], 11)
+        self.assertEqual(large['guardian_week']['queries'], small['guardian_week']['queries'])
+        self.assertEqual(large['mentor_week']['queries'], small['mentor_week']['queries'])
+
+    def test_no_due_orders_sends_nothing(self, mock_slack):
+        self.create_session(days=30)
+
+        results = send_reminders()
+
+        self.assertEqual(sum(stats.get('sent', 0) for stats in results.values()), 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+
+@override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend')
+class TestReminderOutbox(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+        self.session = SessionFactory.create(
+            is_active=True,
+            start_date=self.now + timedelta(days=3),
+        )
+
+    def enqueue(self):
+        return enqueue_guardian_reminders(
+            ReminderOutbox.GUARDIAN_WEEK,
+            self.now + timedelta(days=1),
+            self.now + timedelta(days=7),
+        )
+
+    def test_overlapping_runs_queue_each_order_once(self):
+        OrderFactory.create_batch(2, session=self.session)
+        self.enqueue()
+
+        # Simulate a second run that loaded the orders before the first committed.
+        Order.objects.update(week_reminder_sent=False)
+        self.enqueue()
+
+        self.assertEqual(ReminderOutbox.objects.count(), 2)
+
+        drain_reminder_outbox()
+        drain_reminder_outbox()
+
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(mail.outbox[0].to), 2)
+
+    def test_guardian_with_two_students_gets_two_emails(self):
+        first = OrderFactory.create(session=self.session)
+        second_student = StudentFactory.create(guardian=first.guardian)
+        OrderFactory.create(session=self.session, student=second_student)
+        self.enqueue()
+
+        stats = drain_reminder_outbox()
+
+        self.assertEqual(stats['sent'], 2)
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            {m.merge_data[first.guardian.user.email]['student_first_name'] for m in mail.outbox},
+            {first.student.first_name, second_student.first_name},
+        )
+
+    def test_failed_send_is_retried(self):
+        OrderFactory.create_batch(2, session=self.session)
+        self.enqueue()
+
+        with mock.patch('coderdojochi.reminders.email', side_effect=Exception('SendGrid is down')):
+            stats = drain_reminder_outbox()
+
+        self.assertEqual(stats['failed'], 2)
+        self.assertEqual(
+            list(ReminderOutbox.objects.values_list('status', 'attempts')),
+            [(ReminderOutbox.PENDING, 1)] * 2,
+        )
+
+        stats = drain_reminder_outbox()
+
+        self.assertEqual(stats['sent'], 2)
+        self.assertFalse(ReminderOutbox.objects.exclude(status=ReminderOutbox.SENT).exists())
+
+    def test_claimed_rows_are_not_sent_again(self):
+        OrderFactory.create_batch(2, session=self.session)
+        self.enqueue()
+
+        # Another run claimed these moments ago and is still sending.
+        ReminderOutbox.objects.update(status=ReminderOutbox.SENDING, claimed_at=timezone.now())
+
+        stats = drain_reminder_outbox()
+
+        self.assertEqual(stats['sent'], 0)
+        self.assertEqual(len(mail.outbox), 0)
+
+    def test_stale_claim_on_last_attempt_is_failed(self):
+        OrderFactory.create(session=self.session)
+        self.enqueue()
+
+        # The run that made the last attempt died mid-send.
+        ReminderOutbox.objects.update(
+            status=ReminderOutbox.SENDING,
+            claimed_at=timezone.now() - CLAIM_TIMEOUT - timedelta(minutes=1),
+            attempts=MAX_ATTEMPTS,
+        )
+
+        stats = drain_reminder_outbox()
+
+        self.assertEqual(stats['sent'], 0)
+        self.assertEqual(ReminderOutbox.objects.get().status, ReminderOutbox.FAILED)
+
+
+@override_settings(EMAIL_BACKEND='anymail.backends.test.EmailBackend')
+class TestMentorReminders(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.now = timezone.now()
+
+    def create_session(self):
+        return SessionFactory.create(
+            is_active=True,
+            start_date=self.now + timedelta(hours=12),
+        )
+
+    def enqueue(self):
+        return enqueue_mentor_reminders(
+            ReminderOutbox.MENTOR_DAY,
+            self.now - timedelta(days=2),
+            self.now + timedelta(days=1),
+        )
+
+    def test_each_mentor_emailed_once_per_session(self):
+        sessions = [self.create_session() for _ in range(4)]
+        for session in sessions:
+            MentorOrderFactory.create_batch(3, session=session)
+
+        self.enqueue()
+        drain_reminder_outbox()
+
+        # All sessions go out in one send, one recipient per mentor order.
+        self.assertEqual(len(mail.outbox), 1)
+        self.assertEqual(len(mail.outbox[0].to), 12)
+        self.assertFalse(Session.objects.filter(mentors_day_reminder_sent=False).exists())
+
+    def test_mentor_in_two_sessions_gets_both(self):
+        mentor = MentorFactory.create()
+        first = MentorOrderFactory.create(mentor=mentor, session=self.create_session())
+        second = MentorOrderFactory.create(mentor=mentor, session=self.create_session())
+
+        self.enqueue()
+        drain_reminder_outbox()
+
+        self.assertEqual(len(mail.outbox), 2)
+        self.assertEqual(
+            {m.merge_data[mentor.user.email]['order_id'] for m in mail.outbox},
+            {first.id, second.id},
+        )
+
+    def test_inactive_mentor_orders_skipped(self):
+        session = self.create_session()
+        MentorOrderFactory.create(session=session, is_active=False)
+        MentorOrderFactory.create(session=session)
+
+        stats = self.enqueue()
+
+        self.assertEqual(stats['queued'], 1)
@@ -0,0 +1,64 @@
+from django.test import TestCase, override_settings
+from django.urls import reverse
+
+import mock
+
+from coderdojochi.factories import SessionFactory
+from coderdojochi.tests.base import SlackMutedMixin
+
+
+@override_settings(
+    REQUEST_TIMING_SAMPLE_RATE=1,
+    REQUEST_TIMING_SLOW_REQUEST_MS=60000,
+    REQUEST_TIMING_SLOW_QUERY_MS=60000,
+    REQUEST_TIMING_HEADER=True,
+)
+class TestRequestTiming(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(is_active=True, is_public=True)
+
+    def test_sampled_request_is_logged_with_timings(self):
+        with self.assertLogs('coderdojochi.timing', 'INFO') as logs:
+            response = self.client.get(self.session.get_absolute_url())
+
+        self.assertEqual(response.status_code, 200)
+
+        record = logs.records[0]
+        self.assertEqual(record.levelname, 'INFO')
+        self.assertEqual(record.view, 'session-detail')
+        self.assertEqual(record.status, 200)
+        self.assertGreater(record.queries, 0)
+        self.assertGreater(record.template_ms, 0)
+        self.assertGreaterEqual(record.total_ms, record.template_ms)
+        self.assertEqual(record.slow_queries, [])
+
+        self.assertRegex(
+            response['Server-Timing'],
+            rf'^db;dur=[\d.]+;desc="{record.queries} queries", tpl;dur=[\d.]+, total;dur=[\d.]+$',
+        )
+
+    @override_settings(REQUEST_TIMING_SLOW_QUERY_MS=0)
+    def test_slow_queries_are_logged_as_warnings(self):
+        with self.assertLogs('coderdojochi.timing', 'INFO') as logs:
+            self.client.get(self.session.get_absolute_url())
+
+        record = logs.records[0]
+        self.assertEqual(record.levelname, 'WARNING')
+        self.assertEqual(len(record.slow_queries), record.queries)
+        self.assertTrue(any(query['sql'].startswith('SELECT') for query in record.slow_queries))
+
+    @override_settings(REQUEST_TIMING_SAMPLE_RATE=0)
+    def test_unsampled_request_is_only_logged_when_slow(self):
+        with mock.patch('coderdojochi.timing.logger') as logger:
+            response = self.client.get(reverse('weallcode-home'))
+
+        self.assertNotIn('Server-Timing', response)
+        logger.log.assert_not_called()
+
+        with override_settings(REQUEST_TIMING_SLOW_REQUEST_MS=0):
+            with self.assertLogs('coderdojochi.timing', 'WARNING') as logs:
+                self.client.get(reverse('weallcode-home'))
+
+        record = logs.records[0]
+        self.assertFalse(record.sampled)
+        self.assertFalse(hasattr(record, 'queries'))
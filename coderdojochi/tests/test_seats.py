@@ -0,0 +1,83 @@
+from io import StringIO
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from coderdojochi.factories import MentorOrderFactory, OrderFactory, SessionFactory
+from coderdojochi.models import MentorOrder, Order, Session
+from coderdojochi.seats import reconcile_seat_counts
+from coderdojochi.tests.base import SlackMutedMixin
+
+
+class TestSeatCounts(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(capacity=2)
+
+    def assertSeats(self, session, students, mentors):
+        session.refresh_from_db()
+        self.assertEqual(
+            (session.active_student_count, session.active_mentor_count),
+            (students, mentors),
+        )
+
+    def test_orders_take_and_free_seats(self):
+        order = OrderFactory.create(session=self.session)
+        mentor_order = MentorOrderFactory.create(session=self.session)
+        OrderFactory.create(session=self.session, is_active=False)
+        self.assertSeats(self.session, 1, 1)
+
+        order.is_active = False
+        order.save()
+        mentor_order.delete()
+        self.assertSeats(self.session, 0, 0)
+
+        order.is_active = True
+        order.save()
+        order.save()
+        self.assertSeats(self.session, 1, 0)
+
+    def test_moving_an_order_moves_its_seat(self):
+        other = SessionFactory.create()
+        order = OrderFactory.create(session=self.session)
+
+        order.session = other
+        order.save()
+
+        self.assertSeats(self.session, 0, 0)
+        self.assertSeats(other, 1, 0)
+
+    def test_saving_a_stale_session_keeps_the_counters(self):
+        session = Session.objects.get(id=self.session.id)
+        OrderFactory.create(session=self.session)
+
+        session.capacity = 3
+        session.save()
+
+        self.assertSeats(self.session, 1, 0)
+        self.assertEqual(self.session.capacity, 3)
+
+    def test_reconcile_repairs_drift(self):
+        OrderFactory.create(session=self.session)
+        MentorOrderFactory.create(session=self.session)
+        untouched = SessionFactory.create()
+
+        # Queryset updates bypass the signals.
+        Order.objects.update(is_active=False)
+        MentorOrder.objects.filter(session=self.session).update(session=untouched)
+
+        self.assertEqual(
+            reconcile_seat_counts(dry_run=True),
+            [
+                (self.session.id, (1, 1), (0, 0)),
+                (untouched.id, (0, 0), (0, 1)),
+            ],
+        )
+        self.assertSeats(self.session, 1, 1)
+
+        out = StringIO()
+        call_command('reconcile_seat_counts', stdout=out)
+
+        self.assertIn('2 drifted sessions fixed.', out.getvalue())
+        self.assertSeats(self.session, 0, 0)
+        self.assertSeats(untouched, 0, 1)
+        self.assertEqual(reconcile_seat_counts(), [])
@@ -0,0 +1,176 @@
+from collections import Counter
+from datetime import datetime
+
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.timezone import utc
+
+from coderdojochi.admin import student_check_in, student_check_out
+from coderdojochi.factories import CDCUserFactory, OrderFactory, SessionFactory, StudentFactory
+from coderdojochi.models import AttendanceStat, Order
+from coderdojochi.stats import age_counts, gender_counts, global_stats, rebuild_stats
+from coderdojochi.tests.base import SlackMutedMixin
+
+
+class TestAttendanceStats(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(
+            start_date=datetime(2020, 6, 1, 15, tzinfo=utc),
+        )
+
+    def stored_stats(self):
+        return set(AttendanceStat.objects.filter(count__gt=0).values_list('session_id', 'dimension', 'key', 'count'))
+
+    def test_check_in_updates_session_and_global_stats(self):
+        order = OrderFactory.create(
+            session=self.session,
+            student=StudentFactory.create(gender='Boy', birthday=datetime(2010, 9, 1, tzinfo=utc)),
+        )
+
+        self.assertEqual(global_stats()['attendance'], {'orders': 1})
+
+        order.check_in = timezone.now()
+        order.save()
+
+        stats = global_stats()
+        self.assertEqual(stats['attendance'], {'orders': 1, 'checked_in': 1})
+        self.assertEqual(stats['gender'], {'male': 1})
+        self.assertEqual(stats['age'], {'9': 1})
+        self.assertEqual(
+            AttendanceStat.objects.get(session=self.session, dimension='gender', key='male').count,
+            1,
+        )
+
+        order.check_in = None
+        order.save()
+
+        self.assertEqual(global_stats()['attendance'], {'orders': 1})
+        self.assertEqual(global_stats()['gender'], {})
+
+    def test_admin_actions_keep_stats_current(self):
+        OrderFactory.create_batch(3, session=self.session)
+        other = OrderFactory.create()
+
+        student_check_in(None, None, Order.objects.all())
+        self.assertEqual(global_stats()['attendance']['checked_in'], 4)
+
+        student_check_out(None, None, Order.objects.filter(id=other.id))
+        self.assertEqual(global_stats()['attendance']['checked_in'], 3)
+
+    def test_incremental_stats_match_rebuild(self):
+        OrderFactory.create_batch(2, session=self.session, check_in=timezone.now())
+        order = OrderFactory.create(check_in=timezone.now())
+        OrderFactory.create(session=self.session, is_active=False)
+
+        # Moving an order recounts both sessions.
+        order.session = self.session
+        order.save()
+
+        order.student.gender = 'm'
+        order.student.save()
+
+        incremental = self.stored_stats()
+        rebuild_stats()
+
+        self.assertEqual(incremental, self.stored_stats())
+
+    def test_global_stats_is_one_query(self):
+        OrderFactory.create_batch(5, session=self.session, check_in=timezone.now())
+
+        with self.assertNumQueries(1):
+            stats = global_stats()
+
+        self.assertEqual(stats['attendance']['checked_in'], 5)
+
+    def test_check_in_only_touches_its_own_sessions_rows(self):
+        other = OrderFactory.create(check_in=timezone.now())
+        order = OrderFactory.create(session=self.session)
+        other_rows = set(AttendanceStat.objects.filter(session=other.session).values_list('id', 'count'))
+
+        order.check_in = timezone.now()
+        order.save()
+
+        self.assertEqual(
+            set(AttendanceStat.objects.filter(session=other.session).values_list('id', 'count')),
+            other_rows,
+        )
+        self.assertEqual(global_stats()['attendance']['checked_in'], 2)
+
+
+class TestSessionDemographics(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.client.force_login(CDCUserFactory.create(is_staff=True))
+
+    def create_session(self, students):
+        session = SessionFactory.create(
+            start_date=datetime(2020, 6, 1, 15, tzinfo=utc),
+        )
+        genders = ['Girl', 'm', 'F', 'non-binary']
+        for n in range(students):
+            OrderFactory.create(
+                session=session,
+                check_in=timezone.now() if n % 2 else None,
+                student=StudentFactory.create(
+                    gender=genders[n % len(genders)],
+                    birthday=datetime(2010 + n % 3, 6, 1 + n % 2, tzinfo=utc),
+                ),
+            )
+        return session
+
+    def count_queries(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+
+        self.assertEqual(response.status_code, 200)
+        return len(queries), response
+
+    def test_histograms_match_python(self):
+        session = self.create_session(8)
+        orders = Order.objects.filter(session=session, is_active=True).select_related('student', 'session')
+
+        self.assertEqual(
+            dict(gender_counts(orders)),
+            Counter(order.student.get_clean_gender() for order in orders),
+        )
+        self.assertEqual(
+            {age: count for age, count, checked_in in age_counts(orders)},
+            Counter(order.student.get_age(order.session.start_date) for order in orders),
+        )
+
+    def test_session_stats_query_count_is_constant(self):
+        small, response = self.count_queries(reverse('stats', args=[self.create_session(2).id]))
+        large, response = self.count_queries(reverse('stats', args=[self.create_session(12).id]))
+
+        self.assertEqual(small, large)
+        self.assertEqual(response.context['checked_in_count'], 6)
+        self.assertEqual(
+            dict(response.context['gender_count']),
+            {'female': 6, 'male': 3, 'other': 3},
+        )
+
+    def test_session_check_in_query_count_is_constant(self):
+        small, response = self.count_queries(reverse('student-check-in', args=[self.create_session(2).id]))
+        large, response = self.count_queries(reverse('student-check-in', args=[self.create_session(12).id]))
+
+        self.assertEqual(small, large)
+        self.assertEqual(sum(count for age, count in response.context['age_count']), 6)
+
+    def test_session_check_in_counts_student_history(self):
+        session = self.create_session(2)
+        student = session.order_set.order_by('id').first().student
+        OrderFactory.create(student=student, check_in=timezone.now())
+        OrderFactory.create(student=student, check_in=timezone.now(), is_active=False)
+        OrderFactory.create(student=student)
+
+        count, response = self.count_queries(reverse('student-check-in', args=[session.id]))
+
+        history = {
+            order.student_id: (order.num_attended, order.num_missed)
+            for order in response.context['no_show_orders'] + response.context['checked_in_orders']
+        }
+        self.assertEqual(history[student.id], (2, 2))
+        self.assertEqual(len(response.context['no_show_orders']), 1)
+        self.assertEqual(len(response.context['checked_in_orders']), 1)
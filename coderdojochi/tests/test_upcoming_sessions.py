@@ -0,0 +1,77 @@
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from coderdojochi.factories import CDCUserFactory, OrderFactory, SessionFactory
+from coderdojochi.models import Course
+from coderdojochi.tests.base import SlackMutedMixin, run_on_commit
+
+
+class TestUpcomingSessions(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.addCleanup(cache.clear)
+        cache.clear()
+
+        start_date = timezone.now() + timedelta(days=7)
+        self.weekend = SessionFactory.create(
+            is_active=True,
+            is_public=True,
+            start_date=start_date,
+            capacity=1,
+            course__title='Weekend Class',
+        )
+        self.camp = SessionFactory.create(
+            is_active=True,
+            is_public=True,
+            start_date=start_date,
+            course__title='Summer Camp',
+            course__course_type=Course.CAMP,
+        )
+        self.private = SessionFactory.create(
+            is_active=True,
+            start_date=start_date,
+            course__title='Private Class',
+        )
+
+    def test_anonymous_pages_are_served_from_cache(self):
+        for name in ('weallcode-home', 'weallcode-programs', 'weallcode-programs-summer-camps'):
+            self.client.get(reverse(name))
+
+            with self.assertNumQueries(0):
+                response = self.client.get(reverse(name))
+
+            self.assertEqual(response.status_code, 200)
+
+        self.assertEqual(list(response.context['summer_camp_classes']), [self.camp])
+
+    def test_programs_lists_public_sessions_by_type(self):
+        response = self.client.get(reverse('weallcode-programs'))
+
+        self.assertEqual(list(response.context['weekend_classes']), [self.weekend])
+        self.assertNotContains(response, 'Private Class')
+
+    def test_mentors_see_private_sessions(self):
+        self.client.force_login(CDCUserFactory.create(role='mentor'))
+
+        response = self.client.get(reverse('weallcode-programs'))
+
+        self.assertEqual(
+            {session.id for session in response.context['weekend_classes']},
+            {self.weekend.id, self.private.id},
+        )
+
+    def test_changes_invalidate_the_listing(self):
+        self.client.get(reverse('weallcode-programs'))
+
+        with run_on_commit():
+            OrderFactory.create(session=self.weekend)
+            self.camp.course.title = 'Renamed Camp'
+            self.camp.course.save()
+
+        response = self.client.get(reverse('weallcode-programs'))
+
+        self.assertContains(response, 'Renamed Camp')
+        self.assertContains(response, 'Join Waitlist')
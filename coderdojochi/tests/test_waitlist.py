@@ -0,0 +1,111 @@
+from datetime import timedelta
+
+from django.test import TestCase, override_settings
+from django.urls import reverse
+from django.utils import timezone
+
+from coderdojochi.enrollment import ENROLLED, SOLD_OUT, enroll_student
+from coderdojochi.factories import OrderFactory, SessionFactory, StudentFactory
+from coderdojochi.models import EmailJob, Order, WaitlistEntry
+from coderdojochi.tests.base import SlackMutedMixin
+from coderdojochi.waitlist import held_seats, join_waitlist, promote_waitlist, promote_waitlists
+
+
+@override_settings(WAITLIST_HOLD_HOURS=24)
+class TestWaitlist(SlackMutedMixin, TestCase):
+    def setUp(self):
+        self.session = SessionFactory.create(
+            is_active=True,
+            capacity=1,
+            start_date=timezone.now() + timedelta(days=7),
+            gender_limitation='female',
+        )
+        self.order = OrderFactory.create(session=self.session)
+
+        self.ineligible = join_waitlist(self.session, StudentFactory.create(gender='male'))
+        self.first = join_waitlist(self.session, StudentFactory.create())
+        self.second = join_waitlist(self.session, StudentFactory.create())
+
+    def assertStatuses(self, *statuses):
+        self.assertEqual(
+            [entry.status for entry in WaitlistEntry.objects.order_by('id')],
+            list(statuses),
+        )
+
+    def test_cancellation_holds_seat_for_next_eligible_student(self):
+        self.client.force_login(self.order.guardian.user)
+
+        self.client.post(
+            reverse('session-sign-up', kwargs={'pk': self.session.id, 'student_id': self.order.student.id}),
+            REMOTE_ADDR='127.0.0.1',
+            HTTP_X_FORWARDED_FOR='127.0.0.1',
+        )
+
+        self.order.refresh_from_db()
+        self.assertFalse(self.order.is_active)
+        self.assertStatuses(WaitlistEntry.WAITING, WaitlistEntry.HELD, WaitlistEntry.WAITING)
+
+        job = EmailJob.objects.get()
+        self.assertEqual(job.template_name, 'waitlist-offer-guardian')
+        self.assertEqual(job.payload['recipients'], [self.first.guardian.user.email])
+
+        # The held seat is only for the promoted student.
+        second = self.second.student
+        self.assertEqual(enroll_student(self.session, second.guardian, second, '127.0.0.1')[0], SOLD_OUT)
+
+        first = self.first.student
+        self.assertEqual(enroll_student(self.session, first.guardian, first, '127.0.0.1')[0], ENROLLED)
+        self.assertStatuses(WaitlistEntry.WAITING, WaitlistEntry.ENROLLED, WaitlistEntry.WAITING)
+
+    def test_cron_expires_holds_and_promotes_in_order(self):
+        self.order.is_active = False
+        self.order.save()
+
+        self.assertEqual(promote_waitlists(), {'sessions': 1, 'promoted': 1, 'expired': 0})
+        self.assertStatuses(WaitlistEntry.WAITING, WaitlistEntry.HELD, WaitlistEntry.WAITING)
+
+        # Nothing to do until the hold runs out.
+        self.assertEqual(promote_waitlists()['sessions'], 0)
+
+        results = promote_waitlists(now=timezone.now() + timedelta(hours=25))
+
+        self.assertEqual(results, {'sessions': 1, 'promoted': 1, 'expired': 1})
+        self.assertStatuses(WaitlistEntry.WAITING, WaitlistEntry.EXPIRED, WaitlistEntry.HELD)
+        self.assertEqual(EmailJob.objects.count(), 2)
+
+    def test_lapsed_holds_stop_counting_before_they_are_expired(self):
+        WaitlistEntry.objects.filter(id=self.first.id).update(
+            status=WaitlistEntry.HELD,
+            held_until=timezone.now() - timedelta(minutes=1),
+        )
+
+        self.assertEqual(held_seats(self.session), 0)
+
+    def test_students_already_signed_up_are_not_promoted(self):
+        self.session.capacity = 3
+        self.session.save()
+        Order.objects.create(
+            session=self.session,
+            student=self.first.student,
+            guardian=self.first.guardian,
+        )
+
+        promoted, expired = promote_waitlist(self.session)
+
+        self.assertEqual(promoted, [self.second])
+
+    def test_guardian_joins_and_leaves_waitlist(self):
+        student = StudentFactory.create()
+        self.client.force_login(student.guardian.user)
+        url = self.session.get_absolute_url()
+
+        response = self.client.get(url)
+        self.assertContains(response, 'Add to Waitlist')
+
+        self.client.post(url, {'waitlist': 'student', 'account_id': student.id, 'remove': 'false'})
+        self.assertEqual(WaitlistEntry.objects.get(student=student).status, WaitlistEntry.WAITING)
+        self.assertContains(self.client.get(url), 'Remove from Waitlist')
+
+        self.client.post(url, {'waitlist': 'student', 'account_id': student.id, 'remove': 'true'})
+        self.assertFalse(WaitlistEntry.objects.filter(student=student).exists())
+        self.assertEqual(Order.objects.filter(student=student).count(), 0)
@@ -0,0 +1,150 @@
+"""
+Per-request timings for production, where debug_toolbar isn't around.
+
+RequestTimingMiddleware times every request. A sample of them, picked by
+REQUEST_TIMING_SAMPLE_RATE, is instrumented further: every query goes
+through a `RequestTimer` installed with `connection.execute_wrapper`, and
+Django template rendering is timed by `instrument_templates`. Sampled
+requests are logged to the 'coderdojochi.timing' logger, which writes JSON,
+and get a Server-Timing header. Requests over REQUEST_TIMING_SLOW_REQUEST_MS
+are logged as warnings whether sampled or not, as are sampled requests that
+ran a query over REQUEST_TIMING_SLOW_QUERY_MS.
+
+Queries run while rendering count towards both the database and the
+template time.
+"""
+import logging
+import time
+from contextlib import ExitStack, contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.db import connections
+from django.template.base import Template
+
+logger = logging.getLogger(__name__)
+
+current_timer = ContextVar('current_timer', default=None)
+
+# Long enough to recognise a query without flooding the logs.
+SLOW_QUERY_SQL_LENGTH = 1000
+
+
+class RequestTimer:
+    def __init__(self, sampled):
+        self.sampled = sampled
+        self.slow_query_ms = settings.REQUEST_TIMING_SLOW_QUERY_MS
+        self.queries = 0
+        self.db_ms = 0.0
+        self.template_ms = 0.0
+        self.total_ms = 0.0
+        self.slow_queries = []
+        self._template_depth = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        start = time.perf_counter()
+
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            ms = (time.perf_counter() - start) * 1000
+            self.queries += 1
+            self.db_ms += ms
+
+            if ms >= self.slow_query_ms:
+                self.slow_queries.append({
+                    'sql': sql[:SLOW_QUERY_SQL_LENGTH],
+                    'ms': round(ms, 1),
+                    'database': context['connection'].alias,
+                })
+
+    @contextmanager
+    def measure(self):
+        """
+        Time the block, instrumenting the queries and templates in it if
+        sampled.
+        """
+        start = time.perf_counter()
+        token = current_timer.set(self)
+
+        try:
+            with ExitStack() as stack:
+                if self.sampled:
+                    for connection in connections.all():
+                        stack.enter_context(connection.execute_wrapper(self))
+
+                yield self
+        finally:
+            current_timer.reset(token)
+            self.total_ms = (time.perf_counter() - start) * 1000
+
+    def time_template(self, render, template, context):
+        # Included templates render inside their parent; count the outermost.
+        if self._template_depth:
+            return render(template, context)
+
+        start = time.perf_counter()
+        self._template_depth += 1
+
+        try:
+            return render(template, context)
+        finally:
+            self._template_depth -= 1
+            self.template_ms += (time.perf_counter() - start) * 1000
+
+    @property
+    def is_slow(self):
+        return bool(self.slow_queries) or self.total_ms >= settings.REQUEST_TIMING_SLOW_REQUEST_MS
+
+    def server_timing(self):
+        """
+        The Server-Timing header value.
+        """
+        return ', '.join([
+            f'db;dur={self.db_ms:.1f};desc="{self.queries} queries"',
+            f'tpl;dur={self.template_ms:.1f}',
+            f'total;dur={self.total_ms:.1f}',
+        ])
+
+    def log(self, request, response):
+        if not self.sampled and not self.is_slow:
+            return
+
+        fields = {
+            'method': request.method,
+            'url': request.path,
+            'view': request.resolver_match.view_name if request.resolver_match else None,
+            'status': response.status_code,
+            'sampled': self.sampled,
+            'total_ms': round(self.total_ms, 1),
+        }
+
+        if self.sampled:
+            fields.update({
+                'queries': self.queries,
+                'db_ms': round(self.db_ms, 1),
+                'template_ms': round(self.template_ms, 1),
+                'slow_queries': self.slow_queries,
+            })
+
+        logger.log(
+            logging.WARNING if self.is_slow else logging.INFO,
+            f"{request.method} {request.path} {response.status_code} in {self.total_ms:.0f}ms",
+            extra=fields,
+        )
+
+
+_render = Template.render
+
+
+def timed_render(self, context):
+    timer = current_timer.get()
+
+    if timer is None or not timer.sampled:
+        return _render(self, context)
+
+    return timer.time_template(_render, self, context)
+
+
+def instrument_templates():
+    Template.render = timed_render
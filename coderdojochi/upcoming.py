@@ -0,0 +1,50 @@
+from django.core.cache import cache
+from django.utils import timezone
+
+from coderdojochi.cache import UPCOMING_SESSIONS, get_cached, versioned_key
+from coderdojochi.models import Session
+
+UPCOMING_SESSIONS_TIMEOUT = 60 * 60
+
+
+def load_upcoming_sessions(mentor=False):
+    """
+    Active sessions that haven't started, with their course and location.
+    Private sessions are only listed for mentors.
+    """
+    sessions = Session.objects.filter(
+        is_active=True,
+        start_date__gte=timezone.now(),
+    ).select_related(
+        'course',
+        'location',
+    ).order_by('start_date')
+
+    if not mentor:
+        sessions = sessions.filter(is_public=True)
+
+    return list(sessions)
+
+
+def upcoming_sessions(user, course_type=None):
+    """
+    The upcoming sessions `user` may see, optionally of one course type. The
+    listing is cached in a public and a mentor variant until a session, its
+    course or location, or an order changes; sessions that have started
+    since are dropped on the way out.
+    """
+    mentor = user.is_authenticated and user.role == 'mentor'
+    key = versioned_key(UPCOMING_SESSIONS, 'mentor' if mentor else 'public')
+
+    sessions = get_cached(UPCOMING_SESSIONS, key)
+
+    if sessions is None:
+        sessions = load_upcoming_sessions(mentor=mentor)
+        cache.set(key, sessions, UPCOMING_SESSIONS_TIMEOUT)
+
+    now = timezone.now()
+
+    return [
+        session for session in sessions
+        if session.start_date >= now and course_type in (None, session.course.course_type)
+    ]
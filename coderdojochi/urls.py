@@ -11,6 +11,8 @@ from django.views.generic import RedirectView
 from loginas import views as loginas_views
 
 from . import old_views
+from .views.check_in import check_in_sync, check_in_toggle
+from .views.feeds import CalendarFeedResetView, CalendarFeedView
 from .views.meetings import (
     MeetingCalendarView,
     MeetingDetailView,
@@ -98,6 +100,9 @@ urlpatterns += [
             # /admin/classes/ID/check-in/
             path('<int:pk>/check-in/', old_views.session_check_in, name='student-check-in'),
 
+            # /admin/classes/ID/check-in/sync/
+            path('<int:pk>/check-in/sync/', check_in_sync, name='check-in-sync'),
+
             # /admin/classes/ID/check-in-mentors/
             path('<int:pk>/check-in-mentors/', old_views.session_check_in_mentors, name='mentor-check-in'),
 
@@ -110,6 +115,9 @@ urlpatterns += [
             path('<int:meeting_id>/check-in/', old_views.meeting_check_in, name='meeting-check-in'),
         ])),
 
+        # /admin/check-in/KIND/ID/
+        path('check-in/<slug:kind>/<int:pk>/', check_in_toggle, name='check-in-toggle'),
+
         # Admin Check System
         # /admin/checksystem/
         path('checksystem/', old_views.check_system, name='check-system'),
@@ -153,6 +161,20 @@ urlpatterns += [
 
 ]
 
+# Calendar feeds
+urlpatterns += [
+    path('calendar/', include([
+        # /calendar/classes.ics
+        path('classes.ics', CalendarFeedView.as_view(), name='calendar-feed'),
+
+        # /calendar/TOKEN.ics
+        path('<str:token>.ics', CalendarFeedView.as_view(), name='calendar-feed-user'),
+
+        # /calendar/reset/
+        path('reset/', CalendarFeedResetView.as_view(), name='calendar-feed-reset'),
+    ])),
+]
+
 # Mentors
 # TODO: Uncomment `app_name` after we move mentors to it's own app.
 # app_name = 'mentors'
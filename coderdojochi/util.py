@@ -1,18 +1,86 @@
 import logging
+import re
+import threading
+import time
+from collections import OrderedDict, defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
 
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core.mail import EmailMultiAlternatives
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.models import Case, F, Value, When
 from django.template.loader import render_to_string
 from django.utils import timezone
 
-from anymail.exceptions import AnymailAPIError
+from anymail.exceptions import AnymailAPIError, AnymailRecipientsRefused
 from anymail.message import AnymailMessage
 
 logger = logging.getLogger(__name__)
 
 User = get_user_model()
 
+MERGE_FIELD_FORMAT = "*|{}|*"
+MERGE_FIELD_RE = re.compile(r"\*\|(\w+)\|\*")
+
+# Rendered email bodies and the merge fields they contain, keyed on the
+# template name and the values of every context variable the template has
+# looked at. Most of an email's data is sent as merge fields rather than
+# rendered, so repeat sends of the same template almost always hit.
+TEMPLATE_CACHE_SIZE = 256
+_template_cache = OrderedDict()
+_template_variables = defaultdict(set)
+_template_cache_lock = threading.Lock()
+
+
+class _RecordingContext(dict):
+    """
+    Template context that notes every variable name the template looks up.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.accessed = set()
+
+    def __contains__(self, key):
+        self.accessed.add(key)
+        return super().__contains__(key)
+
+
+def _template_signature(template_name, context):
+    variables = sorted(_template_variables[template_name])
+    return (template_name,) + tuple(
+        (name, repr(context.get(name))) for name in variables
+    )
+
+
+def render_email_template(template_name, context):
+    """
+    Render `{template_name}.html` and return the body along with the set of
+    `*|key|*` merge fields it contains. Results are cached, so a repeat render
+    with the same values for the variables the template uses does no template
+    work at all.
+    """
+    with _template_cache_lock:
+        key = _template_signature(template_name, context)
+        if key in _template_cache:
+            _template_cache.move_to_end(key)
+            return _template_cache[key]
+
+    recording_context = _RecordingContext(context)
+    body = render_to_string(f"{template_name}.html", recording_context)
+    result = (body, frozenset(MERGE_FIELD_RE.findall(body)))
+
+    with _template_cache_lock:
+        _template_variables[template_name] |= recording_context.accessed
+        _template_cache[_template_signature(template_name, context)] = result
+
+        while len(_template_cache) > TEMPLATE_CACHE_SIZE:
+            _template_cache.popitem(last=False)
+
+    return result
+
 
 def email(
     subject,
@@ -20,12 +88,14 @@ def email(
     attachments=[],
     batch_size=500,
     bcc=None,
+    concurrency=1,
     merge_data={},
     merge_global_data={},
     mixed_subtype=None,
     preheader=None,
     recipients=[],
     reply_to=None,
+    retries=0,
     unsub_group_id=None,
 ):
 
@@ -40,25 +110,27 @@ def email(
     if bcc not in [False, None] and not isinstance(bcc, list):
         raise TypeError("recipients must be a list")
 
-    merge_global_data['subject'] = subject
-    merge_global_data['current_year'] = timezone.now().year
-    merge_global_data['company_name'] = settings.SITE_NAME
-    merge_global_data['site_url'] = settings.SITE_URL
-    merge_global_data['preheader'] = preheader
-    merge_global_data['unsub_group_id'] = unsub_group_id
+    merge_global_data = {
+        **merge_global_data,
+        'subject': subject,
+        'current_year': timezone.now().year,
+        'company_name': settings.SITE_NAME,
+        'site_url': settings.SITE_URL,
+        'preheader': preheader,
+        'unsub_group_id': unsub_group_id,
+    }
 
-    body = render_to_string(f"{template_name}.html", merge_global_data)
+    body, merge_fields = render_email_template(template_name, merge_global_data)
 
     # If we send values that don't exist in the template,
     # SendGrid divides by zero, doesn't pass go, does not collect $200.
-    merge_field_format = "*|{}|*"
     final_merge_global_data = {}
     for key, val in merge_global_data.items():
-        if merge_field_format.format(key) in body:
+        if key in merge_fields:
             final_merge_global_data[key] = "" if val is None else str(val)
 
-    esp_extra={
-        'merge_field_format': merge_field_format,
+    esp_extra = {
+        'merge_field_format': MERGE_FIELD_FORMAT,
         'categories': [template_name],
     }
 
@@ -67,6 +139,15 @@ def email(
             'group_id': unsub_group_id,
         }
 
+    summary = {
+        'recipients': len(recipients),
+        'batches': 0,
+        'accepted': 0,
+        'rejected': {},
+        'deactivated': 0,
+    }
+
+    messages = []
     for recipients_batch in batches(recipients, batch_size):
         msg = AnymailMessage(
             subject=subject,
@@ -87,26 +168,137 @@ def email(
         for attachment in attachments:
             msg.attach(attachment)
 
+        messages.append(msg)
+
+    error = None
+
+    if concurrency > 1 and len(messages) > 1:
+        # Every batch is attempted even if one fails, so the bounces from
+        # the batches that did go out are still recorded below.
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = [
+                executor.submit(send_message, msg, retries)
+                for msg in messages
+            ]
+
+        sent_messages = []
+        for msg, future in zip(messages, futures):
+            if future.exception():
+                error = error or future.exception()
+            else:
+                sent_messages.append(msg)
+    else:
+        sent_messages = []
+        for msg in messages:
+            try:
+                send_message(msg, retries)
+            except Exception as e:
+                error = e
+                break
+
+            sent_messages.append(msg)
+
+    for msg in sent_messages:
+        summary['batches'] += 1
+
+        for recipient, send_attempt in msg.anymail_status.recipients.items():
+            if send_attempt.status in ['queued', 'sent']:
+                summary['accepted'] += 1
+            else:
+                logger.error(
+                    f"user: {recipient}, {timezone.now()}"
+                )
+                # Not every ESP backend sets a reason; fall back to the status.
+                summary['rejected'][recipient] = getattr(send_attempt, 'reject_reason', None) or send_attempt.status
+
+    if summary['rejected']:
+        summary['deactivated'] = deactivate_rejected_users(summary['rejected'])
+
+    if error:
+        raise error
+
+    return summary
+
+
+def send_message(msg, retries=0):
+    """
+    Send one batch, retrying up to `retries` times with exponential backoff
+    when the ESP returns an API error.
+    """
+    for attempt in range(retries + 1):
         try:
             msg.send()
+        except AnymailRecipientsRefused:
+            # Every address in the batch bounced; the statuses are still on
+            # the message, so deactivate them along with the rest.
+            pass
+        except AnymailAPIError as e:
+            if attempt < retries:
+                logger.warning(f"Email batch failed, retrying: {e}")
+                time.sleep(settings.EMAIL_RETRY_BACKOFF * 2 ** attempt)
+                continue
+
+            logger.error(e)
+            logger.error(msg)
+            raise
         except Exception as e:
             logger.error(e)
             logger.error(msg)
-            raise e
+            raise
 
-        for recipient in msg.anymail_status.recipients.keys():
-            send_attempt = msg.anymail_status.recipients[recipient]
-            if send_attempt.status not in ['queued', 'sent']:
-                logger.error(
-                    f"user: {recipient}, {timezone.now()}"
-                )
+        return msg
 
-                user = User.objects.get(email=recipient)
-                user.is_active = False
-                user.admin_notes = f"User '{send_attempt.reject_reason}' when checked on {timezone.now()}"
-                user.save()
+
+def deactivate_rejected_users(rejected):
+    """
+    Deactivate every user whose address the ESP rejected, noting the reason
+    on their account. `rejected` maps email address to reject reason. Runs as
+    a single UPDATE and returns the number of users changed.
+    """
+    now = timezone.now()
+
+    return User.objects.filter(
+        email__in=list(rejected),
+    ).update(
+        is_active=False,
+        admin_notes=Case(
+            *[
+                When(email=recipient, then=Value(f"User '{reason}' when checked on {now}"))
+                for recipient, reason in rejected.items()
+            ],
+            default=F('admin_notes'),
+        ),
+    )
 
 
 def batches(l, n):
     for i in range(0, len(l), n):
         yield l[i:i + n]
+
+
+@contextmanager
+def query_stats(using=DEFAULT_DB_ALIAS):
+    """
+    Count the queries run on `using` inside the block, along with the time spent
+    in the database and the total wall-clock time.
+    """
+    stats = {
+        'queries': 0,
+        'db_time': 0.0,
+        'duration': 0.0,
+    }
+
+    def counter(execute, sql, params, many, context):
+        start = time.monotonic()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            stats['queries'] += 1
+            stats['db_time'] += time.monotonic() - start
+
+    start = time.monotonic()
+    try:
+        with connections[using].execute_wrapper(counter):
+            yield stats
+    finally:
+        stats['duration'] = time.monotonic() - start
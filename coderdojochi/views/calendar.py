@@ -1,17 +1,43 @@
+import hashlib
+
 from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
 from django.http import HttpResponse
 from django.shortcuts import get_object_or_404
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from django.utils.http import http_date
 from django.views.generic import View
 
 import arrow
 from icalendar import Calendar, Event, vText
 
+from coderdojochi.cache import CALENDAR, get_cached, make_key
+
+
+def new_calendar():
+    cal = Calendar()
+
+    cal['prodid'] = '-//We All Code//weallcode.org//'
+    cal['version'] = '2.0'
+    cal['calscale'] = 'GREGORIAN'
+
+    return cal
+
 
+# Read only, and a cache hit should not touch the database at all.
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class CalendarView(View):
     event_type = None
     event_kwarg = "pk"
     event_class = None
 
+    # The rendered ICS is cached per event and per variant of the requesting
+    # user (see get_cache_variant), until the event changes.
+    cache_variants = ('public',)
+    cache_timeout = 60 * 60 * 24
+
     def get_summary(self, request, event_obj):
         raise NotImplementedError
 
@@ -27,17 +53,35 @@ class CalendarView(View):
     def get_location(self, request, event_obj):
         raise NotImplementedError
 
-    def get(self, request, *args, **kwargs):
-        event_obj = get_object_or_404(
-            self.event_class,
-            id=kwargs[self.event_kwarg]
-        )
-        cal = Calendar()
+    def get_queryset(self):
+        return self.event_class.objects.all()
+
+    def get_cache_variant(self, request, pk):
+        """
+        Which of `cache_variants` the calendar for `request` is. Must not need
+        the event itself, so that cache hits stay cheap.
+        """
+        return 'public'
+
+    def get_last_modified(self, event_obj):
+        return event_obj.updated_at
 
-        cal['prodid'] = '-//We All Code//weallcode.org//'
-        cal['version'] = '2.0'
-        cal['calscale'] = 'GREGORIAN'
+    @classmethod
+    def cache_key(cls, pk, variant):
+        return make_key(CALENDAR, cls.event_type, pk, variant)
 
+    @classmethod
+    def invalidate(cls, pks):
+        keys = [
+            cls.cache_key(pk, variant)
+            for pk in pks
+            for variant in cls.cache_variants
+        ]
+
+        # After the commit, or a concurrent request could cache the old event again.
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+    def get_event(self, request, event_obj):
         event = Event()
 
         event['uid'] = f"{self.event_type.upper()}{event_obj.id:04}@weallcode.org"
@@ -53,7 +97,11 @@ class CalendarView(View):
         # see: https://tools.ietf.org/html/rfc5545#section-3.8.1.9
         event['priority'] = 5
 
-        cal.add_component(event)
+        return event
+
+    def render_calendar(self, request, event_obj):
+        cal = new_calendar()
+        cal.add_component(self.get_event(request, event_obj))
 
         event_slug = "weallcode-{event_type}_{date}".format(
             event_type=self.event_type.lower(),
@@ -62,13 +110,44 @@ class CalendarView(View):
             ).to('local').format('MM-DD-YYYY_HH-mma')
         )
 
-        # Return the ICS formatted calendar
-        response = HttpResponse(
-            cal.to_ical(),
-            content_type='text/calendar',
-            charset='utf-8'
+        ics = cal.to_ical()
+
+        return {
+            'ics': ics,
+            'etag': quote_etag(hashlib.md5(ics).hexdigest()),
+            'last_modified': int(self.get_last_modified(event_obj).timestamp()),
+            'filename': f"{event_slug}.ics",
+        }
+
+    def get(self, request, *args, **kwargs):
+        pk = kwargs[self.event_kwarg]
+        self.cache_variant = self.get_cache_variant(request, pk)
+        key = self.cache_key(pk, self.cache_variant)
+
+        calendar = get_cached(CALENDAR, key)
+
+        if calendar is None:
+            event_obj = get_object_or_404(self.get_queryset(), id=pk)
+            calendar = self.render_calendar(request, event_obj)
+            cache.set(key, calendar, self.cache_timeout)
+
+        response = get_conditional_response(
+            request,
+            etag=calendar['etag'],
+            last_modified=calendar['last_modified'],
         )
 
-        response['Content-Disposition'] = f"attachment;filename={event_slug}.ics"
+        if response is None:
+            # Return the ICS formatted calendar
+            response = HttpResponse(
+                calendar['ics'],
+                content_type='text/calendar',
+                charset='utf-8'
+            )
+
+            response['Content-Disposition'] = f"attachment;filename={calendar['filename']}"
+
+        response['ETag'] = calendar['etag']
+        response['Last-Modified'] = http_date(calendar['last_modified'])
 
         return response
@@ -0,0 +1,168 @@
+import json
+
+from django.contrib.auth.decorators import login_required
+from django.http import Http404, JsonResponse
+from django.shortcuts import get_object_or_404
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+from django.utils.formats import date_format
+from django.views.decorators.cache import never_cache
+from django.views.decorators.http import require_POST
+
+from coderdojochi.check_in import (
+    CHECK_IN_ORDERS,
+    CheckInConflict,
+    attendance_counts,
+    check_in_counts,
+    check_in_version,
+    sync_check_ins,
+    toggle_check_in,
+)
+from coderdojochi.models import Order, Session
+
+
+def _check_in_row(order):
+    row = {
+        'id': order.id,
+        'check_in': order.check_in,
+        'check_in_display': date_format(
+            timezone.localtime(order.check_in),
+            'DATETIME_FORMAT',
+        ) if order.check_in else '',
+        'version': check_in_version(order),
+    }
+
+    if isinstance(order, Order):
+        row['alternate_guardian'] = order.alternate_guardian
+
+    return row
+
+
+def _parse_check_in_event(event):
+    if not isinstance(event, dict):
+        raise ValueError('Each event must be an object.')
+
+    if event.get('kind') not in ('student', 'mentor'):
+        raise ValueError("Event kind must be 'student' or 'mentor'.")
+
+    # bool is an int subclass, so `true` would pass for order 1.
+    if type(event.get('order')) is not int or not isinstance(event.get('checked_in'), bool):
+        raise ValueError('Events need an integer order and a boolean checked_in.')
+
+    at = parse_datetime(event.get('at') or '')
+
+    if at is None:
+        raise ValueError(f"Invalid event time: {event.get('at')!r}")
+
+    if timezone.is_naive(at):
+        at = timezone.make_aware(at)
+
+    return {
+        'kind': event['kind'],
+        'order': event['order'],
+        'checked_in': event['checked_in'],
+        'at': at,
+    }
+
+
+@login_required
+@never_cache
+@require_POST
+def check_in_toggle(request, kind, pk):
+    """
+    Check an order in or out without reloading the check-in page. Expects
+    the `version` the page was rendered with and answers with the changed
+    row and the attendance counters, or 409 and the current row when
+    someone else got there first.
+    """
+    if not request.user.is_staff:
+        return JsonResponse(
+            {'error': 'You do not have permission to access this page.'},
+            status=403,
+        )
+
+    model = CHECK_IN_ORDERS.get(kind)
+
+    if model is None:
+        raise Http404
+
+    orders = model.objects.all()
+
+    if model is Order:
+        orders = orders.select_related('guardian__user')
+
+    order = get_object_or_404(orders, id=pk)
+
+    version = request.POST.get('version')
+
+    if not version:
+        return JsonResponse({'error': 'Missing version.'}, status=400)
+
+    try:
+        toggle_check_in(
+            order,
+            version,
+            alternate_guardian=request.POST.get('alternate_guardian'),
+        )
+    except CheckInConflict as e:
+        return JsonResponse(
+            {
+                'error': str(e),
+                'order': _check_in_row(e.order),
+                'counts': check_in_counts(e.order),
+            },
+            status=409,
+        )
+
+    return JsonResponse({
+        'order': _check_in_row(order),
+        'counts': check_in_counts(order),
+    })
+
+
+@login_required
+@never_cache
+@require_POST
+def check_in_sync(request, pk):
+    """
+    Apply a batch of check-in events queued by a device for one session, in
+    one transaction. The body is JSON:
+
+        {"events": [{"kind": "student", "order": 12, "checked_in": true,
+                     "at": "2020-06-01T10:02:11-05:00"}, ...]}
+
+    Answers with the applied rows, the events that conflicted with newer
+    changes on the server, and the student counters.
+    """
+    if not request.user.is_staff:
+        return JsonResponse(
+            {'error': 'You do not have permission to access this page.'},
+            status=403,
+        )
+
+    session = get_object_or_404(Session, pk=pk)
+
+    try:
+        events = json.loads(request.body)['events']
+        events = [_parse_check_in_event(event) for event in events]
+    except (KeyError, TypeError, ValueError) as e:
+        return JsonResponse({'error': f'Invalid events: {e}'}, status=400)
+
+    applied, conflicts = sync_check_ins(session, events)
+
+    return JsonResponse({
+        'applied': [
+            {'kind': 'student' if isinstance(order, Order) else 'mentor', **_check_in_row(order)}
+            for order in applied
+        ],
+        'conflicts': [
+            {
+                'kind': event['kind'],
+                'order': event['order'],
+                'reason': reason,
+                'current': _check_in_row(order) if order else None,
+            }
+            for event, order, reason in conflicts
+        ],
+        'counts': attendance_counts(session.order_set.all()),
+    })
@@ -0,0 +1,210 @@
+from datetime import timedelta
+
+from django.contrib import messages
+from django.contrib.auth import get_user_model
+from django.contrib.auth.decorators import login_required
+from django.contrib.auth.models import AnonymousUser
+from django.core import signing
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse, HttpResponseNotFound, StreamingHttpResponse
+from django.shortcuts import redirect
+from django.urls import reverse
+from django.utils import timezone
+from django.utils.cache import get_conditional_response, quote_etag
+from django.utils.decorators import method_decorator
+from django.views.generic import View
+
+from coderdojochi.cache import CALENDAR_FEED, get_cached, invalidate_namespace, namespace_version, versioned_key
+from coderdojochi.models import Meeting, MeetingOrder, MentorOrder, Order, Session
+from coderdojochi.views.calendar import new_calendar
+from coderdojochi.views.meetings import MeetingCalendarView
+from coderdojochi.views.sessions import SessionCalendarView
+
+User = get_user_model()
+
+_calendar_feed_signer = signing.Signer(salt='coderdojochi.calendar-feed')
+
+
+def calendar_feed_url(user):
+    """
+    The private feed of everything `user` is signed up for. The URL is
+    signed, so calendar apps can poll it without logging in, and stops
+    working when the user's `calendar_feed_key` is reset.
+    """
+    token = _calendar_feed_signer.sign(f"{user.pk}:{user.calendar_feed_key}")
+
+    return reverse('calendar-feed-user', args=[token])
+
+
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
+class CalendarFeedView(View):
+    """
+    A subscribable feed: every upcoming public class, or with a signed
+    `token` the classes and meetings one user is signed up for.
+
+    Feeds are streamed event by event from a single queryset per kind of
+    event and cached until a session, meeting or order changes. Calendar
+    apps poll these, so an unchanged feed is a 304 without any queries.
+    """
+    cache_timeout = 60 * 60
+    # Larger feeds are streamed every time rather than cached.
+    cache_max_bytes = 1024 * 1024
+    # Keep recent events so they don't vanish from calendars as they start.
+    history = timedelta(days=30)
+
+    def get(self, request, token=None):
+        user_id = None
+        feed_key = None
+
+        if token is not None:
+            try:
+                user_id, feed_key = _calendar_feed_signer.unsign(token).split(':', 1)
+            except (signing.BadSignature, ValueError):
+                return HttpResponseNotFound()
+
+        version = namespace_version(CALENDAR_FEED)
+        etag = quote_etag(str(version))
+
+        response = get_conditional_response(request, etag=etag)
+
+        if response is None:
+            key = versioned_key(CALENDAR_FEED, *([user_id, feed_key] if user_id else ['public']))
+            body = get_cached(CALENDAR_FEED, key)
+
+            if body is None:
+                # The feed is only for the user it was signed for.
+                request.user = AnonymousUser()
+
+                if user_id is not None:
+                    request.user = User.objects.filter(
+                        pk=user_id,
+                        calendar_feed_key=feed_key,
+                        is_active=True,
+                    ).first()
+
+                    if request.user is None:
+                        return HttpResponseNotFound()
+
+                response = StreamingHttpResponse(
+                    self.stream(key, self.render_feed(request)),
+                    content_type='text/calendar',
+                    charset='utf-8',
+                )
+            else:
+                response = HttpResponse(
+                    body,
+                    content_type='text/calendar',
+                    charset='utf-8',
+                )
+
+        response['ETag'] = etag
+
+        return response
+
+    def stream(self, key, chunks):
+        body = []
+        size = 0
+
+        for chunk in chunks:
+            yield chunk
+
+            if body is not None:
+                body.append(chunk)
+                size += len(chunk)
+
+                if size > self.cache_max_bytes:
+                    body = None
+
+        if body is not None:
+            cache.set(key, b''.join(body), self.cache_timeout)
+
+    def get_events(self, request):
+        """
+        (view, event) pairs for the feed, as lazily evaluated querysets.
+        """
+        user = request.user
+
+        sessions = Session.objects.filter(
+            is_active=True,
+            start_date__gte=timezone.now() - self.history,
+        ).select_related(
+            'course',
+            'location',
+        ).order_by('start_date')
+
+        session_view = SessionCalendarView(request=request)
+        session_view.cache_variant = 'public'
+
+        if not user.is_authenticated:
+            return [(session_view, sessions.filter(is_public=True))]
+
+        if user.role == 'mentor':
+            session_view.cache_variant = 'mentor-ticket'
+            sessions = sessions.filter(
+                id__in=MentorOrder.objects.filter(
+                    mentor__user=user,
+                    is_active=True,
+                ).values('session_id'),
+            )
+
+            meetings = Meeting.objects.filter(
+                is_active=True,
+                start_date__gte=timezone.now() - self.history,
+                id__in=MeetingOrder.objects.filter(
+                    mentor__user=user,
+                    is_active=True,
+                ).values('meeting_id'),
+            ).select_related(
+                'meeting_type',
+            ).order_by('start_date')
+
+            return [
+                (session_view, sessions),
+                (MeetingCalendarView(request=request), meetings),
+            ]
+
+        if user.role == 'guardian':
+            session_view.cache_variant = 'guardian-ticket'
+            sessions = sessions.filter(
+                id__in=Order.objects.filter(
+                    guardian__user=user,
+                    is_active=True,
+                ).values('session_id'),
+            )
+
+            return [(session_view, sessions)]
+
+        return []
+
+    def render_feed(self, request):
+        cal = new_calendar()
+        cal['x-wr-calname'] = 'We All Code'
+
+        footer = b'END:VCALENDAR\r\n'
+        yield cal.to_ical()[:-len(footer)]
+
+        for view, events in self.get_events(request):
+            for event_obj in events.iterator():
+                yield view.get_event(request, event_obj).to_ical()
+
+        yield footer
+
+
+@method_decorator(login_required, name='dispatch')
+class CalendarFeedResetView(View):
+    """
+    Give the user a new feed URL, revoking the old one.
+    """
+
+    def post(self, request):
+        request.user.reset_calendar_feed_key()
+        # Cached feeds and ETags for the old URL would outlive it otherwise.
+        invalidate_namespace(CALENDAR_FEED)
+
+        messages.success(
+            request,
+            'Your calendar feed has a new address. Update the subscription in your calendar app.',
+        )
+
+        return redirect('account_home')
@@ -25,6 +25,7 @@ from django.views.generic import DetailView, ListView, TemplateView, View
 import arrow
 from icalendar import Calendar, Event, vText
 
+from coderdojochi.email_queue import queue_email
 from coderdojochi.forms import (
     CDCForm,
     CDCModelForm,
@@ -126,6 +127,12 @@ class MeetingCalendarView(CalendarView):
     event_kwarg = 'pk'
     event_class = Meeting
 
+    def get_queryset(self):
+        return Meeting.objects.select_related('meeting_type')
+
+    def get_last_modified(self, event_obj):
+        return max(event_obj.updated_at, event_obj.meeting_type.updated_at)
+
     def get_summary(self, request, event_obj):
         event_name = f"{event_obj.meeting_type.code} - " if event_obj.meeting_type.code else ''
         event_name += event_obj.meeting_type.title
@@ -144,9 +151,14 @@ class MeetingCalendarView(CalendarView):
         pass
 
 
+@login_required
 def meeting_sign_up(request, pk, template_name="meeting-sign-up.html"):
     meeting_obj = get_object_or_404(Meeting, pk=pk)
 
+    if request.user.role != 'mentor':
+        messages.warning(request, 'Only mentors can sign up for mentor meetings.')
+        return redirect(meeting_obj.get_absolute_url())
+
     mentor = get_object_or_404(
         Mentor,
         user=request.user
@@ -221,7 +233,7 @@ def meeting_sign_up(request, pk, template_name="meeting-sign-up.html"):
                 'microdata_end_date': arrow.get(meeting_obj.end_date).to('local').isoformat(),
             }
 
-            email(
+            queue_email(
                 subject='Upcoming mentor meeting confirmation',
                 template_name='meeting-confirm-mentor',
                 merge_global_data=merge_global_data,
@@ -246,7 +258,7 @@ def meeting_announce(request, pk):
             request,
             'You do not have permission to access this page.'
         )
-        return redirect('home')
+        return redirect('weallcode-home')
 
     meeting_obj = get_object_or_404(Meeting, pk=pk)
 
@@ -289,6 +301,8 @@ def meeting_announce(request, pk):
             merge_global_data=merge_global_data,
             recipients=recipients,
             preheader='A new meeting has been announced. Come join us for some amazing fun!',
+            concurrency=settings.EMAIL_CONCURRENCY,
+            retries=settings.EMAIL_SEND_RETRIES,
         )
 
         meeting_obj.announced_date = timezone.now()
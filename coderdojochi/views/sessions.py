@@ -5,6 +5,7 @@ from django.conf import settings
 from django.contrib import messages
 from django.contrib.auth import get_user_model
 from django.contrib.auth.decorators import login_required
+from django.db import transaction
 from django.shortcuts import get_object_or_404, redirect, render
 from django.urls import reverse
 from django.utils import timezone
@@ -15,6 +16,9 @@ from django.views.generic import TemplateView
 import arrow
 from dateutil.relativedelta import relativedelta
 
+from coderdojochi.eligibility import eligibility, limitation_message
+from coderdojochi.email_queue import queue_email
+from coderdojochi.enrollment import ENROLLED, SOLD_OUT, enroll_mentor, enroll_student, enrollment_states
 from coderdojochi.mixins import RoleRedirectMixin, RoleTemplateMixin
 from coderdojochi.models import (
     Guardian,
@@ -24,12 +28,20 @@ from coderdojochi.models import (
     PartnerPasswordAccess,
     Session,
     Student,
+    WaitlistEntry,
 )
-from coderdojochi.util import email
 from coderdojochi.views.calendar import CalendarView
+from coderdojochi.waitlist import OPEN_STATUSES, held_seats, join_waitlist, leave_waitlist, promote_waitlist
 
 logger = logging.getLogger(__name__)
 
+STUDENT_SOLD_OUT_MESSAGE = (
+    "Sorry this class has sold out. Please sign up for the wait list and/or check back later."
+)
+MENTOR_SOLD_OUT_MESSAGE = (
+    "Sorry, this class has all the mentors it needs. Please check back later."
+)
+
 # this will assign User to our custom CDCUser
 User = get_user_model()
 
@@ -60,7 +72,7 @@ def session_confirm_mentor(request, session_obj, order):
         'online_video_description': session_obj.online_video_description,
     }
 
-    email(
+    queue_email(
         subject='Mentoring confirmation for {} class'.format(
             arrow.get(session_obj.mentor_start_date).to('local').format('MMMM D'),
         ),
@@ -99,7 +111,7 @@ def session_confirm_guardian(request, session_obj, order, student):
         'online_video_description': session_obj.online_video_description,
     }
 
-    email(
+    queue_email(
         subject=f'Upcoming class confirmation for {student.first_name} {student.last_name}',
         template_name='class-confirm-guardian',
         merge_global_data=merge_global_data,
@@ -193,48 +205,69 @@ class SessionDetailView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
                 ).exists()
 
                 context['spots_remaining'] = (
-                    session_obj.get_mentor_capacity() - session_orders.count()
+                    session_obj.get_mentor_capacity() - session_obj.active_mentor_count
                 )
             else:
                 account = get_object_or_404(Guardian, user=self.request.user)
                 context['students'] = account.get_students()
+                context['enrollment_states'] = enrollment_states(context['students'].values('id'), [session_obj.id])
+                context['eligibility'] = eligibility(context['students'], [session_obj])
                 context['spots_remaining'] = (
-                    session_obj.capacity -
-                    session_obj.get_current_students().count()
+                    session_obj.capacity - session_obj.active_student_count - held_seats(session_obj)
                 )
+
+                entries = WaitlistEntry.objects.filter(
+                    session=session_obj,
+                    student__in=context['students'],
+                    status__in=OPEN_STATUSES,
+                ).values_list('student_id', 'status')
+                context['waitlisted_student_ids'] = {student_id for student_id, status in entries}
+                context['held_student_ids'] = {
+                    student_id for student_id, status in entries
+                    if status == WaitlistEntry.HELD
+                }
             context['account'] = account
         else:
             context['upcoming_classes'] = upcoming_classes.filter(is_public=True)
             context['spots_remaining'] = (
-                session_obj.capacity -
-                session_obj.get_current_students().count()
+                session_obj.capacity - session_obj.active_student_count - held_seats(session_obj)
             )
 
         return context
 
     def post(self, request, *args, **kwargs):
         session_obj = kwargs['session_obj']
-        if 'waitlist' not in request.POST:
+        if 'waitlist' not in request.POST or not request.user.is_authenticated:
             messages.error(request, 'Invalid request, please try again.')
             return redirect(session_obj.get_absolute_url())
 
+        remove = request.POST['remove'] == 'true'
+
         if request.POST['waitlist'] == 'student':
-            account = Student.objects.get(id=request.POST['account_id'])
-            waitlist_attr = 'waitlist_students'
+            student = get_object_or_404(
+                Student,
+                id=request.POST['account_id'],
+                guardian__user=request.user,
+            )
+
+            if remove:
+                leave_waitlist(session_obj, student)
+            else:
+                join_waitlist(session_obj, student)
         else:
-            account = Guardian.objects.get(id=request.POST['account_id'])
-            waitlist_attr = 'waitlist_guardians'
+            mentor = get_object_or_404(Mentor, user=request.user)
 
-        if request.POST['remove'] == 'true':
-            getattr(session_obj, waitlist_attr).remove(account)
-            session_obj.save()
+            if remove:
+                session_obj.waitlist_mentors.remove(mentor)
+            else:
+                session_obj.waitlist_mentors.add(mentor)
+
+        if remove:
             messages.success(
                 request,
                 'You have been removed from the waitlist. Thanks for letting us know.'
             )
         else:
-            getattr(session_obj, waitlist_attr).add(account)
-            session_obj.save()
             messages.success(
                 request,
                 'Added to waitlist successfully.'
@@ -242,6 +275,8 @@ class SessionDetailView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
         return redirect(session_obj.get_absolute_url())
 
 
+# Enrollment takes a lock on the session; keep it out of a request-wide transaction.
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class SessionSignUpView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
     template_name = "session-sign-up.html"
 
@@ -262,6 +297,10 @@ class SessionSignUpView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
             ).exists()
 
         elif request.user.role == 'guardian':
+            # Guardians sign up a student, picked on the class page.
+            if 'student_id' not in kwargs:
+                return redirect(session_obj.get_absolute_url())
+
             kwargs['guardian'] = get_object_or_404(Guardian, user=request.user)
             kwargs['student'] = get_object_or_404(Student, id=kwargs['student_id'])
             kwargs['user_signed_up'] = kwargs['student'].is_registered_for_session(session_obj)
@@ -306,17 +345,16 @@ class SessionSignUpView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
         return access_dict
 
     def student_limitations(self, student, session_obj, user_signed_up):
-        if not student.is_within_gender_limitation(session_obj.gender_limitation):
-            return f'Sorry, this class is limited to {session_obj.gender_limitation}s this time around.'
+        reasons = eligibility([student], [session_obj])[(student.id, session_obj.id)]
 
-        if not student.is_within_age_range(session_obj.minimum_age, session_obj.maximum_age):
-            return (
-                f"Sorry, this class is limited to students between ages "
-                f"{session_obj.minimum_age} and {session_obj.maximum_age}."
-            )
+        if reasons:
+            return limitation_message(reasons, session_obj)
+
+        if not user_signed_up:
+            taken = session_obj.active_student_count + held_seats(session_obj, exclude_student=student)
 
-        if not user_signed_up and session_obj.capacity <= session_obj.get_current_students().count():
-            return "Sorry this class has sold out. Please sign up for the wait list and/or check back later."
+            if taken >= session_obj.capacity:
+                return STUDENT_SOLD_OUT_MESSAGE
 
         return False
 
@@ -348,8 +386,13 @@ class SessionSignUpView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
                     session=session_obj,
                     is_active=True,
                 )
-            order.is_active = False
-            order.save()
+            with transaction.atomic():
+                order.is_active = False
+                order.save()
+
+                # Offer the seat to the next family on the waitlist.
+                if student:
+                    promote_waitlist(session_obj)
 
             messages.success(request, 'Thanks for letting us know!')
         else:
@@ -359,27 +402,22 @@ class SessionSignUpView(RoleRedirectMixin, RoleTemplateMixin, TemplateView):
                 ip = request.META['HTTP_X_FORWARDED_FOR'] or request.META['REMOTE_ADDR']
 
             if mentor:
-                order, created = MentorOrder.objects.get_or_create(
-                    mentor=mentor,
-                    session=session_obj,
-                )
+                status, order = enroll_mentor(session_obj, mentor, ip)
             else:
-                order, created = Order.objects.get_or_create(
-                    guardian=guardian,
-                    student=student,
-                    session=session_obj,
-                )
-
-            order.ip = ip
-            order.is_active = True
-            order.save()
-
-            messages.success(request, 'Success! See you there!')
-
-            if mentor:
-                session_confirm_mentor(request, session_obj, order)
+                status, order = enroll_student(session_obj, guardian, student, ip)
+
+            # Queued once the enrollment has committed, so the session lock
+            # isn't held while the email renders.
+            if status == ENROLLED:
+                if mentor:
+                    session_confirm_mentor(request, session_obj, order)
+                else:
+                    session_confirm_guardian(request, session_obj, order, student)
+
+            if status == SOLD_OUT:
+                messages.error(request, MENTOR_SOLD_OUT_MESSAGE if mentor else STUDENT_SOLD_OUT_MESSAGE)
             else:
-                session_confirm_guardian(request, session_obj, order, student)
+                messages.success(request, 'Success! See you there!')
 
         return redirect(session_obj.get_absolute_url())
 
@@ -390,7 +428,7 @@ class PasswordSessionView(TemplateView):
     def get_context_data(self, **kwargs):
         context = super(PasswordSessionView, self).get_context_data(**kwargs)
 
-        session_obj = get_object_or_404(Session, id=kwargs.get('pk'))
+        session_obj = get_object_or_404(Session, id=self.kwargs.get('pk'))
 
         context['partner_message'] = session_obj.partner_message
 
@@ -435,6 +473,46 @@ class SessionCalendarView(CalendarView):
     event_type = 'class'
     event_kwarg = 'pk'
     event_class = Session
+    cache_variants = ('public', 'member', 'mentor', 'mentor-ticket', 'guardian-ticket')
+
+    def get_queryset(self):
+        return Session.objects.select_related('course', 'location')
+
+    def get_cache_variant(self, request, pk):
+        # Mentors get the mentor times; ticket holders get the online link.
+        user = request.user
+
+        if not user.is_authenticated:
+            return 'public'
+
+        if user.role == 'mentor':
+            mentor_signed_up = MentorOrder.objects.filter(
+                session_id=pk,
+                is_active=True,
+                mentor__user=user,
+            ).exists()
+
+            return 'mentor-ticket' if mentor_signed_up else 'mentor'
+
+        if user.role == 'guardian':
+            students_signed_up = Order.objects.filter(
+                session_id=pk,
+                is_active=True,
+                student__guardian__user=user,
+                student__is_active=True,
+            ).exists()
+
+            if students_signed_up:
+                return 'guardian-ticket'
+
+        return 'member'
+
+    def get_last_modified(self, event_obj):
+        return max(
+            event_obj.updated_at,
+            event_obj.course.updated_at,
+            event_obj.location.updated_at,
+        )
 
     def get_summary(self, request, event_obj):
         return f"We All Code: {event_obj.course.code} - {event_obj.course.title}"
@@ -463,36 +541,8 @@ class SessionCalendarView(CalendarView):
 
         # If user has a ticket with us, show online link
         if event_obj.online_video_link and self.request.user.is_authenticated:
-            if self.request.user.role == 'mentor':
-                try:
-                    mentor = Mentor.objects.get(user=self.request.user)
-                    mentor_signed_up = MentorOrder.objects.filter(
-                        session=event_obj,
-                        is_active=True,
-                        mentor=mentor
-                    ).exists()
-
-                    if mentor_signed_up:
-                        location = event_obj.online_video_link
-
-                except Mentor.DoesNotExist:
-                    pass
-
-            elif self.request.user.role == 'guardian':
-                try:
-                    guardian = Guardian.objects.get(user=self.request.user)
-                    students = guardian.get_students()
-                    students_signed_up = Order.objects.filter(
-                        session=event_obj,
-                        is_active=True,
-                        student__in=students,
-                    ).exists()
-
-                    if students_signed_up:
-                        location = event_obj.online_video_link
-
-                except Guardian.DoesNotExist:
-                    pass
+            if self.cache_variant.endswith('-ticket'):
+                location = event_obj.online_video_link
 
         elif event_obj.location.address:
             location = (
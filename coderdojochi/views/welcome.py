@@ -8,6 +8,7 @@ from django.urls import reverse
 from django.utils.decorators import method_decorator
 from django.views.generic import TemplateView
 
+from coderdojochi.email_queue import queue_email
 from coderdojochi.forms import GuardianForm, MentorForm, StudentForm
 from coderdojochi.models import (
     Guardian,
@@ -17,7 +18,6 @@ from coderdojochi.models import (
     MentorOrder,
     Session,
 )
-from coderdojochi.util import email
 
 logger = logging.getLogger(__name__)
 
@@ -183,7 +183,7 @@ class WelcomeView(TemplateView):
             if not next_url:
                 next_url = reverse('welcome')
 
-        email(
+        queue_email(
             subject='Welcome!',
             template_name=f"welcome-{role}",
             merge_global_data=merge_global_data,
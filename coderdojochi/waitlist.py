@@ -0,0 +1,219 @@
+"""
+Waitlists for sold-out classes.
+
+Families put a student on the waitlist from the class page. When seats free
+up, `promote_waitlist` offers them in join order to the waiting students that
+meet the class's age and gender limits. A promoted entry holds its seat for
+WAITLIST_HOLD_HOURS, during which only that student can take it (see
+coderdojochi.enrollment); holds that run out are expired and the seat goes to
+the next in line. Cancellations promote straight away, the PromoteWaitlists
+cron job catches up on everything else in batches.
+"""
+import logging
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Count, Q
+from django.utils import timezone
+
+import arrow
+
+from coderdojochi.eligibility import eligibility
+from coderdojochi.email_queue import queue_email
+from coderdojochi.models import Order, Session, WaitlistEntry
+from coderdojochi.reminders import session_merge_data
+
+logger = logging.getLogger(__name__)
+
+OPEN_STATUSES = (WaitlistEntry.WAITING, WaitlistEntry.HELD)
+
+
+def held_seats(session, exclude_student=None, now=None):
+    """
+    Seats of `session` held for promoted students, other than
+    `exclude_student`'s. Holds that have run out don't count, even before
+    `promote_waitlist` expires them.
+    """
+    entries = WaitlistEntry.objects.filter(
+        session=session,
+        status=WaitlistEntry.HELD,
+        held_until__gt=now or timezone.now(),
+    )
+
+    if exclude_student is not None:
+        entries = entries.exclude(student=exclude_student)
+
+    return entries.count()
+
+
+def join_waitlist(session, student):
+    """
+    Put `student` at the back of the line, unless already in it.
+    """
+    WaitlistEntry.objects.filter(
+        session=session,
+        student=student,
+    ).exclude(
+        status__in=OPEN_STATUSES,
+    ).delete()
+
+    entry, created = WaitlistEntry.objects.get_or_create(
+        session=session,
+        student=student,
+        defaults={'guardian': student.guardian},
+    )
+
+    return entry
+
+
+def leave_waitlist(session, student):
+    """
+    Take `student` off the waitlist, giving up any seat held for them.
+    """
+    WaitlistEntry.objects.filter(session=session, student=student).delete()
+
+
+def mark_enrolled(session, student):
+    WaitlistEntry.objects.filter(session=session, student=student).update(
+        status=WaitlistEntry.ENROLLED,
+        held_until=None,
+        updated_at=timezone.now(),
+    )
+
+
+def send_waitlist_offer(entry):
+    session = entry.session
+    user = entry.guardian.user
+
+    queue_email(
+        subject=f"A spot opened up for {entry.student.first_name}",
+        template_name='waitlist-offer-guardian',
+        merge_global_data={
+            **session_merge_data(session),
+            'first_name': user.first_name,
+            'last_name': user.last_name,
+            'student_first_name': entry.student.first_name,
+            'student_last_name': entry.student.last_name,
+            'hold_expires': arrow.get(entry.held_until).to('local').format('dddd, MMMM D [at] h:mma'),
+        },
+        recipients=[user.email],
+        preheader='Your spot is saved, but not for long.',
+    )
+
+
+def promote_waitlist(session, now=None):
+    """
+    Expire the lapsed holds of `session` and hold each free seat for the next
+    eligible waiting student, queuing an offer to their guardian. Returns
+    `(promoted, expired)`: the entries now holding a seat, and how many holds
+    lapsed.
+    """
+    now = now or timezone.now()
+
+    with transaction.atomic():
+        # Serialises with enrollments, which check the holds under this lock.
+        session = Session.objects.select_for_update().select_related(
+            'course',
+            'location',
+        ).get(id=session.id)
+
+        expired = WaitlistEntry.objects.filter(
+            session=session,
+            status=WaitlistEntry.HELD,
+            held_until__lte=now,
+        ).update(
+            status=WaitlistEntry.EXPIRED,
+            updated_at=now,
+        )
+
+        if not session.is_active or session.start_date <= now:
+            return [], expired
+
+        free = session.capacity - session.active_student_count - held_seats(session, now=now)
+
+        promoted = []
+        if free > 0:
+            waiting = list(
+                WaitlistEntry.objects.filter(
+                    session=session,
+                    status=WaitlistEntry.WAITING,
+                ).exclude(
+                    # Signed up some other way since joining.
+                    student_id__in=Order.objects.filter(
+                        session=session,
+                        is_active=True,
+                    ).values('student_id'),
+                ).select_related(
+                    'student',
+                    'guardian__user',
+                )
+            )
+            reasons = eligibility([entry.student for entry in waiting], [session])
+
+            promoted = [
+                entry for entry in waiting
+                if not reasons[(entry.student_id, session.id)]
+            ][:free]
+
+        held_until = now + timedelta(hours=settings.WAITLIST_HOLD_HOURS)
+
+        for entry in promoted:
+            entry.session = session
+            entry.status = WaitlistEntry.HELD
+            entry.held_until = held_until
+            entry.updated_at = now
+
+        WaitlistEntry.objects.bulk_update(promoted, ['status', 'held_until', 'updated_at'])
+
+        for entry in promoted:
+            send_waitlist_offer(entry)
+
+    return promoted, expired
+
+
+def promote_waitlists(batch_size=50, now=None):
+    """
+    Run `promote_waitlist` for every upcoming session with a lapsed hold, or
+    with students waiting and a seat free, `batch_size` sessions per query.
+    Each session is promoted in its own transaction.
+    """
+    now = now or timezone.now()
+    results = {'sessions': 0, 'promoted': 0, 'expired': 0}
+    last_id = 0
+
+    while True:
+        sessions = Session.objects.filter(
+            id__gt=last_id,
+            is_active=True,
+            start_date__gt=now,
+            waitlistentry__status__in=OPEN_STATUSES,
+        ).annotate(
+            held=Count('waitlistentry', filter=Q(waitlistentry__status=WaitlistEntry.HELD)),
+            lapsed=Count(
+                'waitlistentry',
+                filter=Q(waitlistentry__status=WaitlistEntry.HELD, waitlistentry__held_until__lte=now),
+            ),
+            waiting=Count('waitlistentry', filter=Q(waitlistentry__status=WaitlistEntry.WAITING)),
+        ).order_by('id')[:batch_size]
+
+        batch = list(sessions)
+        if not batch:
+            break
+
+        last_id = batch[-1].id
+
+        for session in batch:
+            free = session.capacity - session.active_student_count - session.held
+
+            if not session.lapsed and not (session.waiting and free > 0):
+                continue
+
+            promoted, expired = promote_waitlist(session, now=now)
+            results['sessions'] += 1
+            results['promoted'] += len(promoted)
+            results['expired'] += expired
+
+    logger.info(f"Waitlists: {results}")
+
+    return results
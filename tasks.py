@@ -11,6 +11,8 @@ def release(ctx):
     collect_static(ctx)
     migrate(ctx)
     load_fixtures(ctx)
+    rebuild_stats(ctx)
+    bump_cache_version(ctx)
 
 
 @task(help={'port': 'Port to use when serving traffic. Defaults to $PORT.'})
@@ -23,6 +25,16 @@ def migrate(ctx):
     ctx.run('python3 manage.py migrate')
 
 
+@task
+def rebuild_stats(ctx):
+    ctx.run('python3 manage.py rebuild_attendance_stats')
+
+
+@task
+def bump_cache_version(ctx):
+    ctx.run('python3 manage.py bump_cache_version')
+
+
 @task
 def load_fixtures(ctx):
     if env.bool('ENABLE_DEV_FIXTURES', default=False):
@@ -5,16 +5,18 @@ from itertools import chain
 from django.conf import settings
 from django.contrib import messages, sitemaps
 from django.contrib.auth import get_user_model
+from django.db import transaction
 from django.db.models import Count
 from django.http import HttpResponseNotFound
 from django.urls import reverse, reverse_lazy
-from django.utils import timezone
+from django.utils.decorators import method_decorator
 from django.views.generic import FormView, TemplateView
 
 from meta.views import MetadataMixin
 from sentry_sdk import capture_message
 
-from coderdojochi.models import Course, Mentor, Session
+from coderdojochi.models import Course, Mentor
+from coderdojochi.upcoming import upcoming_sessions
 
 from .forms import ContactForm
 from .models import AssociateBoardMember, BoardMember, StaffMember
@@ -44,6 +46,7 @@ class DefaultMetaTags(MetadataMixin):
     twitter_site = "@weallcode"
 
 
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class HomeView(DefaultMetaTags, TemplateView):
     template_name = "weallcode/home.html"
     url = reverse_lazy('weallcode-home')
@@ -51,16 +54,7 @@ class HomeView(DefaultMetaTags, TemplateView):
     def get_context_data(self, **kwargs):
         context = super().get_context_data(**kwargs)
 
-        sessions = Session.objects.filter(
-            is_active=True,
-            start_date__gte=timezone.now()
-        ).order_by('start_date')
-
-        if (
-            not self.request.user.is_authenticated or
-            not self.request.user.role == 'mentor'
-        ):
-            sessions = sessions.filter(is_public=True)
+        sessions = upcoming_sessions(self.request.user)
 
         if len(sessions) > 0:
             context['next_session'] = sessions[0]
@@ -75,6 +69,7 @@ class OurStoryView(DefaultMetaTags, TemplateView):
     title = f"Our Story | {settings.SITE_NAME}"
 
 
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class ProgramsView(DefaultMetaTags, TemplateView):
     template_name = "weallcode/programs.html"
     url = reverse_lazy('weallcode-programs')
@@ -85,38 +80,15 @@ class ProgramsView(DefaultMetaTags, TemplateView):
         context = super().get_context_data(**kwargs)
 
         # WEEKEND CLASSES
-        weekend_classes = Session.objects.filter(
-            is_active=True,
-            start_date__gte=timezone.now(),
-            course__course_type=Course.WEEKEND,
-        ).order_by('start_date')
-
-        if (
-            not self.request.user.is_authenticated or
-            not self.request.user.role == 'mentor'
-        ):
-            weekend_classes = weekend_classes.filter(is_public=True)
-
-        context['weekend_classes'] = weekend_classes
+        context['weekend_classes'] = upcoming_sessions(self.request.user, Course.WEEKEND)
 
         # SUMMER CAMP CLASSES
-        summer_camp_classes = Session.objects.filter(
-            is_active=True,
-            start_date__gte=timezone.now(),
-            course__course_type=Course.CAMP,
-        ).order_by('start_date')
-
-        if (
-            not self.request.user.is_authenticated or
-            not self.request.user.role == 'mentor'
-        ):
-            summer_camp_classes = summer_camp_classes.filter(is_public=True)
-
-        context['summer_camp_classes'] = summer_camp_classes
+        context['summer_camp_classes'] = upcoming_sessions(self.request.user, Course.CAMP)
 
         return context
 
 
+@method_decorator(transaction.non_atomic_requests, name='dispatch')
 class ProgramsSummerCampsView(DefaultMetaTags, TemplateView):
     template_name = "weallcode/programs-summer-camps.html"
     url = reverse_lazy('weallcode-programs-summer-camps')
@@ -127,19 +99,7 @@ class ProgramsSummerCampsView(DefaultMetaTags, TemplateView):
         context = super().get_context_data(**kwargs)
 
         # SUMMER CAMP CLASSES
-        summer_camp_classes = Session.objects.filter(
-            is_active=True,
-            start_date__gte=timezone.now(),
-            course__course_type=Course.CAMP,
-        ).order_by('start_date')
-
-        if (
-            not self.request.user.is_authenticated or
-            not self.request.user.role == 'mentor'
-        ):
-            summer_camp_classes = summer_camp_classes.filter(is_public=True)
-
-        context['summer_camp_classes'] = summer_camp_classes
+        context['summer_camp_classes'] = upcoming_sessions(self.request.user, Course.CAMP)
 
         return context
 